@@ -10,11 +10,13 @@ from .serializers import (
 )
 from .permissions import IsAddressOwner, CanManageAddresses
 from core.models import User
+from core.queries import query_budget
 
 class AddressListView(generics.ListCreateAPIView):
     """Vista para listar y crear direcciones"""
     serializer_class = AddressSerializer
     permission_classes = [permissions.IsAuthenticated, CanManageAddresses]
+    query_budget = 4
     
     def get_queryset(self):
         """Obtener direcciones del usuario actual"""
@@ -58,6 +60,7 @@ class AddressDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Vista para gestionar una dirección específica"""
     serializer_class = AddressUpdateSerializer
     permission_classes = [permissions.IsAuthenticated, IsAddressOwner]
+    query_budget = 3
     
     def get_queryset(self):
         """Obtener dirección del usuario actual"""
@@ -108,6 +111,7 @@ class AddressDefaultView(generics.RetrieveAPIView):
     """Vista para obtener la dirección por defecto"""
     serializer_class = AddressSerializer
     permission_classes = [permissions.IsAuthenticated, CanManageAddresses]
+    query_budget = 2
     
     def get_object(self):
         """Obtener dirección por defecto del usuario"""
@@ -150,6 +154,7 @@ def set_default_address(request, address_id):
             'error': str(e)
         }, status=status.HTTP_400_BAD_REQUEST)
 
+@query_budget(1)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated, CanManageAddresses])
 def address_suggestions(request):
@@ -266,6 +271,7 @@ def address_suggestions(request):
         'status': 'OK'
     })
 
+@query_budget(4)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated, CanManageAddresses])
 def address_summary(request):
@@ -13,7 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from decouple import config, Csv
 from corsheaders.defaults import default_headers, default_methods
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # lookups de búsqueda y trigramas (providers/services)
     'corsheaders',
     # Terceros
     'drf_yasg',
@@ -61,16 +62,21 @@ INSTALLED_APPS = [
     'addresses',
 ]
 
+# Las rutas de API_PATH_PREFIXES (JWT) se saltan sesiones, CSRF, auth de Django,
+# mensajes y X-Frame-Options; /admin/ y /swagger/ usan el stack completo (core/middleware.py)
 MIDDLEWARE = [
+    'core.instrumentation.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.routers.ReplicaRoutingMiddleware',
+    'core.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.CsrfViewMiddleware',
+    'core.middleware.AuthenticationMiddleware',
+    'core.middleware.MessageMiddleware',
+    'core.middleware.XFrameOptionsMiddleware',
 ]
+API_PATH_PREFIXES = ['/api/']
 
 CORS_ALLOWED_ORIGINS = [
     "https://87dc96b3d9aa.ngrok-free.app",  
@@ -105,42 +111,277 @@ WSGI_APPLICATION = 'backend_homeService.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'HS_DB',
-        'USER': 'hs_user',
-        'PASSWORD': 'hs_password',
-        'HOST': 'localhost',
-        'PORT': '5432',
+        'NAME': config('DB_NAME', default='HS_DB'),
+        'USER': config('DB_USER', default='hs_user'),
+        'PASSWORD': config('DB_PASSWORD', default='hs_password'),
+        'HOST': config('DB_HOST', default='localhost'),
+        'PORT': config('DB_PORT', default='5432'),
     }
 }
 
+# Conexiones reutilizadas entre requests. Con DB_POOL (psycopg 3 con el extra
+# pool) cada worker mantiene un pool compartido por sus hilos; sin él cada
+# hilo conserva su conexión DB_CONN_MAX_AGE segundos. En ambos casos la
+# conexión se verifica antes de usarla, así que un reinicio de PostgreSQL no
+# devuelve errores. Estadísticas en /api/auth/api/admin/db-pool/.
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+if DB_POOL:
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # el pool gestiona la vida de las conexiones
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),  # al menos GUNICORN_THREADS
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),  # segundos esperando una conexión libre
+            'max_idle': config('DB_POOL_MAX_IDLE', default=600, cast=float),
+            'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),
+        },
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+
+# Similitud mínima de las sugerencias por trigramas (providers/services/suggest.py).
+# Se fija al abrir cada conexión: el operador %> de pg_trgm la lee para filtrar con el
+# índice GIN. 0.4 admite una o dos letras cambiadas en palabras de 6 a 10 letras
+DATABASES['default'].setdefault('OPTIONS', {})['options'] = '-c pg_trgm.word_similarity_threshold=%s' % config(
+    'SERVICE_SUGGEST_THRESHOLD', default=0.4, cast=float
+)
+
+# Réplicas de lectura (core/routers.py): lista separada por comas de
+# host[:puerto][/base], p. ej. DB_REPLICAS=replica1:5432,replica2:5432. Usan el
+# usuario, la contraseña y el pool del primario; en los tests apuntan al primario.
+DB_REPLICAS = config('DB_REPLICAS', default='', cast=Csv())
+for _index, _replica in enumerate(DB_REPLICAS, 1):
+    _host_port, _, _name = _replica.partition('/')
+    _host, _, _port = _host_port.partition(':')
+    DATABASES[f'replica_{_index}'] = {
+        **DATABASES['default'],
+        'OPTIONS': {**DATABASES['default'].get('OPTIONS', {})},
+        'HOST': _host or DATABASES['default']['HOST'],
+        'PORT': _port or DATABASES['default']['PORT'],
+        'NAME': _name or DATABASES['default']['NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+DATABASE_REPLICAS = {
+    'ALIASES': [f'replica_{index}' for index in range(1, len(DB_REPLICAS) + 1)],
+    # Segundos que un usuario lee del primario tras escribir (mayor que el retraso de replicación)
+    'STICKY_SECONDS': config('DB_REPLICA_STICKY_SECONDS', default=10, cast=int),
+}
+
 # DRF y JWT
 REST_FRAMEWORK = {
+    # Límites declarados por vista con `rate_limits` (core/ratelimit.py)
+    'DEFAULT_THROTTLE_CLASSES': ['core.ratelimit.RateLimitThrottle'],
+    # Proxies de confianza delante de la aplicación (p. ej. 1 con nginx). Con 0
+    # la IP de los límites es REMOTE_ADDR y X-Forwarded-For se ignora.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
     'DEFAULT_THROTTLE_RATES': {
         'anon': '5/hour',
+        'login_ip': config('RATE_LIMIT_LOGIN_IP', default='20/min'),
+        'login_user': config('RATE_LIMIT_LOGIN_USER', default='5/min'),
+        'otp_ip': config('RATE_LIMIT_OTP_IP', default='10/hour'),
+        'otp_phone': config('RATE_LIMIT_OTP_PHONE', default='1/5m'),  # un código por teléfono cada 5 minutos
+        'payment_user': config('RATE_LIMIT_PAYMENT_USER', default='10/min'),
+        'guest_ip': config('RATE_LIMIT_GUEST_IP', default='30/hour'),
     },
+    # La API no usa sesiones: sólo JWT (ver MIDDLEWARE)
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CustomJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
 
+# JSON con orjson (core/renderers.py, core/parsers.py); sin el paquete usan el json de la stdlib
+if config('FAST_JSON', default=True, cast=bool):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ]
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ]
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Registro diferido de última actividad (core/last_seen.py)
+LAST_SEEN_TRACKING = {
+    'ENABLED': config('LAST_SEEN_ENABLED', default=True, cast=bool),
+    'FLUSH_INTERVAL': config('LAST_SEEN_FLUSH_INTERVAL', default=60, cast=int),  # segundos
+    'FLUSH_SIZE': config('LAST_SEEN_FLUSH_SIZE', default=500, cast=int),
+    'MIN_INTERVAL': config('LAST_SEEN_MIN_INTERVAL', default=300, cast=int),  # una escritura por usuario cada N segundos
+}
+
+# Cache de datos de autenticación por usuario (core/principal.py)
+PRINCIPAL_CACHE = {
+    'ENABLED': config('PRINCIPAL_CACHE_ENABLED', default=True, cast=bool),
+    'TIMEOUT': config('PRINCIPAL_CACHE_TIMEOUT', default=300, cast=int),  # segundos
+}
+
+# Cache por proceso de tokens JWT ya verificados (core/token_cache.py)
+TOKEN_CACHE = {
+    'ENABLED': config('TOKEN_CACHE_ENABLED', default=True, cast=bool),
+    'MAX_ENTRIES': config('TOKEN_CACHE_MAX_ENTRIES', default=10000, cast=int),
+}
+
+# Funciones que cada worker de gunicorn ejecuta al arrancar (gunicorn.conf.py -> core/warmup.py)
+WORKER_WARMUP = [
+    'core.revocation.warm_revocation_list',
+    'providers.services.views.active_categories',
+    'providers.fee_policies.views.current_fee_policies',
+]
+
+# Esquema OpenAPI precalculado (core/schema.py): `manage.py build_openapi_schema` en cada despliegue
+OPENAPI_SCHEMA = {
+    'PATH': config('OPENAPI_SCHEMA_PATH', default='openapi.json'),  # relativo a BASE_DIR
+    'MAX_AGE': config('OPENAPI_SCHEMA_MAX_AGE', default=3600, cast=int),  # segundos
+}
+
+# Respuestas condicionales (core/conditional.py): ETag/Last-Modified y 304 en
+# categorías, servicios y perfiles propios
+CONDITIONAL_GET = {
+    'ENABLED': config('CONDITIONAL_GET', default=True, cast=bool),
+    'VERSION_TIMEOUT': config('CONDITIONAL_GET_VERSION_TIMEOUT', default=86400, cast=int),  # segundos
+}
+
+# Cache de respuestas del catálogo (core/response_cache.py): cuerpos JSON de
+# categorías y servicios por parámetros y versión del catálogo, en cada worker,
+# con una sola reconstrucción por clave y la versión anterior servida mientras tanto
+RESPONSE_CACHE = {
+    'ENABLED': config('RESPONSE_CACHE', default=True, cast=bool),
+    'TIMEOUT': config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int),  # segundos
+    'STALE_TTL': config('RESPONSE_CACHE_STALE_TTL', default=30, cast=int),  # segundos
+    'BUILD_TIMEOUT': config('RESPONSE_CACHE_BUILD_TIMEOUT', default=10, cast=int),  # segundos
+    'POLL_INTERVAL': config('RESPONSE_CACHE_POLL_INTERVAL', default=1, cast=float),  # segundos
+    'MAX_ENTRIES': config('RESPONSE_CACHE_MAX_ENTRIES', default=500, cast=int),
+}
+
+# Autocompletado del catálogo (providers/services/suggest.py): trigramas de pg_trgm
+# y una cache por proceso de los prefijos recientes
+SERVICE_SUGGEST = {
+    'LIMIT': config('SERVICE_SUGGEST_LIMIT', default=8, cast=int),
+    'MAX_LIMIT': 20,
+    'MIN_LENGTH': config('SERVICE_SUGGEST_MIN_LENGTH', default=2, cast=int),
+    'CACHE_ENTRIES': config('SERVICE_SUGGEST_CACHE_ENTRIES', default=2000, cast=int),
+    'CACHE_TIMEOUT': config('SERVICE_SUGGEST_CACHE_TIMEOUT', default=60, cast=int),  # segundos
+}
+
+# Instrumentación por request (core/instrumentation.py): Server-Timing, log
+# estructurado y percentiles por ruta en /api/auth/api/admin/request-metrics/
+INSTRUMENTATION = {
+    'ENABLED': config('INSTRUMENTATION_ENABLED', default=True, cast=bool),
+    # En producción la cabecera expone tiempos internos: sólo si se pide
+    'SERVER_TIMING': config('INSTRUMENTATION_SERVER_TIMING', default=DEBUG, cast=bool),
+    'LOG': config('INSTRUMENTATION_LOG', default=False, cast=bool),
+    'SAMPLES': config('INSTRUMENTATION_SAMPLES', default=1000, cast=int),  # por ruta y proceso
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.instrumentation': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Revocación de tokens JWT (core/revocation.py): filtro de Bloom por proceso
+TOKEN_REVOCATION = {
+    'ENABLED': config('TOKEN_REVOCATION_ENABLED', default=True, cast=bool),
+    'CAPACITY': config('TOKEN_REVOCATION_CAPACITY', default=100000, cast=int),
+    'ERROR_RATE': config('TOKEN_REVOCATION_ERROR_RATE', default=0.001, cast=float),
+    'POLL_INTERVAL': config('TOKEN_REVOCATION_POLL_INTERVAL', default=1, cast=float),
+    'FULL_REFRESH_INTERVAL': config('TOKEN_REVOCATION_FULL_REFRESH_INTERVAL', default=3600, cast=int),
+    'CONFIRM_CACHE_SIZE': config('TOKEN_REVOCATION_CONFIRM_CACHE_SIZE', default=10000, cast=int),
+    'LOOKBACK': config('TOKEN_REVOCATION_LOOKBACK', default=60, cast=int),  # segundos releídos en cada carga incremental
+}
+
+# Hashing de contraseñas (core/passwords.py): pool acotado fuera de las transacciones
+PASSWORD_HASHING = {
+    'EXECUTOR': config('PASSWORD_HASHING_EXECUTOR', default='thread'),  # thread | process | inline
+    'MAX_WORKERS': config('PASSWORD_HASHING_MAX_WORKERS', default=4, cast=int),
+    'TIMEOUT': config('PASSWORD_HASHING_TIMEOUT', default=10, cast=int),  # segundos
+    # 0 = las iteraciones por defecto del PBKDF2PasswordHasher de Django
+    'PBKDF2_ITERATIONS': config('PASSWORD_PBKDF2_ITERATIONS', default=0, cast=int),
+    'WARN_IN_TRANSACTION': config('PASSWORD_HASHING_WARN_IN_TRANSACTION', default=ENVIRONMENT != 'testing', cast=bool),
+}
+
+# El primer hasher es el preferido. Al cambiar PASSWORD_HASHER o las iteraciones,
+# los hashes anteriores siguen siendo válidos y se actualizan en el siguiente login.
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'core.hashers.ConfigurablePBKDF2PasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+}
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2')
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+]
+
+# Pool de cuentas guest creadas por adelantado (users/guest_pool.py)
+GUEST_POOL = {
+    'ENABLED': config('GUEST_POOL_ENABLED', default=True, cast=bool),
+    'SIZE': config('GUEST_POOL_SIZE', default=200, cast=int),  # cuentas disponibles tras un refill
+    'LOW_WATER': config('GUEST_POOL_LOW_WATER', default=50, cast=int),  # por debajo se rellena en segundo plano
+    'BATCH_SIZE': config('GUEST_POOL_BATCH_SIZE', default=100, cast=int),
+}
+
 # Modelo de usuario personalizado
 AUTH_USER_MODEL = 'core.User'
 
-# Cache local
+# Cache compartida entre workers (core/cache.py). En producción es Redis: los
+# accesos más frecuentes (principal en cada request autenticado, rate limiting,
+# versiones de TieredCache) son lecturas a la cache compartida.
+# 'database' no tiene dependencias (ejecutar `python manage.py createcachetable`),
+# pero convierte cada uno de esos accesos en una consulta SQL; sólo para
+# despliegues sin Redis y con poco tráfico.
+# 'locmem' es por proceso y sólo sirve con un único worker: es el valor por
+# defecto en desarrollo (runserver) y en los tests.
+_CACHE_BACKENDS = {
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': config('REDIS_URL', default='redis://localhost:6379/0'),
+    },
+    'database': {
+        'BACKEND': 'core.cache.UnloggedDatabaseCache',
+        'LOCATION': 'hs_shared_cache',
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem' if ENVIRONMENT in ('development', 'testing') else 'redis')
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        **_CACHE_BACKENDS[CACHE_BACKEND],
+        'KEY_PREFIX': 'hs',
     }
 }
 
+# Rate limiting con GCRA sobre la cache compartida (core/ratelimit.py)
+RATE_LIMITING = {
+    'ENABLED': config('RATE_LIMITING_ENABLED', default=True, cast=bool),
+    'KEY_PREFIX': 'ratelimit',
+}
+
+# Cache de dos niveles (core.cache.TieredCache): LRU por proceso delante de la cache compartida
+TIERED_CACHE = {
+    'L1_MAX_ENTRIES': config('TIERED_CACHE_L1_MAX_ENTRIES', default=1000, cast=int),
+    'L1_TIMEOUT': config('TIERED_CACHE_L1_TIMEOUT', default=30, cast=int),  # segundos
+    'L2_TIMEOUT': config('TIERED_CACHE_L2_TIMEOUT', default=300, cast=int),  # segundos
+    'POLL_INTERVAL': config('TIERED_CACHE_POLL_INTERVAL', default=1, cast=float),  # segundos hasta ver invalidaciones de otros workers
+}
+
 # Validaciones de contraseña
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -166,7 +407,8 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Clave por defecto para campos AutoField
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# UsernameOrPhoneBackend hereda de ModelBackend (permisos) y resuelve el login
+# completo; no se agrega ModelBackend para no repetir la búsqueda del usuario
 AUTHENTICATION_BACKENDS = [
     'core.backends.UsernameOrPhoneBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
\ No newline at end of file
@@ -19,28 +19,18 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from django.contrib import admin
 from django.urls import path, include
 from django.http import HttpResponse
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework import permissions
 from django.conf import settings
 from django.conf.urls.static import static
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="API Documentation",
-      default_version='v1',
-   ),
-   public=True,
-   permission_classes=(permissions.AllowAny,),
-)
+from core.schema import CachedSchemaView
 
 
 urlpatterns = [
     path('', lambda request: HttpResponse("¡Bienvenido a HomeServiceAPI!")),
     path('admin/', admin.site.urls),
     
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    # El JSON del esquema se sirve precalculado (manage.py build_openapi_schema)
+    path('swagger/', CachedSchemaView.with_ui('swagger', cache_timeout=0), name='schema-swagger'),
+    path('redoc/', CachedSchemaView.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
     
     # Core (autenticación)
     path('api/auth/', include('core.urls')),
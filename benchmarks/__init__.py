@@ -0,0 +1,13 @@
+"""
+Benchmarks de rendimiento de HomeService API
+============================================
+
+Cada módulo se ejecuta de forma independiente y crea una base de datos de
+prueba temporal, igual que el runner de tests:
+
+    python -m benchmarks.principal_cache
+
+Requisitos:
+    - Base de datos PostgreSQL configurada (ver docker-compose.yaml)
+    - Variables de entorno configuradas (SECRET_KEY)
+"""
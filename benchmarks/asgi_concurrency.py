@@ -0,0 +1,225 @@
+"""
+Benchmark: WSGI frente a ASGI con muchos clientes concurrentes
+==============================================================
+
+Levanta el proyecto con gunicorn (gunicorn.conf.py) dos veces sobre la misma
+base de datos de benchmark, con el mismo número de workers:
+
+1. WSGI: workers síncronos (backend_homeService.wsgi).
+2. ASGI: workers de uvicorn (backend_homeService.asgi), donde las vistas de
+   lectura de core/async_views.py corren en el event loop.
+
+Contra cada servidor lanza N clientes HTTP concurrentes (keep-alive cuando el
+servidor lo permite) que recorren las vistas de lectura async durante unos
+segundos, y compara requests por segundo, latencias y errores.
+
+Requiere gunicorn y uvicorn instalados.
+
+Uso:
+    python -m benchmarks.asgi_concurrency [--clients 200] [--duration 15] [--workers 3]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks.utils import (
+    setup_django, benchmark_database, print_header, print_results,
+    create_consumer, seed_catalog,
+)
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# Clase de worker de gunicorn.conf.py para cada modo
+SERVERS = {
+    'wsgi': 'sync',
+    'asgi': 'uvicorn',
+}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, workers, db_name, extra_env=None):
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'benchmarks.server_settings',
+        'BENCHMARK_DB_NAME': db_name,
+        'GUNICORN_WORKER_CLASS': SERVERS[mode],
+        **(extra_env or {}),
+    }
+    # El resto de la configuración sale de gunicorn.conf.py, como en producción
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '--config', str(PROJECT_DIR / 'gunicorn.conf.py'),
+        '--workers', str(workers),
+        '--bind', f'127.0.0.1:{port}',
+        '--log-level', 'warning',
+    ]
+    process = subprocess.Popen(command, cwd=PROJECT_DIR, env=env)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"El servidor {mode} terminó con código {process.returncode}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"El servidor {mode} no respondió en el puerto {port}")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def _read_response(reader):
+    """Leer una respuesta HTTP/1.1; devuelve (status, keep_alive)"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip().lower()
+
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.read()
+        return status, False
+    return status, headers.get('connection') != 'close'
+
+
+async def _client(port, requests, start, deadline, samples, errors):
+    reader = writer = None
+    index = start
+    while time.perf_counter() < deadline:
+        request = requests[index % len(requests)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await _read_response(reader)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            errors.append(1)
+            keep_alive = False
+        else:
+            samples.append((time.perf_counter() - started) * 1000)
+            if status != 200:
+                errors.append(status)
+        if not keep_alive and writer is not None:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, paths, token, clients, duration):
+    requests = [
+        (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: 127.0.0.1:{port}\r\n"
+            f"Authorization: Bearer {token}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode()
+        for path in paths
+    ]
+    samples, errors = [], []
+    started = time.perf_counter()
+    deadline = started + duration
+    # Cada cliente empieza en un endpoint distinto para repartir la carga
+    await asyncio.gather(*(
+        _client(port, requests, i, deadline, samples, errors) for i in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+
+    samples = sorted(samples) or [0]
+    return {
+        'iterations': len(samples),
+        'rps': len(samples) / elapsed,
+        'p50_ms': samples[int(len(samples) * 0.50)],
+        'p95_ms': samples[min(int(len(samples) * 0.95), len(samples) - 1)],
+        'p99_ms': samples[min(int(len(samples) * 0.99), len(samples) - 1)],
+        'errors': len(errors),
+    }
+
+
+def run(clients, duration, workers, services, modes):
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from providers.services.models import Service
+
+    user = create_consumer()
+    seed_catalog(services=services)
+    token = str(RefreshToken.for_user(user).access_token)
+    service_id = Service.objects.values_list('id', flat=True).first()
+    tomorrow = date.today() + timedelta(days=1)
+    paths = [
+        '/api/services/categories/',
+        '/api/services/services/',
+        '/api/carts/',
+        '/api/appointments/consumer/',
+        f'/api/appointments/availability/?service_id={service_id}&date={tomorrow.isoformat()}',
+    ]
+    db_name = connection.settings_dict['NAME']
+    # Los servidores abren sus propias conexiones a la base de datos
+    connection.close()
+
+    print_header(f"WSGI vs ASGI - {clients} clientes, {workers} workers, {duration}s por modo")
+    results = {}
+    for mode in modes:
+        port = _free_port()
+        process = start_server(mode, port, workers, db_name)
+        try:
+            asyncio.run(load(port, paths, token, min(clients, 10), 2))  # calentamiento
+            results[mode] = asyncio.run(load(port, paths, token, clients, duration))
+        finally:
+            stop_server(process)
+        print_results(f"{mode.upper()} ({results[mode]['errors']} errores)", results[mode])
+
+    if 'wsgi' in results and 'asgi' in results and results['wsgi']['rps']:
+        print(f"ASGI / WSGI: {results['asgi']['rps'] / results['wsgi']['rps']:.2f}x req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--duration', type=int, default=15)
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--services', type=int, default=20)
+    parser.add_argument('--modes', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.clients, args.duration, args.workers, args.services, args.modes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: cache de respuestas del catálogo
+===========================================
+
+Mide GET /api/services/services/ (varias combinaciones de filtros y orden)
+con y sin la cache de respuestas versionada (core/response_cache.py):
+
+1. Sin cache: cada request consulta, serializa y renderiza la página.
+2. Con cache: las páginas repetidas se sirven ya renderizadas.
+3. Con cache y una edición de servicio cada --write-every requests: cada
+   edición invalida el catálogo y la siguiente página se reconstruye.
+4. Ráfagas de --burst requests concurrentes a la misma página justo después
+   de una edición: sin cache todos reconstruyen; con cache uno reconstruye
+   y el resto recibe la versión anterior (stale-while-revalidate).
+
+El ETag está desactivado para comparar sólo la generación del cuerpo.
+
+Uso:
+    python -m benchmarks.catalog_cache [--services 5000] [--iterations 500] [--burst 50]
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+
+from benchmarks.utils import (
+    setup_django, benchmark_database, measure, print_header, print_results,
+    seed_catalog,
+)
+
+QUERIES = [
+    {},
+    {'ordering': 'price'},
+    {'ordering': '-price'},
+    {'page_size': 50},
+    {'category': 1},
+    {'category': 2, 'ordering': 'price'},
+]
+
+
+def _summary(samples, elapsed):
+    samples = sorted(samples)
+    return {
+        'rps': len(samples) / elapsed,
+        'p50_ms': samples[int(len(samples) * 0.50)],
+        'p95_ms': samples[min(int(len(samples) * 0.95), len(samples) - 1)],
+        'p99_ms': samples[min(int(len(samples) * 0.99), len(samples) - 1)],
+    }
+
+
+async def burst(client, url, size):
+    async def timed():
+        started = time.perf_counter()
+        response = await client.get(url)
+        assert response.status_code == 200, response.status_code
+        return (time.perf_counter() - started) * 1000
+
+    return await asyncio.gather(*(timed() for _ in range(size)))
+
+
+def run(total, iterations, write_every, burst_size):
+    from asgiref.sync import sync_to_async
+    from django.db import connections
+    from django.test import AsyncClient, Client
+    from django.test.utils import override_settings
+    from providers.services.models import CATALOG_CACHE, Service
+    from core.response_cache import response_cache
+
+    seed_catalog(services=total)
+    service = Service.objects.first()
+    client = Client()
+    cache = response_cache(CATALOG_CACHE)
+    queries = itertools.cycle(QUERIES)
+    counter = itertools.count()
+
+    def request(write_every=None):
+        if write_every and next(counter) % write_every == 0:
+            service.save(update_fields=['price', 'updated_at'])
+        response = client.get('/api/services/services/', next(queries))
+        assert response.status_code == 200, response.status_code
+
+    def bursts(enabled, rounds=10):
+        samples, builds = [], []
+        started = time.perf_counter()
+        for _ in range(rounds):
+            service.save(update_fields=['price', 'updated_at'])
+            misses = cache.stats()['misses']
+            samples += asyncio.run(burst(AsyncClient(), '/api/services/services/', burst_size))
+            builds.append(cache.stats()['misses'] - misses if enabled else burst_size)
+        return _summary(samples, time.perf_counter() - started), sum(builds) / rounds
+
+    with override_settings(CONDITIONAL_GET={'ENABLED': False}):
+        print_header(f"{total} servicios, {len(QUERIES)} combinaciones de parámetros")
+        with override_settings(RESPONSE_CACHE={'ENABLED': False}):
+            print_results('Sin cache', measure(request, iterations=iterations))
+        print_results('Con cache', measure(request, iterations=iterations))
+        print_results(f'Con cache, 1 edición cada {write_every}',
+                      measure(lambda: request(write_every), iterations=iterations))
+
+        print_header(f"Ráfagas de {burst_size} requests concurrentes tras una edición")
+        # La página ya renderizada es la versión anterior que se sirve durante la reconstrucción
+        asyncio.run(burst(AsyncClient(), '/api/services/services/', 1))
+        with override_settings(RESPONSE_CACHE={'ENABLED': False}):
+            results, builds = bursts(enabled=False)
+        print_results('Sin cache', results)
+        print(f"{'':<32} {builds:.1f} reconstrucciones por ráfaga")
+        results, builds = bursts(enabled=True)
+        print_results('Con cache (singleflight + stale)', results)
+        print(f"{'':<32} {builds:.1f} reconstrucciones por ráfaga")
+
+    # La conexión del hilo de sync_to_async impediría borrar la base de datos de benchmark
+    asyncio.run(sync_to_async(connections.close_all)())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--services', type=int, default=5000)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--write-every', type=int, default=50)
+    parser.add_argument('--burst', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.services, args.iterations, args.write_every, args.burst)
+
+
+if __name__ == '__main__':
+    main()
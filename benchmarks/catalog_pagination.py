@@ -0,0 +1,126 @@
+"""
+Benchmark: paginación del catálogo de servicios
+===============================================
+
+Mide GET /api/services/services/ a medida que crece el catálogo:
+
+1. Primera página y una página profunda (cursor cerca del final) con la
+   paginación por keyset (core/pagination.py).
+2. La misma página profunda con LIMIT/OFFSET más COUNT(*), lo que haría
+   una paginación por número de página.
+3. El listado completo sin paginar (el comportamiento anterior), mientras
+   el catálogo es pequeño.
+
+Para cada caso se muestran los percentiles de latencia y el pico de memoria
+de Python asignado durante un request (tracemalloc). El GET condicional y
+la cache de respuestas se desactivan para comparar sólo la paginación.
+
+Uso:
+    python -m benchmarks.catalog_pagination [--sizes 1000 10000 100000 1000000] [--iterations 100]
+"""
+
+import argparse
+import tracemalloc
+
+from benchmarks.utils import (
+    setup_django, benchmark_database, measure, print_header, print_results,
+    create_consumer, seed_catalog,
+)
+
+# Por encima de este tamaño el listado completo tarda demasiado en medirse
+FULL_LIST_LIMIT = 10000
+
+
+def grow_catalog(provider, total):
+    from decimal import Decimal
+    from providers.services.models import Category, Service
+
+    categories = list(Category.objects.all())
+    start = Service.objects.count()
+    for offset in range(start, total, 10000):
+        Service.objects.bulk_create([
+            Service(
+                provider=provider,
+                category=categories[i % len(categories)],
+                title=f'Servicio {i}',
+                description='Servicio de benchmark con descripción de ejemplo',
+                price=Decimal('10.00') + i % 90,
+                duration_minutes=60,
+            )
+            for i in range(offset, min(offset + 10000, total))
+        ], batch_size=1000)
+
+
+def deep_cursor_url(path, page_size):
+    """URL de una página a page_size filas del final, en el orden por defecto"""
+    from rest_framework.pagination import Cursor
+    from core.pagination import KeysetPagination
+    from providers.services.models import Service
+
+    paginator = KeysetPagination()
+    paginator.key = paginator.ordering
+    paginator.base_url = f'http://testserver{path}?page_size={page_size}'
+    row = Service.objects.filter(is_active=True).order_by('created_at', 'id')[page_size]
+    return paginator.encode_cursor(Cursor(offset=0, reverse=False, position=paginator._position(row)))
+
+
+def peak_memory_kib(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes, iterations, page_size):
+    from unittest.mock import patch
+    from django.test import Client
+    from django.test.utils import override_settings
+    from rest_framework.pagination import LimitOffsetPagination
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from core.pagination import KeysetPagination
+    from providers.services.models import Service
+    from providers.services.views import ServiceListView
+
+    path = '/api/services/services/'
+    user = create_consumer()
+    provider = seed_catalog(services=0)
+    client = Client(headers={'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'})
+
+    for size in sorted(sizes):
+        grow_catalog(provider, size)
+        cases = [
+            ('Keyset: primera página', KeysetPagination, f'{path}?page_size={page_size}'),
+            ('Keyset: página profunda', KeysetPagination, deep_cursor_url(path, page_size)),
+            ('OFFSET + COUNT: profunda', LimitOffsetPagination, f'{path}?limit={page_size}&offset={size - 2 * page_size}'),
+        ]
+        if size <= FULL_LIST_LIMIT:
+            cases.append(('Sin paginar (anterior)', None, path))
+
+        print_header(f"{Service.objects.count()} servicios, páginas de {page_size}")
+        # Sin ETag ni respuestas cacheadas: se compara sólo la paginación
+        with override_settings(CONDITIONAL_GET={'ENABLED': False}, RESPONSE_CACHE={'ENABLED': False}):
+            for label, pagination_class, url in cases:
+                with patch.object(ServiceListView, 'pagination_class', pagination_class):
+                    response = client.get(url)
+                    assert response.status_code == 200, (label, response.status_code)
+                    runs = iterations if pagination_class is not None else max(3, iterations // 20)
+                    print_results(label, measure(lambda: client.get(url), iterations=runs, warmup=3))
+                    print(f"{'':<32} pico de memoria {peak_memory_kib(lambda: client.get(url)):>10.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--page-size', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.sizes, args.iterations, args.page_size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: GET condicional (ETag / Last-Modified)
+=================================================
+
+Compara, para cada endpoint que los clientes consultan periódicamente, un
+GET completo frente a la revalidación con If-None-Match que responde 304
+sin consultar ni serializar los datos (core/conditional.py):
+
+1. GET /api/services/categories/
+2. GET /api/services/services/
+3. GET /api/users/me/profile/
+
+Uso:
+    python -m benchmarks.conditional_get [--iterations 300] [--services 500]
+"""
+
+import argparse
+
+from benchmarks.utils import (
+    setup_django, benchmark_database, measure, print_header, print_results,
+    create_consumer, seed_catalog,
+)
+
+
+def run(iterations, services):
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    user = create_consumer()
+    seed_catalog(services=services)
+    client = Client(headers={'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'})
+
+    for path in ('/api/services/categories/', '/api/services/services/', '/api/users/me/profile/'):
+        response = client.get(path)
+        assert response.status_code == 200, (path, response.status_code)
+        etag = response['ETag']
+        assert client.get(path, headers={'If-None-Match': etag}).status_code == 304
+
+        print_header(f"GET {path} ({len(response.content) / 1024:.1f} KiB)")
+        full = measure(lambda: client.get(path), iterations=iterations)
+        revalidated = measure(lambda: client.get(path, headers={'If-None-Match': etag}), iterations=iterations)
+        print_results("200 completo", full)
+        print_results("304 revalidado", revalidated)
+        print(f"Mejora: {revalidated['rps'] / full['rps']:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=300)
+    parser.add_argument('--services', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.iterations, args.services)
+
+
+if __name__ == '__main__':
+    main()
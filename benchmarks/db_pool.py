@@ -0,0 +1,85 @@
+"""
+Benchmark: conexiones a PostgreSQL con y sin pool
+=================================================
+
+Levanta el proyecto con gunicorn (workers síncronos, gunicorn.conf.py) tres
+veces sobre la misma base de datos de benchmark y mide la latencia de
+/api/services/categories/ con un token JWT:
+
+1. Sin pool: DB_POOL=False y DB_CONN_MAX_AGE=0, una conexión nueva por
+   request (la configuración anterior del proyecto).
+2. Persistentes: DB_POOL=False y DB_CONN_MAX_AGE=60, cada hilo reutiliza su
+   conexión y la verifica al empezar el request.
+3. Pool: DB_POOL=True, pool de psycopg por worker.
+
+Las categorías salen de la cache en memoria; el request consulta la base de
+datos en la autenticación y en la cache compartida (CACHE_BACKEND=database),
+así que el coste de abrir la conexión pesa sobre una respuesta corta.
+
+Requiere PostgreSQL, gunicorn y psycopg 3 con el extra pool.
+
+Uso:
+    python -m benchmarks.db_pool [--clients 20] [--duration 10] [--workers 2]
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.asgi_concurrency import _free_port, load, start_server, stop_server
+from benchmarks.utils import (
+    setup_django, benchmark_database, print_header, print_results,
+    create_consumer, seed_catalog,
+)
+
+MODES = {
+    'sin_pool': {'DB_POOL': 'False', 'DB_CONN_MAX_AGE': '0'},
+    'persistentes': {'DB_POOL': 'False', 'DB_CONN_MAX_AGE': '60'},
+    'pool': {'DB_POOL': 'True'},
+}
+
+
+def run(clients, duration, workers, modes):
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    if connection.vendor != 'postgresql':
+        raise SystemExit("El benchmark de pool requiere PostgreSQL")
+
+    user = create_consumer()
+    seed_catalog(services=20)
+    token = str(RefreshToken.for_user(user).access_token)
+    db_name = connection.settings_dict['NAME']
+    connection.close()
+
+    print_header(f"Conexiones a PostgreSQL - {clients} clientes, {workers} workers, {duration}s por modo")
+    results = {}
+    for mode in modes:
+        port = _free_port()
+        process = start_server('wsgi', port, workers, db_name, extra_env=MODES[mode])
+        try:
+            paths = ['/api/services/categories/']
+            asyncio.run(load(port, paths, token, min(clients, 10), 2))  # calentamiento
+            results[mode] = asyncio.run(load(port, paths, token, clients, duration))
+        finally:
+            stop_server(process)
+        print_results(f"{mode} ({results[mode]['errors']} errores)", results[mode])
+
+    if 'sin_pool' in results and 'pool' in results:
+        print(f"p50 sin pool / con pool: {results['sin_pool']['p50_ms'] / results['pool']['p50_ms']:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--duration', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.clients, args.duration, args.workers, args.modes)
+
+
+if __name__ == '__main__':
+    main()
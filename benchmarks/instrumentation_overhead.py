@@ -0,0 +1,116 @@
+"""
+Benchmark: coste de la instrumentación por request
+==================================================
+
+Compara requests autenticados con JWT con ServerTimingMiddleware activo y
+desactivado (INSTRUMENTATION['ENABLED']):
+
+1. GET /api/services/categories/ (servido desde la TieredCache, sin consultas).
+2. GET /api/users/me/profile/ (dos o tres consultas y un serializer).
+
+Las rondas se alternan para que el ruido afecte igual a los dos modos.
+Como la diferencia queda dentro del ruido de un request completo, también
+se mide el coste aislado del middleware y de cada hook (por consulta SQL,
+acierto de cache y serializer) con una vista vacía.
+
+Uso:
+    python -m benchmarks.instrumentation_overhead [--iterations 2000] [--rounds 5]
+"""
+
+import argparse
+import statistics
+import timeit
+
+from benchmarks.utils import (
+    setup_django, benchmark_database, measure, print_header, print_results,
+    create_consumer, seed_catalog,
+)
+
+
+def run(iterations, rounds):
+    from django.conf import settings
+    from django.test import Client
+    from django.test.utils import override_settings
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    user = create_consumer()
+    seed_catalog(services=20)
+    headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+    modes = {
+        'Sin instrumentación': {**settings.INSTRUMENTATION, 'ENABLED': False},
+        'Con instrumentación': {**settings.INSTRUMENTATION, 'ENABLED': True, 'SERVER_TIMING': True},
+    }
+
+    for path in ('/api/services/categories/', '/api/users/me/profile/'):
+        results = {label: [] for label in modes}
+        for _ in range(rounds):
+            for label, conf in modes.items():
+                with override_settings(INSTRUMENTATION=conf):
+                    client = Client()
+                    client.get(path, headers=headers)  # cargar middleware y caches
+                    results[label].append(measure(lambda: client.get(path, headers=headers), iterations=iterations))
+
+        print_header(f"GET {path}")
+        medians = {}
+        for label, runs in results.items():
+            best = max(runs, key=lambda result: result['rps'])
+            print_results(label, best)
+            medians[label] = statistics.median(result['p50_ms'] for result in runs)
+        base, instrumented = medians.values()
+        print(f"Coste (mediana de p50): {(instrumented - base) * 1000:.1f} µs "
+              f"({(instrumented / base - 1) * 100:+.2f}%)")
+
+
+def isolated_cost(iterations):
+    """Microsegundos que añade la instrumentación a un request sin trabajo"""
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from django.test.utils import override_settings
+    from django.urls import resolve
+    from core import instrumentation
+
+    request = RequestFactory().get('/api/services/categories/')
+    request.resolver_match = resolve(request.path)
+    response = HttpResponse()
+
+    with override_settings(INSTRUMENTATION={'ENABLED': True, 'SERVER_TIMING': True}):
+        middleware = instrumentation.ServerTimingMiddleware(lambda request: response)
+    base = min(timeit.repeat(lambda: response, number=iterations, repeat=5)) / iterations
+    wrapped = min(timeit.repeat(lambda: middleware(request), number=iterations, repeat=5)) / iterations
+
+    execute = lambda sql, params, many, context: None  # noqa: E731
+    token = instrumentation._current.set(instrumentation.RequestMetrics())
+    try:
+        per_query = min(timeit.repeat(
+            lambda: instrumentation._execute_wrapper(execute, '', None, False, {}), number=iterations, repeat=5
+        )) / iterations - min(timeit.repeat(lambda: execute('', None, False, {}), number=iterations, repeat=5)) / iterations
+        per_cache = min(timeit.repeat(lambda: instrumentation.record_cache(True), number=iterations, repeat=5)) / iterations
+    finally:
+        instrumentation._current.reset(token)
+    return {
+        'middleware': (wrapped - base) * 1e6,
+        'query': per_query * 1e6,
+        'cache': per_cache * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.iterations, args.rounds)
+        cost = isolated_cost(args.iterations * 10)
+
+    print_header("Coste aislado por request")
+    print(f"Middleware (cabecera, agregado por ruta): {cost['middleware']:.1f} µs")
+    print(f"Por consulta SQL: {cost['query']:.2f} µs  Por lectura de cache: {cost['cache']:.2f} µs")
+    typical = cost['middleware'] + 5 * cost['query'] + 3 * cost['cache']
+    print(f"Request típico (5 consultas, 3 lecturas de cache): {typical:.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
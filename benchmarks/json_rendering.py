@@ -0,0 +1,131 @@
+"""
+Benchmark: JSON con orjson frente al json de la stdlib
+======================================================
+
+Toma la respuesta real de los endpoints con más JSON:
+
+1. GET /api/services/services/ (ServiceListView, sin paginar).
+2. GET /api/appointments/consumer/ (AppointmentSerializer con servicio,
+   proveedor y consumidor anidados).
+3. GET /api/addresses/summary/ (address_summary).
+
+Para cada una mide sólo la codificación con el JSONRenderer de DRF y con
+FastJSONRenderer (core/renderers.py), comprueba que los bytes son
+idénticos y mide también la lectura del mismo documento con JSONParser y
+FastJSONParser. No se mide el request completo: en estos endpoints lo
+dominan las consultas y la diferencia queda dentro del ruido.
+
+Uso:
+    python -m benchmarks.json_rendering [--iterations 500] [--services 500] [--appointments 200]
+"""
+
+import argparse
+import io
+
+from benchmarks.utils import (
+    setup_django, benchmark_database, measure, print_header, print_results,
+    create_consumer, seed_catalog,
+)
+
+
+def seed_appointments(consumer, count):
+    from datetime import date, time, timedelta
+    from django.utils import timezone
+    from users.appointments.models import Appointment
+    from providers.services.models import Service
+
+    services = list(Service.objects.select_related('provider__user')[:20])
+    Appointment.objects.bulk_create([
+        Appointment(
+            consumer=consumer,
+            provider=services[i % len(services)].provider.user,
+            service=services[i % len(services)],
+            appointment_date=date.today() + timedelta(days=1 + i % 30),
+            appointment_time=time(8 + i % 10, 0),
+            status=Appointment.Status.CONFIRMED,
+            is_temporary=False,
+            expires_at=timezone.now() + timedelta(days=1),
+            service_address=f'Av. Amazonas N{i}-45 y Naciones Unidas',
+            service_latitude=-0.180653,
+            service_longitude=-78.467834,
+        )
+        for i in range(count)
+    ])
+
+
+def seed_addresses(user):
+    from decimal import Decimal
+    from addresses.models import Address
+
+    for i in range(3):
+        Address.objects.create(
+            user=user,
+            title=f'Dirección {i}',
+            street=f'Calle {i} y Av. Principal',
+            city='Quito',
+            state='Pichincha',
+            postal_code='170150',
+            latitude=Decimal('-0.180653'),
+            longitude=Decimal('-78.467834'),
+            formatted_address=f'Calle {i} y Av. Principal, Quito, Ecuador',
+            is_default=i == 0,
+        )
+
+
+def run(iterations, services, appointments):
+    from django.test import Client
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from core.parsers import FastJSONParser
+    from core.renderers import FastJSONRenderer, orjson
+
+    user = create_consumer()
+    seed_catalog(services=services)
+    seed_appointments(user, appointments)
+    seed_addresses(user)
+    client = Client(headers={'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'})
+
+    if orjson is None:
+        print("⚠️  orjson no está instalado: FastJSONRenderer usa el json de la stdlib")
+
+    endpoints = {
+        'Servicios': '/api/services/services/',
+        'Citas': '/api/appointments/consumer/',
+        'Direcciones': '/api/addresses/summary/',
+    }
+    stdlib_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    for label, path in endpoints.items():
+        response = client.get(path)
+        assert response.status_code == 200, (path, response.status_code)
+        data = response.data
+        content = stdlib_renderer.render(data)
+        assert fast_renderer.render(data) == content, f"{path}: la salida no coincide"
+
+        print_header(f"{label} - {path} ({len(content) / 1024:.1f} KiB)")
+        render_stdlib = measure(lambda: stdlib_renderer.render(data), iterations=iterations)
+        render_fast = measure(lambda: fast_renderer.render(data), iterations=iterations)
+        parse_stdlib = measure(lambda: JSONParser().parse(io.BytesIO(content)), iterations=iterations)
+        parse_fast = measure(lambda: FastJSONParser().parse(io.BytesIO(content)), iterations=iterations)
+        print_results("Render json (stdlib)", render_stdlib)
+        print_results("Render orjson", render_fast)
+        print_results("Parse json (stdlib)", parse_stdlib)
+        print_results("Parse orjson", parse_fast)
+        print(f"Render: {render_fast['rps'] / render_stdlib['rps']:.2f}x  "
+              f"Parse: {parse_fast['rps'] / parse_stdlib['rps']:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--services', type=int, default=500)
+    parser.add_argument('--appointments', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.iterations, args.services, args.appointments)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark: stack de middleware de la API
+========================================
+
+Compara un GET autenticado con JWT a /api/services/categories/ con:
+
+1. El stack anterior: los middleware de Django para todas las rutas y
+   SessionAuthentication antes que JWT en DRF.
+2. El stack actual: las rutas de /api/ se saltan sesiones, CSRF, auth de
+   Django, mensajes y X-Frame-Options (core/middleware.py) y DRF sólo
+   autentica con JWT.
+
+Entre cada par de middleware se intercala un marcador que registra cuándo
+entra y sale el request; con eso se calcula el tiempo propio de cada
+middleware (sin contar los de dentro) y el de la vista.
+
+Uso:
+    python -m benchmarks.middleware_stack [--iterations 2000]
+"""
+
+import argparse
+import time
+from collections import defaultdict
+
+from benchmarks.utils import (
+    setup_django, benchmark_database, measure, print_header, print_results,
+    create_consumer, seed_catalog,
+)
+
+PATH = '/api/services/categories/'
+
+LEGACY_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.routers.ReplicaRoutingMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+MARK = 'benchmarks.middleware_stack.TimingMark'
+
+
+class TimingMark:
+    """Marcador entre dos middleware: guarda la hora de entrada y de salida por nivel"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        marks_in = request.__dict__.setdefault('_marks_in', [])
+        marks_out = request.__dict__.setdefault('_marks_out', {})
+        depth = len(marks_in)
+        marks_in.append(time.perf_counter())
+        response = self.get_response(request)
+        marks_out[depth] = time.perf_counter()
+        response._marks = (marks_in, marks_out)
+        return response
+
+
+def with_marks(middleware):
+    stack = [MARK]
+    for path in middleware:
+        stack += [path, MARK]
+    return stack
+
+
+def breakdown(client, middleware, headers, iterations):
+    """Microsegundos propios de cada middleware y de la vista, de media"""
+    totals = defaultdict(float)
+    for _ in range(iterations):
+        response = client.get(PATH, headers=headers)
+        assert response.status_code == 200, response.status_code
+        marks_in, marks_out = response._marks
+        for i, path in enumerate(middleware):
+            own = (marks_in[i + 1] - marks_in[i]) + (marks_out[i] - marks_out[i + 1])
+            totals[path] += own
+        last = len(middleware)
+        totals['vista'] += marks_out[last] - marks_in[last]
+    return {name: total / iterations * 1e6 for name, total in totals.items()}
+
+
+def run(iterations):
+    from unittest.mock import patch
+    from django.conf import settings
+    from django.test import Client
+    from django.test.utils import override_settings
+    from rest_framework.authentication import SessionAuthentication
+    from rest_framework.views import APIView
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from core.authentication import CustomJWTAuthentication
+
+    user = create_consumer()
+    seed_catalog(services=20)
+    headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    stacks = {
+        'Anterior': (LEGACY_MIDDLEWARE, [SessionAuthentication, CustomJWTAuthentication]),
+        'Actual': (list(settings.MIDDLEWARE), [CustomJWTAuthentication]),
+    }
+    results = {}
+    for label, (middleware, authentication) in stacks.items():
+        with override_settings(MIDDLEWARE=with_marks(middleware)), \
+                patch.object(APIView, 'authentication_classes', authentication):
+            client = Client()
+            client.get(PATH, headers=headers)  # calentar caches
+            results[label] = breakdown(client, middleware, headers, iterations)
+
+        with override_settings(MIDDLEWARE=middleware), \
+                patch.object(APIView, 'authentication_classes', authentication):
+            client = Client()
+            results[label]['_total'] = measure(lambda: client.get(PATH, headers=headers), iterations=iterations)
+
+    print_header(f"Middleware - GET {PATH} con JWT (µs por request)")
+    names = list(dict.fromkeys([*LEGACY_MIDDLEWARE, *settings.MIDDLEWARE]))
+    print(f"{'':<58} {'Anterior':>9} {'Actual':>9}")
+    for name in names + ['vista']:
+        row = [results[label].get(name) for label in stacks]
+        cells = ' '.join(f"{value:>9.1f}" if value is not None else f"{'-':>9}" for value in row)
+        print(f"{name:<58} {cells}")
+    middleware_totals = [
+        sum(value for key, value in results[label].items() if key not in ('vista', '_total'))
+        for label in stacks
+    ]
+    print(f"{'Total middleware':<58} {middleware_totals[0]:>9.1f} {middleware_totals[1]:>9.1f}")
+    print()
+    for label in stacks:
+        print_results(label, results[label]['_total'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.iterations)
+
+
+if __name__ == '__main__':
+    main()
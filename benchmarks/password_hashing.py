@@ -0,0 +1,142 @@
+"""
+Benchmark: hashing de contraseñas fuera del request y de las transacciones
+=========================================================================
+
+1. Duración de la transacción de registro (usuario + perfil) calculando el
+   hash dentro de transaction.atomic (antes) y antes de abrirla (ahora).
+2. Logins y registros por segundo con varios clientes concurrentes para cada
+   executor de core/passwords.py (inline, thread, process).
+
+Uso:
+    python -m benchmarks.password_hashing [--requests 40] [--concurrency 8] [--workers 4]
+"""
+
+import argparse
+import itertools
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import setup_django, benchmark_database, print_header, create_consumer
+
+_counter = itertools.count()
+
+
+def _unique():
+    return next(_counter)
+
+
+def transaction_duration(samples):
+    from datetime import date
+    from django.db import transaction
+    from core.models import User
+    from core.passwords import hash_password
+    from users.models import UserProfile
+
+    def register(n, hash_first):
+        password_hash = hash_password('benchpass123') if hash_first else None
+        started = time.perf_counter()
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=f'tx_user_{n}',
+                phone=f'+59398{n:07d}',
+                password=None if hash_first else 'benchpass123',
+                password_hash=password_hash,
+            )
+            UserProfile.objects.create(
+                user=user, firstname='Tx', lastname='User',
+                email=f'tx_user_{n}@bench.com', birth_date=date(1990, 1, 1),
+            )
+        return (time.perf_counter() - started) * 1000
+
+    inside = [register(_unique(), hash_first=False) for _ in range(samples)]
+    outside = [register(_unique(), hash_first=True) for _ in range(samples)]
+
+    print_header("Duración de la transacción de registro (locks retenidos)")
+    print(f"{'Hash dentro de la transacción':<34} media {statistics.mean(inside):>8.2f} ms")
+    print(f"{'Hash antes de la transacción':<34} media {statistics.mean(outside):>8.2f} ms")
+
+
+def concurrent_rps(func, requests, concurrency):
+    """Ejecutar func `requests` veces repartidas en `concurrency` hilos"""
+    from django.db import connection
+
+    def worker(count):
+        try:
+            for _ in range(count):
+                func()
+        finally:
+            connection.close()
+
+    per_thread = max(requests // concurrency, 1)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, [per_thread] * concurrency))
+    return per_thread * concurrency / (time.perf_counter() - started)
+
+
+def throughput(requests, concurrency, workers):
+    import core.passwords
+    from django.test import Client
+    from core.passwords import PasswordHashingService
+
+    create_consumer()
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        return local.client
+
+    def login():
+        response = client().post('/api/auth/api/token/', {
+            'username': 'bench_consumer', 'password': 'benchpass123',
+        })
+        assert response.status_code == 200, response.status_code
+
+    def register():
+        n = _unique()
+        response = client().post('/api/users/register/consumer/', {
+            'username': f'reg_user_{n}',
+            'phone': f'+59399{n:07d}',
+            'password': 'benchpass123',
+            'firstname': 'Reg',
+            'lastname': 'User',
+            'email': f'reg_user_{n}@bench.com',
+            'cedula': f'{n:010d}',
+            'birth_date': '1990-01-01',
+        })
+        assert response.status_code == 201, response.status_code
+
+    print_header(f"Throughput con {concurrency} clientes concurrentes ({workers} workers de hashing)")
+    original = core.passwords._service
+    try:
+        for executor in ('inline', 'thread', 'process'):
+            service = PasswordHashingService(executor=executor, max_workers=workers)
+            core.passwords._service = service
+            service.hash_password('warmup')  # arrancar el pool fuera de la medición
+            login_rps = concurrent_rps(login, requests, concurrency)
+            register_rps = concurrent_rps(register, requests, concurrency)
+            service.shutdown()
+            print(f"{executor:<10} login {login_rps:>7.1f} req/s   registro {register_rps:>7.1f} req/s")
+    finally:
+        core.passwords._service = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--samples', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        transaction_duration(args.samples)
+        throughput(args.requests, args.concurrency, args.workers)
+
+
+if __name__ == '__main__':
+    main()
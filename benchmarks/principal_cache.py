@@ -0,0 +1,85 @@
+"""
+Benchmark: cache de datos de autenticación (principal)
+======================================================
+
+Compara requests por segundo en /api/services/services/ con un token JWT,
+con y sin la cache de principal de core/principal.py.
+
+Uso:
+    python -m benchmarks.principal_cache [--iterations 500] [--services 20]
+"""
+
+import argparse
+
+from benchmarks.utils import (
+    setup_django, benchmark_database, measure, print_header, print_results,
+    create_consumer, seed_catalog,
+)
+
+
+def run(iterations, services):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, RequestFactory
+    from django.test.utils import override_settings, CaptureQueriesContext
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from core.authentication import CustomJWTAuthentication
+
+    user = create_consumer()
+    seed_catalog(services=services)
+    token = str(RefreshToken.for_user(user).access_token)
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def request():
+        response = client.get('/api/services/services/')
+        assert response.status_code == 200, response.status_code
+
+    print_header(f"Principal cache - GET /api/services/services/ ({services} servicios)")
+
+    with override_settings(PRINCIPAL_CACHE={'ENABLED': False}):
+        with CaptureQueriesContext(connection) as ctx:
+            request()
+        print(f"Consultas por request sin cache: {len(ctx.captured_queries)}")
+        without_cache = measure(request, iterations=iterations)
+
+    cache.clear()
+    request()  # llenar la cache
+    with CaptureQueriesContext(connection) as ctx:
+        request()
+    print(f"Consultas por request con cache: {len(ctx.captured_queries)}")
+    with_cache = measure(request, iterations=iterations)
+
+    print_results("Sin cache de principal", without_cache)
+    print_results("Con cache de principal", with_cache)
+    print(f"Mejora: {with_cache['rps'] / without_cache['rps']:.2f}x")
+
+    # Sólo la autenticación, para aislar el costo del principal del resto de la vista
+    print_header("Principal cache - CustomJWTAuthentication.authenticate()")
+    auth_request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    authentication = CustomJWTAuthentication()
+
+    def authenticate():
+        authentication.authenticate(auth_request)
+
+    with override_settings(PRINCIPAL_CACHE={'ENABLED': False}):
+        auth_without_cache = measure(authenticate, iterations=iterations * 4)
+    auth_with_cache = measure(authenticate, iterations=iterations * 4)
+
+    print_results("Sin cache de principal", auth_without_cache)
+    print_results("Con cache de principal", auth_with_cache)
+    print(f"Mejora: {auth_with_cache['rps'] / auth_without_cache['rps']:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--services', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.iterations, args.services)
+
+
+if __name__ == '__main__':
+    main()
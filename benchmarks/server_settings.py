@@ -0,0 +1,11 @@
+"""
+Settings de los servidores que levanta benchmarks/asgi_concurrency.py: los
+del proyecto apuntando a la base de datos temporal del benchmark.
+"""
+
+import os
+
+from backend_homeService.settings import *  # noqa: F401,F403
+from backend_homeService.settings import DATABASES
+
+DATABASES['default']['NAME'] = os.environ['BENCHMARK_DB_NAME']
@@ -0,0 +1,139 @@
+"""
+Benchmark: búsqueda en el catálogo de servicios
+===============================================
+
+Compara GET /api/services/services/?search= con:
+
+1. SearchFilter de DRF (el filtro anterior): ILIKE '%q%' sobre el título y
+   la descripción, sin índice.
+2. ServiceSearchFilter (providers/services/search.py): tsvector con índice
+   GIN y resultados ordenados por relevancia.
+
+Se buscan un término frecuente, uno poco frecuente, un prefijo (mientras se
+escribe), un prefijo corto y dos términos. Con más de MAX_RANKED_ROWS
+coincidencias ServiceSearchFilter ordena por fecha en vez de por relevancia. Requiere PostgreSQL: usa la base de datos de
+settings.DATABASES['default'] (se crea una base de pruebas temporal).
+
+Uso:
+    python -m benchmarks.service_search [--services 500000] [--iterations 50]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.utils import (
+    setup_django, benchmark_database, measure, print_header, print_results,
+    create_consumer, seed_catalog,
+)
+
+TRADES = [
+    'Plomería', 'Electricidad', 'Carpintería', 'Pintura', 'Limpieza', 'Jardinería', 'Cerrajería',
+    'Mudanza', 'Albañilería', 'Fumigación', 'Tapicería', 'Climatización', 'Soldadura', 'Vidriería',
+]
+WORDS = [
+    'reparación', 'instalación', 'mantenimiento', 'urgente', 'residencial', 'comercial', 'tuberías',
+    'grifos', 'paredes', 'techos', 'puertas', 'ventanas', 'muebles', 'jardines', 'oficinas', 'baños',
+    'cocinas', 'cables', 'enchufes', 'lámparas', 'cerraduras', 'alfombras', 'pisos', 'azulejos',
+    'calentadores', 'aires', 'acondicionados', 'plagas', 'cristales', 'estructuras', 'rápido', 'garantía',
+    'domicilio', 'profesional', 'económico', 'materiales', 'incluidos', 'presupuesto', 'gratis', 'fines',
+    'semana', 'noche', 'edificios', 'casas', 'departamentos', 'locales', 'bodegas', 'piscinas', 'terrazas',
+]
+# Un término raro: aparece en ~1 de cada 5000 servicios
+RARE_WORD = 'impermeabilización'
+
+QUERIES = [
+    ('Término frecuente', 'tuberías '),
+    ('Término poco frecuente', f'{RARE_WORD} '),
+    ('Prefijo (escribiendo)', 'cerraj'),
+    ('Prefijo corto', 're'),
+    ('Dos términos', 'reparación grifos '),
+]
+
+
+def seed_services(provider, total, seed=42):
+    from decimal import Decimal
+    from providers.services.models import Category, Service
+
+    rng = random.Random(seed)
+    categories = list(Category.objects.all())
+    for offset in range(0, total, 10000):
+        services = []
+        for i in range(offset, min(offset + 10000, total)):
+            words = rng.sample(WORDS, 8)
+            if i % 5000 == 0:
+                words[0] = RARE_WORD
+            services.append(Service(
+                provider=provider,
+                category=categories[i % len(categories)],
+                title=f'{rng.choice(TRADES)} {words[0]} {words[1]}',
+                description=' '.join(words[2:]),
+                price=Decimal('10.00') + i % 90,
+                duration_minutes=60,
+            ))
+        # bulk_create también calcula el vector de búsqueda de las filas nuevas
+        Service.objects.bulk_create(services, batch_size=2000)
+
+
+def run(total, iterations):
+    from django.db import connection
+    from unittest.mock import patch
+    from django.test import Client
+    from django.test.utils import override_settings
+    from rest_framework import filters
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from providers.services.search import ServiceSearchFilter
+    from providers.services.views import ServiceListView
+
+    user = create_consumer()
+    provider = seed_catalog(services=0)
+    started = time.perf_counter()
+    seed_services(provider, total)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE services_service')
+    print(f"{total} servicios creados e indexados en {time.perf_counter() - started:.1f} s")
+
+    class IlikeSearchFilter(filters.SearchFilter):
+        # ServiceListView no declara search_fields: ILIKE sobre los campos del filtro anterior
+        def get_search_fields(self, view, request):
+            return ['title', 'description']
+
+    client = Client(headers={'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'})
+    filters_by_mode = {
+        'ILIKE (SearchFilter)': IlikeSearchFilter,
+        'Texto completo (GIN)': ServiceSearchFilter,
+    }
+
+    # Sin ETag ni respuestas cacheadas: se compara sólo la búsqueda
+    with override_settings(CONDITIONAL_GET={'ENABLED': False}, RESPONSE_CACHE={'ENABLED': False}):
+        for label, text in QUERIES:
+            print_header(f"{label}: {text.strip()!r}")
+            for mode, search_filter in filters_by_mode.items():
+                backends = [backend if backend is not ServiceSearchFilter else search_filter
+                            for backend in ServiceListView.filter_backends]
+                with patch.object(ServiceListView, 'filter_backends', backends):
+                    response = client.get('/api/services/services/', {'search': text})
+                    assert response.status_code == 200, (mode, response.status_code)
+                    results = len(response.json()['results'])
+                    print_results(mode, measure(lambda: client.get('/api/services/services/', {'search': text}),
+                                                iterations=iterations, warmup=3))
+                    print(f"{'':<32} {results} resultados en la primera página")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--services', type=int, default=500000)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    if connection.vendor != 'postgresql':
+        sys.exit('Este benchmark requiere PostgreSQL.')
+    with benchmark_database():
+        run(args.services, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
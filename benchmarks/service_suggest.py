@@ -0,0 +1,78 @@
+"""
+Benchmark: autocompletado del catálogo
+======================================
+
+Mide GET /api/services/suggest/ simulando a usuarios que escriben letra a
+letra (a veces con errores) sobre un catálogo de servicios, categorías y
+proveedores:
+
+1. Sin cache: cada prefijo consulta la base de datos (similitud de
+   trigramas con pg_trgm).
+2. Con la cache de prefijos del proceso, repitiendo las mismas palabras
+   como hacen muchos usuarios a la vez.
+
+Uso:
+    python -m benchmarks.service_suggest [--services 100000] [--iterations 500]
+"""
+
+import argparse
+import itertools
+
+from benchmarks.utils import (
+    setup_django, benchmark_database, measure, print_header, print_results,
+    seed_catalog,
+)
+from benchmarks.service_search import TRADES, seed_services
+
+# Lo que escriben los usuarios, con errores de escritura
+TYPED = ['plomeria', 'plomria', 'electrisista', 'cerrageria', 'pintura', 'limpiesa', 'jardineria', 'mudanza']
+
+
+def keystrokes(words, min_length=2):
+    """Prefijos que envía un cliente mientras se escribe cada palabra"""
+    return [word[:length] for word in words for length in range(min_length, len(word) + 1)]
+
+
+def run(total, iterations):
+    from django.db import connection
+    from django.test import Client
+    from providers.services.models import Category
+    from providers.services.suggest import get_suggestion_cache
+
+    provider = seed_catalog(services=0, categories=0)
+    Category.objects.bulk_create([Category(name=trade) for trade in TRADES])
+    seed_services(provider, total)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    client = Client()
+    cache = get_suggestion_cache()
+    typed = keystrokes(TYPED)
+    prefixes = itertools.cycle(typed)
+
+    def request(clear):
+        if clear:
+            cache.clear()
+        response = client.get('/api/services/suggest/', {'q': next(prefixes)})
+        assert response.status_code == 200, response.status_code
+
+    print_header(f"{total} servicios")
+    print_results('Sin cache', measure(lambda: request(True), iterations=iterations))
+    # Tras una vuelta completa todos los prefijos están en la cache
+    print_results('Con cache de prefijos', measure(lambda: request(False), iterations=iterations, warmup=len(typed)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--services', type=int, default=100000)
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.services, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
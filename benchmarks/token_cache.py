@@ -0,0 +1,78 @@
+"""
+Benchmark: cache de tokens JWT verificados
+==========================================
+
+Micro-benchmarks de la ruta de autenticación con y sin la cache de
+core/token_cache.py:
+
+1. get_validated_token() aislado (verificación HMAC + decodificación de claims).
+2. CustomJWTAuthentication.authenticate() completo, con la cache de principal
+   llena para que la diferencia sea sólo la verificación del token.
+
+Uso:
+    python -m benchmarks.token_cache [--iterations 5000]
+"""
+
+import argparse
+
+from benchmarks.utils import (
+    setup_django, benchmark_database, measure, print_header, print_results,
+    create_consumer,
+)
+
+
+def run(iterations):
+    from django.test import RequestFactory
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from core.authentication import CustomJWTAuthentication
+    from core.token_cache import VerifiedTokenCache
+    import core.token_cache
+
+    user = create_consumer()
+    token = str(RefreshToken.for_user(user).access_token)
+    raw_token = token.encode()
+    plain = JWTAuthentication()
+    token_cache = VerifiedTokenCache(max_entries=10000)
+
+    print_header("Token cache - get_validated_token()")
+    without_cache = measure(lambda: plain.get_validated_token(raw_token), iterations=iterations)
+    with_cache = measure(
+        lambda: token_cache.get_validated_token(raw_token, plain.get_validated_token),
+        iterations=iterations,
+    )
+    print_results("Verificando en cada request", without_cache)
+    print_results("Desde la cache de tokens", with_cache)
+    saved_us = (without_cache['mean_ms'] - with_cache['mean_ms']) * 1000
+    print(f"Ahorro por request: {saved_us:.1f} µs ({with_cache['rps'] / without_cache['rps']:.2f}x)")
+
+    print_header("Token cache - CustomJWTAuthentication.authenticate()")
+    request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    authentication = CustomJWTAuthentication()
+    original = core.token_cache._token_cache
+    try:
+        core.token_cache._token_cache = VerifiedTokenCache(enabled=False)
+        auth_without_cache = measure(lambda: authentication.authenticate(request), iterations=iterations)
+        core.token_cache._token_cache = VerifiedTokenCache(max_entries=10000)
+        auth_with_cache = measure(lambda: authentication.authenticate(request), iterations=iterations)
+    finally:
+        core.token_cache._token_cache = original
+
+    print_results("Sin cache de tokens", auth_without_cache)
+    print_results("Con cache de tokens", auth_with_cache)
+    saved_us = (auth_without_cache['mean_ms'] - auth_with_cache['mean_ms']) * 1000
+    print(f"Ahorro por request: {saved_us:.1f} µs ({auth_with_cache['rps'] / auth_without_cache['rps']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.iterations)
+
+
+if __name__ == '__main__':
+    main()
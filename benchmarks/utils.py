@@ -0,0 +1,147 @@
+"""
+Utilidades comunes para los benchmarks
+"""
+
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django():
+    """Configurar Django para los benchmarks"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_homeService.settings')
+    django.setup()
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    """Crear una base de datos de prueba temporal y destruirla al terminar"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        # Escribir la actividad pendiente antes de borrar la base de datos
+        from core.last_seen import get_tracker
+        get_tracker().flush()
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def measure(func, iterations=500, warmup=20):
+    """
+    Ejecutar func varias veces y devolver requests por segundo y percentiles
+    de latencia en milisegundos.
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+
+    samples.sort()
+    return {
+        'iterations': iterations,
+        'rps': iterations / elapsed,
+        'mean_ms': statistics.mean(samples),
+        'p50_ms': samples[int(len(samples) * 0.50)],
+        'p95_ms': samples[min(int(len(samples) * 0.95), len(samples) - 1)],
+        'p99_ms': samples[min(int(len(samples) * 0.99), len(samples) - 1)],
+    }
+
+
+def print_header(title):
+    print("=" * 60)
+    print(f"📊 {title}")
+    print("=" * 60)
+
+
+def print_results(label, results):
+    print(
+        f"{label:<32} {results['rps']:>9.1f} req/s  "
+        f"p50 {results['p50_ms']:>7.2f} ms  "
+        f"p95 {results['p95_ms']:>7.2f} ms  "
+        f"p99 {results['p99_ms']:>7.2f} ms"
+    )
+
+
+def create_consumer(username='bench_consumer', phone='+593990000001', password='benchpass123'):
+    """Crear un usuario consumer con perfil para los benchmarks"""
+    from datetime import date
+    from core.models import User
+    from users.models import UserProfile
+
+    user = User.objects.create_user(
+        username=username,
+        phone=phone,
+        password=password,
+        role=User.Role.CONSUMER,
+        is_verified=True,
+    )
+    UserProfile.objects.create(
+        user=user,
+        firstname='Bench',
+        lastname='Consumer',
+        email=f'{username}@bench.com',
+        birth_date=date(1990, 1, 1),
+    )
+    return user
+
+
+def seed_catalog(services=100, categories=5):
+    """Crear un proveedor, categorías y servicios activos"""
+    from datetime import date
+    from decimal import Decimal
+    from django.utils import timezone
+    from core.models import User
+    from users.models import UserProfile
+    from providers.models import Provider
+    from providers.services.models import Category, Service
+
+    provider_user = User.objects.create_user(
+        username='bench_provider',
+        phone='+593990000002',
+        password='benchpass123',
+        role=User.Role.PROVIDER,
+    )
+    UserProfile.objects.create(
+        user=provider_user,
+        firstname='Bench',
+        lastname='Provider',
+        email='bench_provider@bench.com',
+        birth_date=date(1985, 1, 1),
+    )
+    provider = Provider.objects.create(
+        user=provider_user,
+        is_active=True,
+        verification_status=Provider.VerificationStatus.APPROVED,
+        verified_at=timezone.now(),
+    )
+    category_objs = Category.objects.bulk_create([
+        Category(name=f'Categoría {i}', description='Categoría de benchmark')
+        for i in range(categories)
+    ])
+    Service.objects.bulk_create([
+        Service(
+            provider=provider,
+            category=category_objs[i % categories],
+            title=f'Servicio {i}',
+            description='Servicio de benchmark con descripción de ejemplo',
+            price=Decimal('10.00') + i % 90,
+            duration_minutes=60,
+        )
+        for i in range(services)
+    ], batch_size=1000)
+    return provider
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        import core.signals
+        from core.instrumentation import install_hooks, is_enabled
+        if is_enabled():
+            install_hooks()
@@ -0,0 +1,111 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from rest_framework import generics
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.instrumentation import timed
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView cuyo dispatch es una corrutina. Bajo ASGI la vista corre en el
+    event loop y sólo salta a un hilo para el código síncrono: autenticación,
+    permisos y throttling de DRF (self.initial). Los handlers pueden ser
+    async (se esperan) o síncronos (se llaman tal cual, p. ej. OPTIONS).
+
+    Bajo WSGI Django la ejecuta con async_to_sync, así que el mismo código
+    sirve en los dos modos de despliegue.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def serialize(self, *args, **kwargs):
+        """
+        Serializar en un hilo: los serializers pueden acceder a relaciones o
+        propiedades que consultan la base de datos, algo prohibido en el loop.
+        """
+        return await sync_to_async(self._serialize)(*args, **kwargs)
+
+    @timed('serializer_time')
+    def _serialize(self, *args, **kwargs):
+        return self.get_serializer(*args, **kwargs).data
+
+
+class AsyncListAPIView(AsyncAPIView, generics.ListAPIView):
+    """ListAPIView con la consulta principal hecha con el ORM async"""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.list(request, *args, **kwargs)
+
+    async def list(self, request, *args, **kwargs):
+        # Los filtros pueden validar parámetros contra la base de datos
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+
+        if self.paginator is not None:
+            page = await sync_to_async(self.paginate_queryset)(queryset)
+            if page is not None:
+                data = await self.serialize(page, many=True)
+                return await sync_to_async(self.get_paginated_response)(data)
+
+        objects = [obj async for obj in queryset]
+        return Response(await self.serialize(objects, many=True))
+
+
+class AsyncRetrieveAPIView(AsyncAPIView, generics.RetrieveAPIView):
+    """RetrieveAPIView que obtiene el objeto con aget_object()"""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.retrieve(request, *args, **kwargs)
+
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(await self.serialize(instance))
+
+    async def aget_object(self):
+        """Por defecto get_object() en un hilo; las vistas pueden usar el ORM async"""
+        return await sync_to_async(self.get_object)()
+
+
+def async_api_view(http_method_names=None):
+    """
+    Equivalente de @api_view para funciones `async def`. Admite los mismos
+    decoradores de DRF (permission_classes, throttle_classes, ...).
+    """
+
+    def decorator(func):
+        wrapped = api_view(http_method_names)(func).cls
+        view_class = type(wrapped.__name__, (AsyncAPIView, wrapped), {
+            '__doc__': func.__doc__,
+            '__module__': func.__module__,
+        })
+        return view_class.as_view()
+
+    return decorator
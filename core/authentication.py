@@ -1,9 +1,14 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework import exceptions
+from rest_framework_simplejwt.exceptions import InvalidToken
 from django.utils.translation import gettext_lazy as _
-from django.core.cache import cache
 from core.models import User
-from django.utils import timezone
+from core.last_seen import get_tracker
+from core.principal import get_principal
+from core.token_cache import get_token_cache
+from core.instrumentation import timed
+from core.revocation import get_revocation_list
+from core.routers import pin_if_sticky
 
 class CustomJWTAuthentication(JWTAuthentication):
     """
@@ -11,13 +16,25 @@ class CustomJWTAuthentication(JWTAuthentication):
     - Validación de usuario activo
     - Control de cuentas suspendidas
     - Protección contra tokens inválidos
-    - Actualización de último login
+    - Registro diferido de última actividad (ver core/last_seen.py)
+    - Cache de tokens ya verificados (ver core/token_cache.py)
+    - Lista de revocación con filtro de Bloom (ver core/revocation.py)
+    - Lecturas del primario tras una escritura reciente (ver core/routers.py)
     """
+
+    def get_validated_token(self, raw_token):
+        # Un token repetido no vuelve a verificar la firma ni a decodificar los claims
+        token = get_token_cache().get_validated_token(raw_token, super().get_validated_token)
+        # La revocación se comprueba siempre, también con tokens servidos desde cache
+        if get_revocation_list().is_revoked(token):
+            raise InvalidToken(_('Token has been revoked'))
+        return token
     
     def get_user(self, validated_token):
         try:
             user_id = validated_token.get('user_id')
-            user = User.objects.select_related('profile').get(pk=user_id)
+            # Datos de autenticación desde cache (sin consultas en un acierto)
+            user = get_principal(user_id)
             
             # Verificar si el usuario está activo
             if not user.is_active:
@@ -40,9 +57,6 @@ class CustomJWTAuthentication(JWTAuthentication):
                     code='token_invalid'
                 )
             
-            # Actualizar último login (sin guardar aún)
-            user.last_login = timezone.now()
-            
             return user
         except User.DoesNotExist:
             raise exceptions.AuthenticationFailed(
@@ -55,6 +69,7 @@ class CustomJWTAuthentication(JWTAuthentication):
                 code='authentication_failed'
             )
 
+    @timed('auth_time')
     def authenticate(self, request):
         """
         Sobrescribe el método authenticate para incluir el user en el request
@@ -74,16 +89,10 @@ class CustomJWTAuthentication(JWTAuthentication):
                     code='account_disabled'
                 )
 
-            user.save()  # Guarda el último login
-
-            cache_key = f"user_{user.id}_data"
-            cache.set(cache_key, {
-                'id': user.id,
-                'username': user.username,
-                'role': user.role,
-                'is_verified': user.is_verified,
-                'is_active': user.is_active,
-            }, timeout=300)  # 5 minutos
+            # Registrar actividad sin escribir la fila del usuario en cada request
+            get_tracker().touch(user.pk)
+            # Quien acaba de escribir no lee de una réplica atrasada
+            pin_if_sticky(user.pk)
 
             return (user, token)
         except Exception:
@@ -1,20 +1,46 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+
+from core.passwords import get_password_service
 
 User = get_user_model()
 
 class UsernameOrPhoneBackend(ModelBackend):
+    """
+    Login por username o teléfono.
+
+    El identificador se resuelve con una sola consulta sobre los índices únicos
+    de username y phone. Si la credencial no es válida se lanza PermissionDenied
+    para que authenticate() no la pruebe de nuevo en otro backend.
+
+    La verificación corre en el pool de core/passwords.py y, si la política de
+    hashing cambió, la contraseña se vuelve a calcular de forma transparente.
+    """
+
     def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
         if username is None or password is None:
             return None
-        user = User.objects.filter(username=username).first()
+
+        passwords = get_password_service()
+        user = self.get_user_by_identifier(username)
         if user is None:
-            user = User.objects.filter(phone=username).first()
-        if user and user.check_password(password):
-            return user
-        return None
-
-AUTHENTICATION_BACKENDS = [
-    'core.backends.UsernameOrPhoneBackend',
-    'django.contrib.auth.backends.ModelBackend',
-]
\ No newline at end of file
+            # Igualar el tiempo de respuesta con el de un usuario existente
+            passwords.hash_password(password)
+            raise PermissionDenied
+        if not passwords.check_password(user, password):
+            raise PermissionDenied
+        return user
+
+    def get_user_by_identifier(self, identifier):
+        """Buscar por username o teléfono en una consulta; el username tiene prioridad"""
+        candidates = list(
+            User.objects.filter(Q(username=identifier) | Q(phone=identifier))[:2]
+        )
+        for user in candidates:
+            if user.username == identifier:
+                return user
+        return candidates[0] if candidates else None
\ No newline at end of file
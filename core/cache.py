@@ -0,0 +1,244 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.utils.connection import ConnectionProxy
+
+from core.instrumentation import record_cache
+
+# Alias de la cache compartida entre workers y nodos (settings.CACHES)
+SHARED_CACHE_ALIAS = 'default'
+
+# Punto de entrada único para la cache de la aplicación. El backend real se
+# elige con CACHE_BACKEND (redis | database | locmem) en settings.py.
+shared_cache = ConnectionProxy(caches, SHARED_CACHE_ALIAS)
+
+
+class UnloggedDatabaseCache(DatabaseCache):
+    """
+    Cache compartida sobre una tabla de la base de datos, sin dependencias
+    adicionales. En PostgreSQL el comando createcachetable (ver
+    core/management/commands/createcachetable.py) la crea como UNLOGGED: no
+    escribe WAL y se vacía tras un fallo del servidor, que es lo esperable
+    en una cache.
+    """
+
+
+_MISSING = object()
+
+DEFAULT_TIERED_SETTINGS = {
+    'L1_MAX_ENTRIES': 1000,  # entradas por espacio de nombres en cada proceso
+    'L1_TIMEOUT': 30,        # segundos que una entrada vive en L1
+    'L2_TIMEOUT': 300,       # segundos que una entrada vive en shared_cache
+    'POLL_INTERVAL': 1,      # segundos máximos hasta ver una invalidación de otro worker
+}
+
+
+class LocalLRUCache:
+    """Cache LRU en memoria del proceso con expiración por entrada"""
+
+    def __init__(self, max_entries=1000, timeout=30):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class TieredCache:
+    """
+    Cache de dos niveles para datos muy leídos y poco modificados: un LRU por
+    proceso (L1) delante de shared_cache (L2).
+
+    Cada espacio de nombres tiene una versión guardada en L2. Las claves de L2
+    la incluyen y cada worker la consulta como máximo una vez cada
+    POLL_INTERVAL segundos: si cambió, vacía su L1. invalidate() publica una
+    versión nueva, así que todos los workers descartan sus entradas en ese
+    plazo y las de L2 quedan huérfanas hasta expirar.
+    """
+
+    def __init__(self, namespace, l1_max_entries=1000, l1_timeout=30, l2_timeout=300, poll_interval=1):
+        self.namespace = namespace
+        self.l2_timeout = l2_timeout
+        self.poll_interval = poll_interval
+        self.l1 = LocalLRUCache(max_entries=l1_max_entries, timeout=l1_timeout)
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._stats = {'l1': {'hits': 0, 'misses': 0}, 'l2': {'hits': 0, 'misses': 0}}
+
+    @classmethod
+    def from_settings(cls, namespace):
+        conf = {**DEFAULT_TIERED_SETTINGS, **getattr(settings, 'TIERED_CACHE', {})}
+        return cls(
+            namespace,
+            l1_max_entries=conf['L1_MAX_ENTRIES'],
+            l1_timeout=conf['L1_TIMEOUT'],
+            l2_timeout=conf['L2_TIMEOUT'],
+            poll_interval=conf['POLL_INTERVAL'],
+        )
+
+    @property
+    def version_key(self):
+        return f"tiered:{self.namespace}:version"
+
+    def get(self, key, default=None):
+        version = self._current_version()
+
+        value = self.l1.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count('l1', 'hits')
+            return value
+        self._count('l1', 'misses')
+
+        value = shared_cache.get(self._l2_key(version, key), _MISSING)
+        if value is _MISSING:
+            self._count('l2', 'misses')
+            return default
+        self._count('l2', 'hits')
+        self.l1.set(key, value)
+        return value
+
+    def set(self, key, value):
+        version = self._current_version()
+        shared_cache.set(self._l2_key(version, key), value, timeout=self.l2_timeout)
+        self.l1.set(key, value)
+
+    def get_or_set(self, key, default):
+        """Devolver el valor cacheado o calcularlo con default() y guardarlo"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = default()
+            self.set(key, value)
+        return value
+
+    async def aget_or_set(self, key, default):
+        """
+        Versión async de get_or_set; default() es una corrutina. Un acierto de
+        L1 con la versión al día se resuelve sin salir del event loop; la
+        consulta de versión y L2 corren en un hilo.
+        """
+        if self._version_is_fresh():
+            value = self.l1.get(key, _MISSING)
+            if value is not _MISSING:
+                self._count('l1', 'hits')
+                return value
+
+        value = await sync_to_async(self.get)(key, _MISSING)
+        if value is _MISSING:
+            value = await default()
+            await sync_to_async(self.set)(key, value)
+        return value
+
+    def version(self):
+        """Versión vigente del espacio de nombres; cambia con cada invalidate()"""
+        return self._current_version()
+
+    def invalidate(self):
+        """Descartar el espacio de nombres completo en todos los workers"""
+        version = secrets.token_hex(8)
+        shared_cache.set(self.version_key, version, timeout=None)
+        with self._lock:
+            self._version = version
+            self._checked_at = time.monotonic()
+        self.l1.clear()
+
+    def stats(self):
+        with self._lock:
+            return {tier: dict(counters) for tier, counters in self._stats.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            for counters in self._stats.values():
+                counters['hits'] = counters['misses'] = 0
+
+    def _l2_key(self, version, key):
+        return f"tiered:{self.namespace}:{version}:{key}"
+
+    def _count(self, tier, counter):
+        with self._lock:
+            self._stats[tier][counter] += 1
+        # Para el request: acierto en cualquier nivel o fallo en L2
+        if counter == 'hits' or tier == 'l2':
+            record_cache(counter == 'hits')
+
+    def _version_is_fresh(self):
+        with self._lock:
+            return self._checked_at is not None and time.monotonic() - self._checked_at < self.poll_interval
+
+    def _current_version(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.poll_interval:
+                return self._version
+
+        version = shared_cache.get(self.version_key)
+        if version is None:
+            # Una versión aleatoria (y no un contador) evita reutilizar una
+            # versión antigua si la clave se pierde de L2
+            shared_cache.add(self.version_key, secrets.token_hex(8), timeout=None)
+            version = shared_cache.get(self.version_key)
+
+        with self._lock:
+            changed = version != self._version
+            self._version = version
+            self._checked_at = now
+        if changed:
+            self.l1.clear()
+        return version
+
+
+_tiered_caches = {}
+_tiered_lock = threading.Lock()
+
+
+def tiered_cache(namespace):
+    """Obtener la TieredCache compartida del proceso para un espacio de nombres"""
+    cache = _tiered_caches.get(namespace)
+    if cache is None:
+        with _tiered_lock:
+            cache = _tiered_caches.get(namespace)
+            if cache is None:
+                cache = _tiered_caches[namespace] = TieredCache.from_settings(namespace)
+    return cache
+
+
+def tiered_cache_stats():
+    """Aciertos y fallos por nivel de cada espacio de nombres en este proceso"""
+    return {namespace: cache.stats() for namespace, cache in list(_tiered_caches.items())}
@@ -0,0 +1,141 @@
+import asyncio
+import functools
+import hashlib
+import secrets
+import time
+from calendar import timegm
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from core.cache import shared_cache
+
+# Versión por usuario de los datos de su perfil (User, UserProfile, Provider);
+# la incrementa core/signals.py
+PROFILE_VERSION = 'profile'
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'VERSION_TIMEOUT': 86400,  # segundos que se conserva una versión sin cambios
+}
+
+
+def _get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'CONDITIONAL_GET', {})}
+
+
+def version_key(namespace, scope=None):
+    """Clave en shared_cache de una versión, para leerla junto a otras con get_many"""
+    return f"version:{namespace}:{scope}" if scope is not None else f"version:{namespace}"
+
+
+def get_version(namespace, scope=None):
+    """
+    Versión actual de un conjunto de datos: (token, timestamp del último
+    cambio). Si la clave no existe (primera lectura o expulsada de la cache)
+    se crea una nueva; los clientes sólo pierden un 304.
+    """
+    key = version_key(namespace, scope)
+    version = shared_cache.get(key)
+    if version is None:
+        shared_cache.add(key, (secrets.token_hex(8), time.time()), timeout=_get_settings()['VERSION_TIMEOUT'])
+        version = shared_cache.get(key) or (secrets.token_hex(8), time.time())
+    return version
+
+
+def bump_version(namespace, scope=None):
+    """Publicar una versión nueva ahora y de nuevo al confirmar la transacción"""
+    key = version_key(namespace, scope)
+
+    def bump():
+        shared_cache.set(key, (secrets.token_hex(8), time.time()), timeout=_get_settings()['VERSION_TIMEOUT'])
+
+    bump()
+    # Evita que un request concurrente asocie datos previos al commit a la versión nueva
+    transaction.on_commit(bump)
+
+
+def profile_etag(view, request, *args, **kwargs):
+    """Validador de los endpoints del perfil propio (etag_func de conditional_get)"""
+    return f"{request.user.pk}:{get_version(PROFILE_VERSION, request.user.pk)[0]}"
+
+
+def profile_last_modified(view, request, *args, **kwargs):
+    return get_version(PROFILE_VERSION, request.user.pk)[1]
+
+
+def make_etag(value, weak=False):
+    etag = quote_etag(hashlib.sha256(str(value).encode()).hexdigest()[:32])
+    return f'W/{etag}' if weak else etag
+
+
+def conditional_get(etag_func=None, last_modified_func=None, weak=False):
+    """
+    Equivalente de django.views.decorators.http.condition para los handlers
+    de las vistas de DRF (síncronos o async). Se evalúa después de
+    autenticación, permisos y negociación de contenido, así que las
+    funciones reciben (view, request, *args, **kwargs) con el usuario ya
+    resuelto. Si el cliente tiene la versión vigente se responde 304 sin
+    ejecutar el handler (ni consultas ni serialización).
+
+    etag_func devuelve cualquier valor que identifique la versión de los
+    datos (o None); se combina con el tipo de contenido aceptado y se
+    resume en un ETag, débil con weak=True (listados). last_modified_func
+    devuelve un timestamp o un datetime.
+    """
+
+    def validators(view, request, *args, **kwargs):
+        etag = last_modified = None
+        if etag_func is not None:
+            value = etag_func(view, request, *args, **kwargs)
+            if value is not None:
+                etag = make_etag(f"{request.accepted_media_type}:{value}", weak=weak)
+        if last_modified_func is not None:
+            value = last_modified_func(view, request, *args, **kwargs)
+            if value is not None:
+                last_modified = int(value if isinstance(value, (int, float)) else timegm(value.utctimetuple()))
+        return etag, last_modified
+
+    def not_modified(request, etag, last_modified):
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            set_validators(response, etag, last_modified)
+        return response
+
+    def set_validators(response, etag, last_modified):
+        if etag and not response.has_header('ETag'):
+            response.headers['ETag'] = etag
+        if last_modified and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(last_modified)
+
+    def decorator(handler):
+        if asyncio.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def wrapper(view, request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD') or not _get_settings()['ENABLED']:
+                    return await handler(view, request, *args, **kwargs)
+                etag, last_modified = await sync_to_async(validators)(view, request, *args, **kwargs)
+                response = not_modified(request, etag, last_modified)
+                if response is None:
+                    response = await handler(view, request, *args, **kwargs)
+                    if response.status_code == 200:
+                        set_validators(response, etag, last_modified)
+                return response
+        else:
+            @functools.wraps(handler)
+            def wrapper(view, request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD') or not _get_settings()['ENABLED']:
+                    return handler(view, request, *args, **kwargs)
+                etag, last_modified = validators(view, request, *args, **kwargs)
+                response = not_modified(request, etag, last_modified)
+                if response is None:
+                    response = handler(view, request, *args, **kwargs)
+                    if response.status_code == 200:
+                        set_validators(response, etag, last_modified)
+                return response
+        return wrapper
+
+    return decorator
@@ -0,0 +1,60 @@
+import os
+
+from django.db import connections
+
+
+def is_pooled(alias='default'):
+    return bool(connections[alias].settings_dict.get('OPTIONS', {}).get('pool'))
+
+
+def pool_stats(alias='default'):
+    """
+    Estado de las conexiones de `alias` en este proceso. Con pool: tamaño,
+    conexiones en uso, requests esperando una conexión y timeouts acumulados
+    (psycopg_pool cuenta como error de request cada espera que agota el
+    timeout). Sin pool: la configuración de conexiones persistentes.
+    """
+    conn = connections[alias]
+    if not is_pooled(alias):
+        return {
+            'pooled': False,
+            'conn_max_age': conn.settings_dict.get('CONN_MAX_AGE', 0),
+            'health_checks': conn.settings_dict.get('CONN_HEALTH_CHECKS', False),
+        }
+
+    stats = conn.pool.get_stats()
+    return {
+        'pooled': True,
+        'min_size': stats['pool_min'],
+        'max_size': stats['pool_max'],
+        'size': stats['pool_size'],
+        'in_use': stats['pool_size'] - stats['pool_available'],
+        'available': stats['pool_available'],
+        'waiting': stats['requests_waiting'],
+        'timeouts': stats.get('requests_errors', 0),
+        'requests': stats.get('requests_num', 0),
+        'queued': stats.get('requests_queued', 0),
+        'wait_ms': stats.get('requests_wait_ms', 0),
+        'connections_opened': stats.get('connections_num', 0),
+        'connections_lost': stats.get('connections_lost', 0),
+    }
+
+
+def all_pool_stats():
+    """pool_stats() de cada base de datos configurada, con el pid del worker"""
+    return {
+        'pid': os.getpid(),
+        'databases': {alias: pool_stats(alias) for alias in connections},
+    }
+
+
+def close_all_connections():
+    """
+    Cerrar las conexiones de este proceso y también sus pools: el pool abre
+    conexiones desde hilos propios que no sobreviven a un fork, así que un
+    worker de gunicorn no puede heredarlo del master.
+    """
+    connections.close_all()
+    for alias in connections:
+        if is_pooled(alias):
+            connections[alias].close_pool()
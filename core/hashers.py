@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 con el número de iteraciones tomado de
+    settings.PASSWORD_HASHING['PBKDF2_ITERATIONS'].
+
+    Usa el mismo algoritmo que el hasher de Django ('pbkdf2_sha256'), así que
+    los hashes existentes siguen siendo válidos. Si cambian las iteraciones,
+    must_update() lo detecta y la contraseña se vuelve a calcular en el
+    siguiente login.
+    """
+
+    @property
+    def iterations(self):
+        conf = getattr(settings, 'PASSWORD_HASHING', {})
+        return conf.get('PBKDF2_ITERATIONS') or PBKDF2PasswordHasher.iterations
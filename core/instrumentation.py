@@ -0,0 +1,290 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': False,
+    'SERVER_TIMING': True,  # cabecera Server-Timing en las respuestas
+    'LOG': False,           # una línea JSON por request en el logger core.instrumentation
+    'SAMPLES': 1000,        # duraciones recientes por ruta para los percentiles
+    'MAX_ROUTES': 500,      # rutas distintas que se agregan por proceso
+}
+
+
+def _get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'INSTRUMENTATION', {})}
+
+
+def is_enabled():
+    return _get_settings()['ENABLED']
+
+
+class RequestMetrics:
+    """Contadores de un request; los hooks los acumulan mientras está activo"""
+
+    __slots__ = ('db_queries', 'db_time', 'cache_hits', 'cache_misses', 'serializer_time', 'auth_time', '_timing')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.serializer_time = 0.0
+        self.auth_time = 0.0
+        self._timing = set()
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def record_cache(hit):
+    """Registrar un acierto o fallo de cache en el request en curso"""
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def timed(field):
+    """
+    Acumular la duración de la función en el campo `field` de las métricas
+    del request. Las llamadas anidadas (un serializer dentro de otro) sólo
+    cuentan una vez.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = _current.get()
+            if metrics is None or field in metrics._timing:
+                return func(*args, **kwargs)
+            metrics._timing.add(field)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                setattr(metrics, field, getattr(metrics, field) + time.perf_counter() - start)
+                metrics._timing.discard(field)
+        return wrapper
+
+    return decorator
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def _install_db_wrapper(connection, **kwargs):
+    # Cada hilo tiene sus propias conexiones: el wrapper se añade al crearlas
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install_hooks():
+    """
+    Conectar la medición de las consultas SQL (execute_wrapper en cada
+    conexión). Idempotente; sin un request instrumentado sólo cuesta una
+    lectura de ContextVar. CoreConfig.ready() lo llama antes de abrir
+    conexiones: las ya abiertas en otros hilos no se medirían. La
+    serialización y la autenticación se miden con @timed en el código
+    propio (AsyncAPIView.serialize, FastJSONRenderer, authentication.py).
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        connection_created.connect(_install_db_wrapper, dispatch_uid='core.instrumentation')
+        for connection in connections.all(initialized_only=True):
+            _install_db_wrapper(connection)
+        _installed = True
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class RouteStats:
+    """Muestras recientes de una ruta: (total, db, consultas) en segundos"""
+
+    def __init__(self, samples):
+        self.count = 0
+        self.samples = deque(maxlen=samples)
+
+    def add(self, total, db_time, db_queries):
+        self.count += 1
+        self.samples.append((total, db_time, db_queries))
+
+    def snapshot(self):
+        samples = list(self.samples)
+        if not samples:
+            return {'count': self.count}
+        totals = sorted(sample[0] for sample in samples)
+        db_times = sorted(sample[1] for sample in samples)
+        return {
+            'count': self.count,
+            'samples': len(samples),
+            'total_ms': {name: round(_percentile(totals, q) * 1000, 2) for name, q in (('p50', .5), ('p95', .95), ('p99', .99))},
+            'db_ms': {name: round(_percentile(db_times, q) * 1000, 2) for name, q in (('p50', .5), ('p95', .95), ('p99', .99))},
+            'db_queries_avg': round(sum(sample[2] for sample in samples) / len(samples), 2),
+        }
+
+
+class Instrumentation:
+    """Agregado por ruta de las métricas de los requests de este proceso"""
+
+    def __init__(self, samples=1000, max_routes=500):
+        self.samples = samples
+        self.max_routes = max_routes
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        conf = _get_settings()
+        return cls(samples=conf['SAMPLES'], max_routes=conf['MAX_ROUTES'])
+
+    def record(self, route, total, metrics):
+        stats = self._routes.get(route)
+        if stats is None:
+            with self._lock:
+                stats = self._routes.get(route)
+                if stats is None:
+                    if len(self._routes) >= self.max_routes:
+                        return
+                    stats = self._routes[route] = RouteStats(self.samples)
+        with self._lock:
+            stats.add(total, metrics.db_time, metrics.db_queries)
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: stats.snapshot() for route, stats in self._routes.items()}
+        return {'pid': os.getpid(), 'routes': dict(sorted(routes.items()))}
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+_instrumentation = None
+_instrumentation_lock = threading.Lock()
+
+
+def get_instrumentation():
+    global _instrumentation
+    if _instrumentation is None:
+        with _instrumentation_lock:
+            if _instrumentation is None:
+                _instrumentation = Instrumentation.from_settings()
+    return _instrumentation
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    return f"{request.method} /{match.route}" if match is not None else f"{request.method} <sin ruta>"
+
+
+def server_timing(total, metrics):
+    return ', '.join([
+        f'total;dur={total * 1000:.2f}',
+        f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.db_queries} queries"',
+        f'cache;desc="hits={metrics.cache_hits} misses={metrics.cache_misses}"',
+        f'serializer;dur={metrics.serializer_time * 1000:.2f}',
+        f'auth;dur={metrics.auth_time * 1000:.2f}',
+    ])
+
+
+class ServerTimingMiddleware:
+    """
+    Mide cada request: tiempo total, consultas y tiempo de base de datos,
+    aciertos y fallos de cache, serialización (serializers de AsyncAPIView y
+    renderizado con FastJSONRenderer) y autenticación. Lo publica
+    en la cabecera Server-Timing, opcionalmente como una línea JSON en el
+    log y en el agregado por ruta de RequestMetricsView. Va primero en
+    MIDDLEWARE para incluir al resto. Con ENABLED=False Django lo descarta
+    al arrancar.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        conf = _get_settings()
+        if not conf['ENABLED']:
+            raise MiddlewareNotUsed
+        install_hooks()
+        self.get_response = get_response
+        self.header = conf['SERVER_TIMING']
+        self.log = conf['LOG']
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(request, response, time.perf_counter() - start, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(request, response, time.perf_counter() - start, metrics)
+        return response
+
+    def _finish(self, request, response, total, metrics):
+        route = _route(request)
+        get_instrumentation().record(route, total, metrics)
+        if self.header:
+            response.headers['Server-Timing'] = server_timing(total, metrics)
+        if self.log and logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'route': route,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'db_queries': metrics.db_queries,
+                'db_ms': round(metrics.db_time * 1000, 2),
+                'cache_hits': metrics.cache_hits,
+                'cache_misses': metrics.cache_misses,
+                'serializer_ms': round(metrics.serializer_time * 1000, 2),
+                'auth_ms': round(metrics.auth_time * 1000, 2),
+            }))
@@ -0,0 +1,137 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from core.routers import without_request_routing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'FLUSH_INTERVAL': 60,   # segundos máximos entre escrituras a la base de datos
+    'FLUSH_SIZE': 500,      # usuarios pendientes que fuerzan una escritura anticipada
+    'MIN_INTERVAL': 300,    # granularidad: como máximo una marca por usuario cada N segundos
+}
+
+
+class LastSeenTracker:
+    """
+    Registro diferido (write-behind) de la última actividad de los usuarios.
+
+    En lugar de hacer un UPDATE de la fila completa del usuario en cada request
+    autenticado, las marcas de tiempo se acumulan en memoria y se escriben en
+    lote con un único UPDATE ... CASE cuando se cumple el intervalo o el tamaño
+    máximo del buffer.
+    """
+
+    def __init__(self, flush_interval=60, flush_size=500, min_interval=300, enabled=True):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.min_interval = min_interval
+        self.enabled = enabled
+        self._pending = {}
+        self._recorded = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    @classmethod
+    def from_settings(cls):
+        conf = {**DEFAULT_SETTINGS, **getattr(settings, 'LAST_SEEN_TRACKING', {})}
+        return cls(
+            flush_interval=conf['FLUSH_INTERVAL'],
+            flush_size=conf['FLUSH_SIZE'],
+            min_interval=conf['MIN_INTERVAL'],
+            enabled=conf['ENABLED'],
+        )
+
+    def touch(self, user_id, when=None):
+        """
+        Registrar actividad del usuario. Devuelve True si la marca se aceptó
+        (no estaba dentro de la ventana de granularidad).
+        """
+        if not self.enabled or user_id is None:
+            return False
+
+        when = when or timezone.now()
+        with self._lock:
+            last = self._recorded.get(user_id)
+            if last and (when - last).total_seconds() < self.min_interval:
+                return False
+            self._recorded[user_id] = when
+            self._pending[user_id] = when
+            should_flush = (
+                len(self._pending) >= self.flush_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+
+        if should_flush:
+            self.flush()
+        return True
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Escribir en un solo UPDATE todas las marcas pendientes"""
+        from core.models import User
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            self._prune_recorded()
+
+        if not pending:
+            return 0
+
+        whens = [When(pk=user_id, then=Value(seen_at)) for user_id, seen_at in pending.items()]
+        try:
+            # La escritura puede ocurrir dentro de un GET: no debe enviarlo al primario
+            with without_request_routing():
+                return User.objects.filter(pk__in=pending.keys()).update(
+                    last_seen=Case(*whens, output_field=DateTimeField())
+                )
+        except Exception:
+            logger.exception("No se pudo guardar la última actividad de %s usuarios", len(pending))
+            self._requeue(pending)
+            return 0
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._recorded.clear()
+            self._last_flush = time.monotonic()
+
+    def _requeue(self, pending):
+        with self._lock:
+            for user_id, seen_at in pending.items():
+                current = self._pending.get(user_id)
+                if current is None or current < seen_at:
+                    self._pending[user_id] = seen_at
+
+    def _prune_recorded(self):
+        # Olvidar usuarios cuya ventana de granularidad ya expiró para acotar memoria
+        cutoff = timezone.now()
+        self._recorded = {
+            user_id: seen_at for user_id, seen_at in self._recorded.items()
+            if (cutoff - seen_at).total_seconds() < self.min_interval
+        }
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_tracker():
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = LastSeenTracker.from_settings()
+                atexit.register(_tracker.flush)
+    return _tracker
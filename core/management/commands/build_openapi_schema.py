@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from core.schema import get_schema_store
+
+
+class Command(BaseCommand):
+    help = 'Generar el esquema OpenAPI y guardarlo en disco para servirlo sin introspección'
+
+    def handle(self, *args, **options):
+        store = get_schema_store()
+        document = store.build()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Esquema OpenAPI guardado en {store.path} ({len(document.content)} bytes, ETag {document.etag}).'
+        ))
@@ -0,0 +1,33 @@
+from django.core.cache import caches
+from django.core.management.commands.createcachetable import Command as BaseCommand
+from django.db import connections
+
+from core.cache import UnloggedDatabaseCache
+
+
+class Command(BaseCommand):
+    help = BaseCommand.help + ' Las tablas de UnloggedDatabaseCache se crean UNLOGGED en PostgreSQL.'
+
+    def create_table(self, database, tablename, dry_run):
+        super().create_table(database, tablename, dry_run)
+
+        connection = connections[database]
+        if connection.vendor != 'postgresql' or tablename not in self._unlogged_tables():
+            return
+        if not dry_run and tablename not in connection.introspection.table_names():
+            return
+
+        sql = 'ALTER TABLE %s SET UNLOGGED' % connection.ops.quote_name(tablename)
+        if dry_run:
+            self.stdout.write(sql + ';')
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+        if self.verbosity > 1:
+            self.stdout.write("Cache table '%s' set UNLOGGED." % tablename)
+
+    def _unlogged_tables(self):
+        return {
+            caches[alias]._table for alias in caches
+            if isinstance(caches[alias], UnloggedDatabaseCache)
+        }
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from core.revocation import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Borrar los tokens revocados que ya expiraron'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+
+        self.stdout.write(self.style.SUCCESS(f'Se borraron {deleted} tokens revocados expirados.'))
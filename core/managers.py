@@ -1,15 +1,38 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import models
 from django.utils.translation import gettext_lazy as _
 
-class CustomUserManager(BaseUserManager):
-    def create_user(self, username, phone, password=None, **extra_fields):
+class UserQuerySet(models.QuerySet):
+    """
+    update() (y bulk_update, que lo usa) no emite post_save: si cambia algún
+    campo de autenticación se invalidan todas las entradas de
+    core/principal.py en lugar de esperar a que expiren.
+    """
+
+    def update(self, **kwargs):
+        # Importación diferida: core.principal importa core.models
+        from core.principal import PRINCIPAL_FIELDS, invalidate_all_principals
+
+        rows = super().update(**kwargs)
+        if rows and kwargs.keys() & set(PRINCIPAL_FIELDS):
+            invalidate_all_principals()
+        return rows
+
+    update.alters_data = True
+
+class CustomUserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    def create_user(self, username, phone, password=None, password_hash=None, **extra_fields):
         if not username:
             raise ValueError(_('The Username must be set'))
         if not phone:
             raise ValueError(_('The Phone must be set'))
 
         user = self.model(username=username, phone=phone, **extra_fields)
-        user.set_password(password)
+        if password_hash is not None:
+            # Hash calculado antes de abrir la transacción (core/passwords.py)
+            user.password = password_hash
+        else:
+            user.set_password(password)
         user.save(using=self._db)
         return user
 
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import clickjacking, csrf
+
+# Hooks que el handler de Django llama directamente sobre la instancia
+_HOOKS = ('process_view', 'process_exception', 'process_template_response')
+
+
+def is_api_request(request):
+    """Las rutas de la API se autentican sólo con JWT y no usan sesiones"""
+    return request.path_info.startswith(tuple(getattr(settings, 'API_PATH_PREFIXES', ['/api/'])))
+
+
+def _skip_hook(middleware_class, name):
+    original = getattr(middleware_class, name)
+
+    def hook(self, request, *args, **kwargs):
+        if is_api_request(request):
+            return None
+        return original(self, request, *args, **kwargs)
+    hook.__name__ = name
+    return hook
+
+
+def browser_only(middleware_class):
+    """
+    Subclase de `middleware_class` que no hace nada en las rutas de la API:
+    pasa el request al siguiente middleware y tampoco ejecuta sus hooks
+    (process_view, ...). El resto de rutas (/admin/, /swagger/) la usan
+    completa. Al ser subclase, los checks del admin la reconocen.
+    """
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return middleware_class.__call__(self, request)
+
+    attrs = {
+        '__call__': __call__,
+        '__module__': __name__,
+        '__doc__': f"{middleware_class.__name__} sólo fuera de las rutas de la API",
+    }
+    for name in _HOOKS:
+        if hasattr(middleware_class, name):
+            attrs[name] = _skip_hook(middleware_class, name)
+    return type(middleware_class.__name__, (middleware_class,), attrs)
+
+
+SessionMiddleware = browser_only(sessions_middleware.SessionMiddleware)
+CsrfViewMiddleware = browser_only(csrf.CsrfViewMiddleware)
+AuthenticationMiddleware = browser_only(auth_middleware.AuthenticationMiddleware)
+MessageMiddleware = browser_only(messages_middleware.MessageMiddleware)
+XFrameOptionsMiddleware = browser_only(clickjacking.XFrameOptionsMiddleware)
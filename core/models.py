@@ -24,6 +24,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     last_login = models.DateTimeField(null=True, blank=True)
+    # Última actividad autenticada; se escribe en lote desde core/last_seen.py
+    last_seen = models.DateTimeField(null=True, blank=True)
 
     is_superuser = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
@@ -46,4 +48,61 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     @property
     def full_role(self):
-        return self.get_role_display()
\ No newline at end of file
+        return self.get_role_display()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_username = instance.__dict__.get('username')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._saved_username = self.username
+
+    def username_changed(self):
+        """¿Cambió el username desde que se leyó o se guardó? (los receptores de post_save aún ven el anterior)"""
+        return getattr(self, '_saved_username', None) != self.username
+
+class RevokedToken(models.Model):
+    """JTI revocado (logout); la fila deja de ser necesaria cuando el token expira"""
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='revoked_tokens')
+    expires_at = models.DateTimeField(db_index=True)
+    # Cursor de las cargas incrementales de core/revocation.py
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _('revoked token')
+        verbose_name_plural = _('revoked tokens')
+
+    def __str__(self):
+        return self.jti
+
+
+class TokenNotBefore(models.Model):
+    """Los tokens del usuario emitidos antes de not_before quedan revocados"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='token_not_before')
+    not_before = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        verbose_name = _('token not before')
+        verbose_name_plural = _('tokens not before')
+
+    def __str__(self):
+        return f"{self.user_id} < {self.not_before}"
+
+
+class RateLimitBucket(models.Model):
+    """Estado GCRA de una clave de rate limiting con el backend 'database' (core/ratelimit.py)"""
+    key = models.CharField(max_length=255, primary_key=True)
+    # Instante teórico de llegada en milisegundos; una fila con tat pasado no limita
+    tat = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        verbose_name = _('rate limit bucket')
+        verbose_name_plural = _('rate limit buckets')
+
+    def __str__(self):
+        return self.key
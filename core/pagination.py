@@ -0,0 +1,138 @@
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.utils.urls import remove_query_param
+
+from core.queries import approximate_count
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por keyset: cada página empieza después de la clave (campo de
+    orden, id) de la última fila de la anterior, así que leer la página 1 o
+    la 10.000 cuesta lo mismo y no depende del tamaño de la tabla. El id
+    desempata las filas con el mismo valor, de modo que ninguna se repite ni
+    se salta entre páginas.
+
+    El orden sale del primer filter backend de la vista con get_ordering
+    (OrderingFilter; sólo cuenta el primer campo) o de `ordering`; cada orden admitido necesita un índice compuesto
+    (campo, id) en el modelo. También puede ser una anotación numérica del
+    queryset, como la relevancia de una búsqueda de texto. El cursor es
+    opaco, como en CursorPagination de DRF, cuyo formato de respuesta (next,
+    previous, results) se conserva.
+
+    No se hace COUNT(*): con ?include_total=true la respuesta añade
+    `approximate_total` (ver core.queries.approximate_count).
+    """
+
+    ordering = '-created_at'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    total_query_param = 'include_total'
+    invalid_cursor_message = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.get_page(queryset, request, view)
+        self.total = None
+        if page is not None and self._include_total(request):
+            self.total = approximate_count(queryset)
+        return page
+
+    def get_page(self, queryset, request, view=None):
+        """Las filas de la página pedida, sin estimar el total (p. ej. para un ETag)"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.key = self.get_ordering(request, queryset, view)[0]
+        field, descending = self.key.lstrip('-'), self.key.startswith('-')
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        # Hacia atrás se recorre el índice en sentido contrario y se invierte la página
+        forward_descending = descending != reverse
+
+        page = queryset.order_by(*self._order_by(field, forward_descending))
+        if self.cursor is not None:
+            page = page.filter(self._after(queryset, field, forward_descending, self.cursor.position))
+        results = list(page[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Página vacía hacia atrás: no hay nada antes, se vuelve al principio
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self._position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._position(self.page[0]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.total is not None:
+            response.data['approximate_total'] = self.total
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['approximate_total'] = {
+            'type': 'integer',
+            'description': f'Sólo con ?{self.total_query_param}=true; estimación, no un recuento exacto.',
+        }
+        return response_schema
+
+    def _include_total(self, request):
+        return request.query_params.get(self.total_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def _order_by(self, field, descending):
+        prefix = '-' if descending else ''
+        return f'{prefix}{field}', f'{prefix}pk'
+
+    def _position(self, obj):
+        """Clave de la fila: el orden (para rechazar cursores de otro orden), el valor y el id"""
+        name = self.key.lstrip('-')
+        try:
+            value = obj._meta.get_field(name).value_to_string(obj)
+        except FieldDoesNotExist:
+            # Anotación numérica, p. ej. la relevancia de una búsqueda
+            value = getattr(obj, name)
+        return json.dumps([self.key, value, obj.pk])
+
+    def _after(self, queryset, field, descending, position):
+        """
+        Filas posteriores a la clave. Se expresa como `campo <= v AND (campo < v
+        OR id < i)` y no como OR plano: la primera condición acota el rango
+        del índice compuesto también en motores sin comparación de tuplas.
+        """
+        try:
+            key, raw_value, pk = json.loads(position)
+            if key != self.key:
+                raise ValueError(key)
+            if field in queryset.query.annotations:
+                value = queryset.query.annotations[field].output_field.to_python(raw_value)
+            else:
+                value = queryset.model._meta.get_field(field).to_python(raw_value)
+            pk = queryset.model._meta.pk.to_python(pk)
+        except (TypeError, ValueError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+        op = 'lt' if descending else 'gt'
+        return Q(**{f'{field}__{op}e': value}) & (Q(**{f'{field}__{op}': value}) | Q(**{f'pk__{op}': pk}))
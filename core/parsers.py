@@ -0,0 +1,27 @@
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from core.renderers import orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser que decodifica con orjson si está instalado y el cuerpo es
+    UTF-8. Si orjson rechaza el documento (JSON inválido, NaN, enteros de más
+    de 64 bits) se vuelve a leer con el JSONParser de DRF, que decide si es
+    válido y con qué mensaje de error, igual que antes.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
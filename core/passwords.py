@@ -0,0 +1,160 @@
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'EXECUTOR': 'thread',   # thread | process | inline
+    'MAX_WORKERS': 4,       # hashes simultáneos como máximo
+    'TIMEOUT': 10,          # segundos de espera por un resultado
+    # Advertir si se calcula un hash con una transacción abierta. Se desactiva
+    # en los tests: TestCase envuelve cada test en una transacción.
+    'WARN_IN_TRANSACTION': True,
+}
+
+EXECUTORS = ('thread', 'process', 'inline')
+
+
+class PasswordHashingUnavailable(APIException):
+    """El pool no entregó el hash a tiempo; se responde 503 con Retry-After"""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Servicio de autenticación saturado, intenta más tarde.')
+    default_code = 'password_hashing_unavailable'
+
+    def __init__(self, wait=None, detail=None, code=None):
+        super().__init__(detail, code)
+        # El manejador de excepciones de DRF lo envía como Retry-After
+        self.wait = wait
+
+
+def _setup_worker():
+    # Los procesos del pool arrancan con 'spawn' y necesitan configurar Django
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+class PasswordHashingService:
+    """
+    Calcula y verifica contraseñas en un pool acotado de hilos o procesos.
+
+    PBKDF2 tarda cientos de milisegundos por diseño; el pool limita cuántos
+    hashes se ejecutan a la vez para que una ráfaga de logins o registros no
+    sature los workers. Los hashes deben calcularse antes de abrir
+    transaction.atomic, para no mantener locks mientras se espera el resultado.
+    """
+
+    def __init__(self, executor='thread', max_workers=4, timeout=10, warn_in_transaction=True):
+        if executor not in EXECUTORS:
+            raise ValueError(f"Executor de hashing no soportado: {executor}")
+        self.executor = executor
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.warn_in_transaction = warn_in_transaction
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        conf = {**DEFAULT_SETTINGS, **getattr(settings, 'PASSWORD_HASHING', {})}
+        return cls(
+            executor=conf['EXECUTOR'],
+            max_workers=conf['MAX_WORKERS'],
+            timeout=conf['TIMEOUT'],
+            warn_in_transaction=conf['WARN_IN_TRANSACTION'],
+        )
+
+    def hash_password(self, raw_password):
+        """Devolver el hash de la contraseña con el hasher preferido"""
+        self._warn_if_atomic()
+        return self._run(make_password, raw_password)
+
+    def verify(self, raw_password, encoded):
+        """Devolver (es_correcta, debe_actualizarse) para un hash guardado"""
+        return self._run(verify_password, raw_password, encoded)
+
+    def check_password(self, user, raw_password):
+        """
+        Verificar la contraseña del usuario. Si es correcta pero el hash no
+        corresponde a la política actual (otro hasher u otras iteraciones),
+        se vuelve a calcular y se guarda sólo la columna password.
+        """
+        is_correct, must_update = self.verify(raw_password, user.password)
+        if is_correct and must_update:
+            user.password = self.hash_password(raw_password)
+            user.save(update_fields=['password'])
+        return is_correct
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, func, *args):
+        if self.executor == 'inline':
+            return func(*args)
+        future = self._get_pool().submit(func, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Si aún está en cola no llega a ejecutarse
+            future.cancel()
+            logger.warning("Hash de contraseña sin resultado tras %s s", self.timeout)
+            raise PasswordHashingUnavailable(wait=self.timeout)
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.executor == 'process':
+                        self._pool = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            mp_context=multiprocessing.get_context('spawn'),
+                            initializer=_setup_worker,
+                        )
+                    else:
+                        self._pool = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix='password-hashing',
+                        )
+        return self._pool
+
+    def _warn_if_atomic(self):
+        if self.warn_in_transaction and connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            logger.warning("Hash de contraseña calculado dentro de una transacción abierta")
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_password_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = PasswordHashingService.from_settings()
+                atexit.register(_service.shutdown)
+    return _service
+
+
+def hash_password(raw_password):
+    return get_password_service().hash_password(raw_password)
+
+
+def check_password(user, raw_password):
+    return get_password_service().check_password(user, raw_password)
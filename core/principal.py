@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from core.cache import shared_cache
+from core.conditional import bump_version, get_version, version_key
+from core.instrumentation import record_cache
+from core.models import User
+
+# Versiones de core.conditional que validan las entradas: una por usuario
+# (save/delete, core/signals.py) y una global (update() masivos, que no
+# emiten señales). Una entrada sólo es válida con las dos versiones vigentes.
+PRINCIPAL_VERSION = 'principal'
+
+# Campos que necesitan las validaciones de autenticación y permisos.
+# El resto de campos quedan diferidos y se cargan sólo si alguien los usa.
+PRINCIPAL_FIELDS = (
+    'id', 'username', 'phone', 'role', 'is_verified', 'is_active',
+    'disabled', 'disabled_reason', 'last_login', 'is_superuser', 'is_staff',
+)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'TIMEOUT': 300,
+}
+
+
+def _get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PRINCIPAL_CACHE', {})}
+
+
+def _field_names():
+    # from_db espera los valores en el mismo orden que los campos concretos del modelo
+    return [f.attname for f in User._meta.concrete_fields if f.attname in PRINCIPAL_FIELDS]
+
+
+def principal_cache_key(user_id):
+    return f"principal:{user_id}"
+
+
+def get_principal(user_id):
+    """
+    Obtener el usuario autenticado desde cache. En un acierto no se ejecuta
+    ninguna consulta: la entrada y sus dos versiones se leen en un único
+    get_many. En un fallo se carga con una sola consulta de columnas
+    específicas y se guarda junto a las versiones leídas antes de la
+    consulta, así que un cambio concurrente la deja obsoleta.
+
+    Lanza User.DoesNotExist si el usuario no existe.
+    """
+    conf = _get_settings()
+    field_names = _field_names()
+
+    if not conf['ENABLED']:
+        return User.objects.only(*field_names).get(pk=user_id)
+
+    key = principal_cache_key(user_id)
+    global_key, user_key = version_key(PRINCIPAL_VERSION), version_key(PRINCIPAL_VERSION, user_id)
+    cached = shared_cache.get_many([key, global_key, user_key])
+    # Si una versión no existe (primer acceso o expulsada) se crea una nueva
+    versions = (
+        cached.get(global_key) or get_version(PRINCIPAL_VERSION),
+        cached.get(user_key) or get_version(PRINCIPAL_VERSION, user_id),
+    )
+    tokens = tuple(token for token, _ in versions)
+
+    entry = cached.get(key)
+    hit = entry is not None and entry[0] == tokens
+    record_cache(hit)
+    if hit:
+        values = entry[1]
+    else:
+        values = User.objects.filter(pk=user_id).values_list(*field_names).first()
+        if values is None:
+            raise User.DoesNotExist
+        shared_cache.set(key, (tokens, values), timeout=conf['TIMEOUT'])
+
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, values)
+
+
+def invalidate_principal(user_id):
+    """Publicar una versión nueva del usuario (ahora y al confirmar la transacción)"""
+    bump_version(PRINCIPAL_VERSION, user_id)
+
+
+def invalidate_all_principals():
+    """Invalidar todas las entradas; para escrituras masivas sin señales"""
+    bump_version(PRINCIPAL_VERSION)
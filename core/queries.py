@@ -0,0 +1,193 @@
+import functools
+import json
+from typing import NamedTuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Prefetch
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+
+
+class QueryCounter:
+    """
+    Cuenta las consultas SQL ejecutadas dentro del bloque, sin depender de DEBUG.
+
+        with QueryCounter() as counter:
+            ...
+        counter.count
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.connection = connections[using]
+        self.count = 0
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._wrapper.__exit__(exc_type, exc_value, traceback)
+
+
+def query_budget(limit):
+    """
+    Máximo de consultas SQL de un GET en una vista función (@api_view o
+    @async_api_view); las vistas clase declaran el atributo `query_budget`.
+    Se aplica encima de @api_view:
+
+        @query_budget(3)
+        @api_view(['GET'])
+        def vista(request):
+            ...
+
+    QueryBudgetTest (core/tests.py) mide cada endpoint con distintos
+    volúmenes de datos: las consultas no pueden crecer con las filas ni
+    superar el presupuesto.
+    """
+
+    def decorator(view):
+        view.cls.query_budget = limit
+        return view
+
+    return decorator
+
+
+def approximate_count(queryset):
+    """
+    Número aproximado de filas de la consulta sin recorrerlas. En PostgreSQL
+    es la estimación del planificador (EXPLAIN), tan precisa como las
+    estadísticas de ANALYZE; en otros motores, un COUNT(*) exacto.
+    """
+    queryset = queryset.select_related(None).order_by()
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.count()
+    plan = queryset.explain(format='json')
+    return int(json.loads(plan)[0]['Plan']['Plan Rows'])
+
+
+def optimize_queryset(queryset, serializer, extra=()):
+    """
+    Aplicar a `queryset` el select_related, prefetch_related y only() de lo
+    que lee `serializer` (clase o instancia), para que serializar N filas
+    cueste las mismas consultas que serializar una.
+
+    Se recorren los campos del serializer: los serializers anidados sobre
+    ForeignKey/OneToOne se cargan con select_related, los de relaciones
+    múltiples con prefetch_related, y sólo se cargan las columnas de los
+    campos leídos. Lo que leen los campos calculados (SerializerMethodField,
+    propiedades del modelo) se declara en `Meta.reads` con rutas del ORM:
+
+        class Meta:
+            reads = ['provider__user__username']
+
+    Un nivel con campos calculados sin declarar carga todas sus columnas.
+    `extra` añade rutas que lee quien usa el queryset (p. ej. el orden).
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    if not isinstance(serializer, type):
+        serializer = type(serializer)
+    plan = _query_plan(serializer, queryset.model, tuple(extra))
+
+    if plan.select_related:
+        queryset = queryset.select_related(*plan.select_related)
+    prefetches = []
+    for lookup, (model, child, child_extra) in plan.prefetch_related.items():
+        related = model._default_manager.all()
+        if child is not None:
+            related = optimize_queryset(related, child, child_extra)
+        prefetches.append(Prefetch(lookup, queryset=related))
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset.only(*plan.only)
+
+
+class QueryPlan(NamedTuple):
+    select_related: tuple
+    prefetch_related: dict  # lookup -> (modelo, serializer hijo o None, extra del hijo)
+    only: tuple
+
+
+@functools.lru_cache(maxsize=None)
+def _query_plan(serializer_class, model, extra):
+    select, prefetch, only = set(), {}, set(extra)
+    _collect(serializer_class(), model, '', select, prefetch, only)
+    return QueryPlan(tuple(sorted(select)), prefetch, tuple(sorted(only)))
+
+
+def _collect(serializer, model, prefix, select, prefetch, only):
+    """Añadir lo que lee `serializer` sobre `model`; `prefix` es la ruta desde el modelo del queryset"""
+    declared = getattr(getattr(serializer, 'Meta', None), 'reads', None)
+    complete = True
+    reads = set()
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        nested = field if isinstance(field, serializers.BaseSerializer) else None
+        if field.source == '*':
+            if nested is not None:
+                _collect(nested, model, prefix, select, prefetch, only)
+            else:
+                complete = complete and declared is not None
+            continue
+        complete &= _read(model, field.source_attrs, nested, prefix, reads, select, prefetch, only)
+    for path in declared or ():
+        complete &= _read(model, path.split(LOOKUP_SEP), None, prefix, reads, select, prefetch, only)
+
+    if not complete:
+        reads.update(field.name for field in model._meta.concrete_fields)
+    only.update(prefix + path for path in reads)
+
+
+def _read(model, attrs, nested, prefix, reads, select, prefetch, only):
+    """
+    Registrar la lectura de la ruta `attrs` desde `model`. Devuelve False si
+    no es una ruta de campos del modelo (propiedad, método...).
+    """
+    path = []
+    for index, attr in enumerate(attrs):
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return False
+        path.append(attr)
+        lookup = LOOKUP_SEP.join(path)
+        last = index == len(attrs) - 1
+        if not field.is_relation:
+            reads.add(lookup)
+            return last
+        if field.many_to_many or field.one_to_many:
+            if not last:
+                return False
+            child = nested.child if isinstance(nested, serializers.ListSerializer) else None
+            # El prefetch de una relación inversa necesita la clave foránea de las filas hijas
+            child_extra = (field.field.name,) if field.one_to_many else ()
+            prefetch[prefix + lookup] = (field.related_model, child, child_extra)
+            return True
+        if field.concrete:
+            reads.add(lookup)
+        if last and nested is None:
+            # PrimaryKeyRelatedField: basta la clave foránea
+            return field.concrete
+        select.add(prefix + lookup)
+        model = field.related_model
+    _collect(nested, model, f'{prefix}{lookup}{LOOKUP_SEP}', select, prefetch, only)
+    return True
+
+
+class SerializerQuerysetMixin:
+    """
+    Vista genérica cuya consulta carga lo que lee su serializer_class
+    (optimize_queryset) en lugar de listar las relaciones a mano. Se aplica
+    en filter_queryset, que usan list(), get_object() y la paginación.
+    """
+
+    def filter_queryset(self, queryset):
+        return optimize_queryset(super().filter_queryset(queryset), self.get_serializer_class())
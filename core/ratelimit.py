@@ -0,0 +1,344 @@
+import logging
+import math
+import re
+import threading
+import time
+from collections import namedtuple
+
+import phonenumbers
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.db import connections, router, transaction
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from core.cache import SHARED_CACHE_ALIAS, shared_cache
+from core.routers import without_request_routing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'KEY_PREFIX': 'ratelimit',
+    # Región para interpretar teléfonos sin prefijo internacional (0991234567)
+    'PHONE_REGION': 'EC',
+    # Cada cuántas peticiones se borran las filas vencidas con el backend 'database'
+    'PRUNE_EVERY': 1000,
+}
+
+RateLimitResult = namedtuple('RateLimitResult', ['allowed', 'retry_after', 'remaining'])
+
+_RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])')
+_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def _get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'RATE_LIMITING', {})}
+
+
+def parse_rate(rate):
+    """
+    Convertir '5/min', '100/hour' o '1/5m' en (peticiones, segundos). Acepta
+    el formato de DRF más un multiplicador opcional del periodo.
+    """
+    match = _RATE_RE.match(rate.replace(' ', ''))
+    if match is None:
+        raise ValueError(f"Rate no válido: {rate}")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * _PERIODS[unit]
+
+
+def gcra(tat, now, interval, tolerance):
+    """
+    Generic Cell Rate Algorithm sobre milisegundos enteros. `tat` es el
+    instante teórico de llegada guardado (o None). Devuelve el resultado y el
+    nuevo TAT a guardar, o None si la petición se rechaza.
+    """
+    tat = max(tat or now, now)
+    new_tat = tat + interval
+    allow_at = new_tat - tolerance
+    if now < allow_at:
+        return RateLimitResult(False, (allow_at - now) / 1000, 0), None
+    remaining = (tolerance - (new_tat - now)) // interval
+    return RateLimitResult(True, 0, remaining), new_tat
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class LocalRateLimitStore:
+    """Límites en memoria del proceso; se usa cuando el almacén compartido falla"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._tats = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, interval, tolerance):
+        now = _now_ms()
+        with self._lock:
+            result, new_tat = gcra(self._tats.get(key), now, interval, tolerance)
+            if new_tat is not None:
+                self._tats[key] = new_tat
+                if len(self._tats) > self.max_entries:
+                    self._prune(now)
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._tats.clear()
+
+    def _prune(self, now):
+        # Un TAT en el pasado equivale a no tener historial
+        self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+
+
+class CacheRateLimitStore:
+    """
+    Límites sobre shared_cache para backends por proceso (locmem): el lock
+    del proceso hace atómicos la lectura y la escritura.
+    """
+
+    def __init__(self, prefix='ratelimit'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+
+    def hit(self, key, interval, tolerance):
+        cache_key = f"{self.prefix}:{key}"
+        now = _now_ms()
+        with self._lock:
+            result, new_tat = gcra(shared_cache.get(cache_key), now, interval, tolerance)
+            if new_tat is not None:
+                shared_cache.set(cache_key, new_tat, timeout=math.ceil((new_tat - now) / 1000))
+        return result
+
+
+# Un único INSERT ... ON CONFLICT decide y escribe: PostgreSQL bloquea la fila
+# durante la sentencia, así que peticiones simultáneas de la misma clave se
+# serializan. Usa el reloj del servidor, común a todos los nodos.
+GCRA_SQL = """
+WITH clock AS (SELECT (extract(epoch FROM clock_timestamp()) * 1000)::bigint AS now)
+INSERT INTO {table} AS bucket (key, tat)
+SELECT %(key)s, clock.now + %(interval)s FROM clock
+ON CONFLICT (key) DO UPDATE
+    SET tat = GREATEST(bucket.tat, (SELECT now FROM clock)) + %(interval)s
+    WHERE GREATEST(bucket.tat, (SELECT now FROM clock)) + %(interval)s - %(tolerance)s <= (SELECT now FROM clock)
+RETURNING bucket.tat, (SELECT now FROM clock)
+"""
+
+GCRA_REJECTED_SQL = """
+SELECT tat, (extract(epoch FROM clock_timestamp()) * 1000)::bigint FROM {table} WHERE key = %(key)s
+"""
+
+PRUNE_SQL = """
+DELETE FROM {table} WHERE tat < (extract(epoch FROM clock_timestamp()) * 1000)::bigint
+"""
+
+
+class DatabaseRateLimitStore:
+    """
+    Límites en PostgreSQL (core.models.RateLimitBucket) para el backend
+    'database': decidir y escribir es una sola sentencia atómica. Las filas
+    vencidas se borran cada PRUNE_EVERY peticiones del proceso.
+    """
+
+    def __init__(self, prefix='ratelimit', prune_every=1000):
+        from core.models import RateLimitBucket
+
+        self.model = RateLimitBucket
+        self.prefix = prefix
+        self.prune_every = prune_every
+        self._hits = 0
+        self._lock = threading.Lock()
+
+    def hit(self, key, interval, tolerance):
+        with without_request_routing():
+            return self._hit(key, interval, tolerance)
+
+    def _hit(self, key, interval, tolerance):
+        # Fuera del estado de enrutado: limitar un GET no lo fija al primario
+        using = router.db_for_write(self.model)
+        table = connections[using].ops.quote_name(self.model._meta.db_table)
+        params = {'key': f"{self.prefix}:{key}", 'interval': interval, 'tolerance': tolerance}
+        # Un error no debe abortar la transacción del request
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            cursor.execute(GCRA_SQL.format(table=table), params)
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute(GCRA_REJECTED_SQL.format(table=table), params)
+                tat, now = cursor.fetchone()
+                allow_at = max(tat, now) + interval - tolerance
+                result = RateLimitResult(False, max(allow_at - now, 0) / 1000, 0)
+            else:
+                new_tat, now = row
+                result = RateLimitResult(True, 0, (tolerance - (new_tat - now)) // interval)
+            if self._should_prune():
+                cursor.execute(PRUNE_SQL.format(table=table))
+        return result
+
+    def _should_prune(self):
+        with self._lock:
+            self._hits += 1
+            return self._hits % self.prune_every == 0
+
+
+# Se ejecuta de forma atómica en Redis y usa su reloj, común a todos los nodos
+GCRA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - tolerance
+if now < allow_at then
+    return {0, allow_at - now, 0}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, 0, math.floor((tolerance - (new_tat - now)) / interval)}
+"""
+
+
+class RedisRateLimitStore:
+    """Límites en Redis con un script Lua: leer, decidir y escribir es atómico"""
+
+    def __init__(self, cache, alias=SHARED_CACHE_ALIAS, prefix='ratelimit'):
+        self.cache = cache
+        self.alias = alias
+        self.prefix = prefix
+        self._script = None
+
+    def hit(self, key, interval, tolerance):
+        cache_key = self.cache.make_and_validate_key(f"{self.prefix}:{key}")
+        if self._script is None:
+            from django_redis import get_redis_connection
+            self._script = get_redis_connection(self.alias).register_script(GCRA_SCRIPT)
+        allowed, retry_after_ms, remaining = self._script(keys=[cache_key], args=[interval, tolerance])
+        return RateLimitResult(bool(allowed), int(retry_after_ms) / 1000, int(remaining))
+
+
+class RateLimiter:
+    """
+    Aplica límites GCRA sobre el almacén compartido. Si el almacén no responde
+    se usa un límite local por proceso en lugar de dejar pasar todo el tráfico.
+    """
+
+    def __init__(self, store, fallback=None):
+        self.store = store
+        self.fallback = fallback or LocalRateLimitStore()
+
+    @classmethod
+    def from_settings(cls):
+        conf = _get_settings()
+        cache = caches[SHARED_CACHE_ALIAS]
+        try:
+            from django_redis.cache import RedisCache
+        except ImportError:  # pragma: no cover - sin django-redis instalado
+            RedisCache = None
+        if RedisCache is not None and isinstance(cache, RedisCache):
+            store = RedisRateLimitStore(cache, alias=SHARED_CACHE_ALIAS, prefix=conf['KEY_PREFIX'])
+        elif isinstance(cache, DatabaseCache):
+            store = DatabaseRateLimitStore(prefix=conf['KEY_PREFIX'], prune_every=conf['PRUNE_EVERY'])
+        else:
+            store = CacheRateLimitStore(prefix=conf['KEY_PREFIX'])
+        return cls(store)
+
+    def hit(self, key, rate, burst=None):
+        """Registrar una petición para `key` con el rate dado ('10/min')"""
+        count, period = parse_rate(rate)
+        interval = period * 1000 // count
+        tolerance = interval * (burst or count)
+        try:
+            return self.store.hit(key, interval, tolerance)
+        except Exception:
+            logger.warning("Almacén de rate limiting no disponible, usando límite local", exc_info=True)
+            return self.fallback.hit(key, interval, tolerance)
+
+
+def normalize_identifier(value):
+    """Teléfonos válidos en E.164; cualquier otro valor sin espacios y en minúsculas"""
+    value = re.sub(r'\s+', '', str(value))
+    try:
+        phone = phonenumbers.parse(value, _get_settings()['PHONE_REGION'])
+    except phonenumbers.NumberParseException:
+        return value.lower()
+    if phonenumbers.is_valid_number(phone):
+        return phonenumbers.format_number(phone, phonenumbers.PhoneNumberFormat.E164)
+    return value.lower()
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter.from_settings()
+    return _limiter
+
+
+class RateLimitThrottle(BaseThrottle):
+    """
+    Throttle de DRF que aplica los límites declarados en la vista:
+
+        rate_limits = [('login_ip', 'ip'), ('login_user', 'username')]
+
+    Cada entrada es (scope, clave). El rate de cada scope se toma de
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']. Claves disponibles: 'ip',
+    'user' (usuario autenticado, o la IP si es anónimo) y cualquier campo
+    del cuerpo de la petición, como 'phone' o 'username'. Si el campo no
+    viene en la petición ese límite no se aplica.
+
+    La IP es la de get_ident de DRF: REMOTE_ADDR salvo que
+    REST_FRAMEWORK['NUM_PROXIES'] indique cuántos proxies de confianza
+    añaden X-Forwarded-For. Los campos que son teléfonos se normalizan a
+    E.164 (como OTPSerializer) para que +593... y 0... compartan límite.
+    """
+
+    def __init__(self):
+        self.retry_after = None
+
+    def allow_request(self, request, view):
+        if not _get_settings()['ENABLED']:
+            return True
+
+        limiter = get_rate_limiter()
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        waits = []
+        for scope, key_name in getattr(view, 'rate_limits', ()):
+            rate = rates.get(scope)
+            ident = self.get_key(request, key_name)
+            if rate is None or ident is None:
+                continue
+            result = limiter.hit(f"{scope}:{ident}", rate)
+            if not result.allowed:
+                waits.append(result.retry_after)
+
+        if waits:
+            self.retry_after = max(waits)
+            return False
+        return True
+
+    def get_key(self, request, key_name):
+        if key_name == 'ip':
+            return self.get_ident(request)
+        if key_name == 'user':
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                return f"user:{user.pk}"
+            return self.get_ident(request)
+        value = request.data.get(key_name) if hasattr(request.data, 'get') else None
+        if value in (None, ''):
+            return None
+        return normalize_identifier(value)
+
+    def wait(self):
+        return self.retry_after
@@ -0,0 +1,56 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.instrumentation import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - sin orjson se usa el json de la stdlib
+    orjson = None
+
+# orjson serializa fechas a su manera; el encoder de DRF las recibe por default
+ORJSON_OPTIONS = (
+    (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS)
+    if orjson is not None else 0
+)
+
+_drf_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer que codifica con orjson si está instalado. Como DRF, la
+    salida es compacta, UTF-8 sin escapar, con U+2028/U+2029 escapados y con
+    Decimal, datetime, date, time, timedelta, UUID, QuerySet, etc.
+    convertidos por el encoder de DRF. Sin orjson, con indentación (API
+    navegable), con UNICODE_JSON/COMPACT_JSON desactivados o con valores que
+    orjson no admite (enteros de más de 64 bits) usa el JSONRenderer de DRF.
+
+    No es idéntica byte a byte en los floats:
+    - los exponentes salen sin signo ni ceros a la izquierda (1e16 y 1e-7
+      en vez de 1e+16 y 1e-07); el valor decodificado es el mismo;
+    - NaN e infinito salen como null, mientras que DRF (STRICT_JSON) lanza
+      ValueError.
+    """
+
+    @timed('serializer_time')
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type or '', renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_drf_default, option=ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Como DRF: separadores de línea escapados para poder incrustar el JSON en JS
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,254 @@
+import asyncio
+import functools
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.functional import cached_property
+
+from core.cache import LocalLRUCache
+from core.conditional import bump_version, get_version
+from core.instrumentation import record_cache
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'TIMEOUT': 300,         # segundos que una respuesta se conserva en el proceso
+    'STALE_TTL': 30,        # segundos tras un cambio en los que se sirve la versión anterior mientras se reconstruye
+    'BUILD_TIMEOUT': 10,    # segundos que un request espera la reconstrucción de otro antes de calcularla él
+    'POLL_INTERVAL': 1,     # segundos hasta ver las invalidaciones de otros workers
+    'MAX_ENTRIES': 500,     # respuestas por espacio de nombres en cada proceso
+}
+
+
+def _get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'RESPONSE_CACHE', {})}
+
+
+class CachedHttpResponse(HttpResponse):
+    """Respuesta servida desde la cache; `data` decodifica el cuerpo, como Response.data"""
+
+    @cached_property
+    def data(self):
+        return json.loads(self.content)
+
+
+class CachedResponse(NamedTuple):
+    version: str
+    content_type: str
+    body: bytes
+
+    def to_response(self):
+        return CachedHttpResponse(self.body, content_type=self.content_type)
+
+
+class ResponseCache:
+    """
+    Respuestas renderizadas por (petición normalizada, versión de los
+    datos), en un LRU por proceso. La versión es la de core.conditional
+    (get_version / bump_version) y cada worker la consulta como máximo una
+    vez cada POLL_INTERVAL segundos, así que un acierto no sale del event
+    loop. invalidate() publica una versión nueva: las entradas anteriores
+    quedan obsoletas sin borrarlas.
+
+    Un fallo reconstruye la respuesta una sola vez por clave y proceso: los
+    requests concurrentes esperan al primero (singleflight). Durante
+    STALE_TTL segundos tras un cambio, si ya hay una versión anterior se
+    sirve ésa mientras un único request reconstruye (stale-while-revalidate),
+    así que la latencia no sube con cada invalidación.
+
+    Los cuerpos no se guardan en shared_cache: son grandes y con el backend
+    'database' cada escritura cuesta más que renderizar la página.
+    """
+
+    def __init__(self, namespace, timeout=300, stale_ttl=30, build_timeout=10, poll_interval=1, max_entries=500):
+        self.namespace = namespace
+        self.stale_ttl = stale_ttl
+        self.build_timeout = build_timeout
+        self.poll_interval = poll_interval
+        self.entries = LocalLRUCache(max_entries=max_entries, timeout=timeout)
+        self._version = None
+        self._checked_at = None
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'stale': 0, 'misses': 0}
+
+    @classmethod
+    def from_settings(cls, namespace):
+        conf = _get_settings()
+        return cls(
+            namespace,
+            timeout=conf['TIMEOUT'],
+            stale_ttl=conf['STALE_TTL'],
+            build_timeout=conf['BUILD_TIMEOUT'],
+            poll_interval=conf['POLL_INTERVAL'],
+            max_entries=conf['MAX_ENTRIES'],
+        )
+
+    async def aget_or_build(self, key, build):
+        """
+        Respuesta para `key`; build() es una corrutina que devuelve la
+        respuesta ya renderizada. Sólo se guardan las respuestas 200.
+        """
+        version = self._fresh_version()
+        if version is None:
+            version = await sync_to_async(self._poll_version)()
+        token, changed_at = version
+
+        entry = self.entries.get(key)
+        if entry is not None and entry.version == token:
+            self._count('hits')
+            return entry.to_response()
+
+        stale = entry if entry is not None and time.time() - changed_at < self.stale_ttl else None
+        future, leader = self._join(key)
+        if not leader:
+            if stale is not None:
+                self._count('stale')
+                return stale.to_response()
+            # Otro request de este proceso está reconstruyendo la misma clave
+            try:
+                built = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.build_timeout)
+            except asyncio.TimeoutError:
+                built = None
+            if built is not None and built.version == token:
+                self._count('hits')
+                return built.to_response()
+            self._count('misses')
+            return await build()
+
+        built = None
+        self._count('misses')
+        try:
+            response = await build()
+            if response.status_code == 200:
+                built = CachedResponse(token, response['Content-Type'], response.content)
+                self.entries.set(key, built)
+            return response
+        finally:
+            self._leave(key, future, built)
+
+    def version(self):
+        """
+        Versión vigente de los datos, la misma con la que se guardan las
+        respuestas. Sin consultas mientras no pasen POLL_INTERVAL segundos.
+        """
+        version = self._fresh_version()
+        if version is None:
+            version = self._poll_version()
+        return version[0]
+
+    def invalidate(self):
+        """
+        Publicar una versión nueva ahora y al confirmar la transacción
+        (bump_version). Este proceso la ve al momento; los demás workers, en
+        POLL_INTERVAL segundos.
+        """
+        bump_version(self.namespace)
+        self._expire_version()
+        transaction.on_commit(self._expire_version)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def clear(self):
+        self.entries.clear()
+        self._expire_version()
+
+    def _fresh_version(self):
+        with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.poll_interval:
+                return self._version
+        return None
+
+    def _poll_version(self):
+        version = get_version(self.namespace)
+        with self._lock:
+            self._version = version
+            self._checked_at = time.monotonic()
+        return version
+
+    def _expire_version(self):
+        with self._lock:
+            self._checked_at = None
+
+    def _join(self, key):
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def _leave(self, key, future, result):
+        with self._lock:
+            self._inflight.pop(key, None)
+        # Con None los que esperan calculan su propia respuesta (error o respuesta no cacheable)
+        future.set_result(result)
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+        record_cache(counter != 'misses')
+
+
+_response_caches = {}
+_response_caches_lock = threading.Lock()
+
+
+def response_cache(namespace):
+    """ResponseCache compartida del proceso para un espacio de nombres"""
+    cache = _response_caches.get(namespace)
+    if cache is None:
+        with _response_caches_lock:
+            cache = _response_caches.get(namespace)
+            if cache is None:
+                cache = _response_caches[namespace] = ResponseCache.from_settings(namespace)
+    return cache
+
+
+def request_key(request):
+    """
+    Clave de la petición: ruta, parámetros ordenados (sin los vacíos), tipo
+    de contenido aceptado y host, porque los enlaces de paginación son
+    absolutos.
+    """
+    params = sorted((name, value) for name, values in request.query_params.lists() for value in values if value)
+    raw = f"{request.scheme}://{request.get_host()}{request.path}?{params}:{request.accepted_media_type}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def cached_response(namespace):
+    """
+    Cachear las respuestas JSON de un handler async de una vista de DRF
+    pública (la respuesta no puede depender del usuario) en la
+    ResponseCache `namespace`; al cambiar los datos hay que llamar a
+    response_cache(namespace).invalidate(). Va debajo de conditional_get:
+    un 304 no necesita el cuerpo.
+    """
+
+    def decorator(handler):
+        if not asyncio.iscoroutinefunction(handler):
+            raise TypeError('cached_response requiere un handler async')
+
+        @functools.wraps(handler)
+        async def wrapper(view, request, *args, **kwargs):
+            if request.method != 'GET' or request.accepted_renderer.format != 'json' or not _get_settings()['ENABLED']:
+                return await handler(view, request, *args, **kwargs)
+
+            async def build():
+                response = view.finalize_response(request, await handler(view, request, *args, **kwargs), *args, **kwargs)
+                return await sync_to_async(response.render)()
+
+            return await response_cache(namespace).aget_or_build(request_key(request), build)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,341 @@
+import hashlib
+import math
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from core.cache import shared_cache
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'CAPACITY': 100000,             # entradas esperadas en el filtro
+    'ERROR_RATE': 0.001,            # falsos positivos tolerados
+    'POLL_INTERVAL': 1,             # segundos máximos hasta ver revocaciones de otros workers
+    'FULL_REFRESH_INTERVAL': 3600,  # segundos entre reconstrucciones completas
+    'CONFIRM_CACHE_SIZE': 10000,    # resultados de consultas al almacén recordados
+    # Segundos que cada carga incremental vuelve a leer hacia atrás: una fila
+    # puede confirmarse después de otras más recientes (transacciones largas,
+    # relojes de otros nodos). Debe superar la transacción más larga.
+    'LOOKBACK': 60,
+}
+
+VERSION_KEY = 'revocation:version'
+
+
+def _get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'TOKEN_REVOCATION', {})}
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre un bytearray. Nunca da falsos negativos; la tasa de
+    falsos positivos se mantiene en `error_rate` mientras no se superen
+    `capacity` elementos.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Doble hashing: k posiciones a partir de dos valores de 64 bits
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def _jti_key(jti):
+    return f"jti:{jti}"
+
+
+def _user_key(user_id):
+    return f"user:{user_id}"
+
+
+class RevocationList:
+    """
+    Lista de revocación de tokens JWT con un filtro de Bloom en memoria.
+
+    El almacén persistente son las tablas RevokedToken (JTIs) y TokenNotBefore
+    (tokens de un usuario emitidos antes de una fecha). Cada proceso mantiene
+    un filtro con todas las claves vigentes: si una clave no está en el
+    filtro el token no está revocado y no hay I/O. Un positivo se confirma
+    contra el almacén (puede ser un falso positivo) y el resultado se recuerda
+    hasta la siguiente actualización.
+
+    Las revocaciones publican una versión nueva en shared_cache (también al
+    confirmar la transacción); cada worker la consulta como máximo una vez
+    cada POLL_INTERVAL segundos y, si cambió, carga las filas creadas o
+    modificadas desde LOOKBACK segundos antes de la carga anterior. Un único
+    hilo por proceso actualiza el filtro a la vez; el resto sigue usando el
+    filtro vigente.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001, poll_interval=1,
+                 full_refresh_interval=3600, confirm_cache_size=10000, lookback=60, enabled=True):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.poll_interval = poll_interval
+        self.full_refresh_interval = full_refresh_interval
+        self.confirm_cache_size = confirm_cache_size
+        self.lookback = lookback
+        self.enabled = enabled
+        self.stats = {'checks': 0, 'filter_hits': 0, 'false_positives': 0, 'revoked': 0}
+        self._bloom = None
+        self._confirmed = OrderedDict()
+        self._version = None
+        self._checked_at = None
+        self._built_at = None
+        self._loaded_at = None
+        self._lock = threading.RLock()
+        # Serializa rebuild y las cargas incrementales
+        self._refresh_lock = threading.RLock()
+
+    @classmethod
+    def from_settings(cls):
+        conf = _get_settings()
+        return cls(
+            capacity=conf['CAPACITY'],
+            error_rate=conf['ERROR_RATE'],
+            poll_interval=conf['POLL_INTERVAL'],
+            full_refresh_interval=conf['FULL_REFRESH_INTERVAL'],
+            confirm_cache_size=conf['CONFIRM_CACHE_SIZE'],
+            lookback=conf['LOOKBACK'],
+            enabled=conf['ENABLED'],
+        )
+
+    def is_revoked(self, token):
+        """Indicar si un token validado (o su payload) fue revocado"""
+        if not self.enabled:
+            return False
+
+        self._refresh_if_needed()
+        jti = token.get(api_settings.JTI_CLAIM)
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        iat = token.get('iat')
+        with self._lock:
+            self.stats['checks'] += 1
+            bloom = self._bloom
+
+        if jti and _jti_key(jti) in bloom:
+            if self._confirm(_jti_key(jti), lambda: self._jti_revoked(jti)):
+                return self._count_revoked()
+
+        if user_id is not None and iat is not None and _user_key(user_id) in bloom:
+            not_before = self._confirm(_user_key(user_id), lambda: self._not_before(user_id))
+            if not_before is not None and iat < not_before:
+                return self._count_revoked()
+
+        return False
+
+    def add_jti(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(_jti_key(jti))
+            self._confirmed.pop(_jti_key(jti), None)
+
+    def add_user(self, user_id):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(_user_key(user_id))
+            self._confirmed.pop(_user_key(user_id), None)
+
+    def rebuild(self):
+        """Reconstruir el filtro completo desde el almacén"""
+        from core.models import RevokedToken, TokenNotBefore
+
+        with self._refresh_lock:
+            now = timezone.now()
+            jtis = list(RevokedToken.objects.filter(expires_at__gt=now).values_list('jti', flat=True))
+            not_before = list(TokenNotBefore.objects.values_list('user_id', flat=True))
+
+            # Si el almacén creció más allá de la capacidad, el filtro crece con él
+            capacity = max(self.capacity, 2 * (len(jtis) + len(not_before)))
+            bloom = BloomFilter(capacity, self.error_rate)
+            for jti in jtis:
+                bloom.add(_jti_key(jti))
+            for user_id in not_before:
+                bloom.add(_user_key(user_id))
+
+            with self._lock:
+                self._bloom = bloom
+                self._confirmed.clear()
+                self._loaded_at = now
+                self._built_at = time.monotonic()
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._confirmed.clear()
+            self._version = None
+            self._checked_at = None
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def _refresh_if_needed(self):
+        if self._pending_refresh(time.monotonic()) is None:
+            return
+        # Sin filtro hay que esperar al primero; con filtro, si otro hilo ya
+        # lo está actualizando se sigue con el vigente
+        with self._lock:
+            blocking = self._bloom is None
+        if not self._refresh_lock.acquire(blocking=blocking):
+            return
+        try:
+            now = time.monotonic()
+            pending = self._pending_refresh(now)
+            if pending is None:
+                return
+            version = shared_cache.get(VERSION_KEY)
+            if pending == 'full':
+                self.rebuild()
+            elif version != self._version:
+                self._load_changes()
+            with self._lock:
+                self._version = version
+                self._checked_at = now
+        finally:
+            self._refresh_lock.release()
+
+    def _pending_refresh(self, now):
+        """'full', 'poll' o None si el filtro está al día"""
+        with self._lock:
+            if self._bloom is None or now - self._built_at >= self.full_refresh_interval:
+                return 'full'
+            if self._checked_at is not None and now - self._checked_at < self.poll_interval:
+                return None
+            return 'poll'
+
+    def _load_changes(self):
+        """
+        Añadir al filtro las filas creadas o modificadas desde LOOKBACK
+        segundos antes de la carga anterior. Un cursor por id o por fecha
+        exacta perdería las filas confirmadas fuera de orden; volver a añadir
+        una clave al filtro no tiene efecto.
+        """
+        from core.models import RevokedToken, TokenNotBefore
+
+        with self._refresh_lock:
+            now = timezone.now()
+            since = self._loaded_at - timedelta(seconds=self.lookback)
+            jtis = list(RevokedToken.objects.filter(revoked_at__gte=since).values_list('jti', flat=True))
+            not_before = list(TokenNotBefore.objects.filter(updated_at__gte=since).values_list('user_id', flat=True))
+
+            with self._lock:
+                for jti in jtis:
+                    self._bloom.add(_jti_key(jti))
+                for user_id in not_before:
+                    self._bloom.add(_user_key(user_id))
+                self._loaded_at = now
+                # Las confirmaciones negativas previas pueden haber dejado de serlo
+                self._confirmed.clear()
+
+    def _confirm(self, key, lookup):
+        with self._lock:
+            if key in self._confirmed:
+                self._confirmed.move_to_end(key)
+                return self._confirmed[key]
+            self.stats['filter_hits'] += 1
+
+        value = lookup()
+        with self._lock:
+            if not value:
+                self.stats['false_positives'] += 1
+            self._confirmed[key] = value
+            while len(self._confirmed) > self.confirm_cache_size:
+                self._confirmed.popitem(last=False)
+        return value
+
+    def _count_revoked(self):
+        with self._lock:
+            self.stats['revoked'] += 1
+        return True
+
+    def _jti_revoked(self, jti):
+        from core.models import RevokedToken
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def _not_before(self, user_id):
+        from core.models import TokenNotBefore
+        value = TokenNotBefore.objects.filter(user_id=user_id).values_list('not_before', flat=True).first()
+        # Misma resolución que el claim iat (segundos enteros)
+        return int(value.timestamp()) if value is not None else None
+
+
+_revocation_list = None
+_revocation_lock = threading.Lock()
+
+
+def get_revocation_list():
+    global _revocation_list
+    if _revocation_list is None:
+        with _revocation_lock:
+            if _revocation_list is None:
+                _revocation_list = RevocationList.from_settings()
+    return _revocation_list
+
+
+def warm_revocation_list():
+    """Construir el filtro al arrancar el worker y no en su primer request"""
+    get_revocation_list().rebuild()
+
+
+def _publish():
+    shared_cache.set(VERSION_KEY, secrets.token_hex(8), timeout=None)
+
+
+def revoke_token(token):
+    """Revocar un token validado (access o refresh) por su JTI hasta que expire"""
+    from core.models import RevokedToken
+
+    jti = token[api_settings.JTI_CLAIM]
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+    RevokedToken.objects.get_or_create(
+        jti=jti,
+        defaults={'user_id': user_id, 'expires_at': expires_at},
+    )
+    get_revocation_list().add_jti(jti)
+    _publish()
+    transaction.on_commit(_publish)
+
+
+def revoke_user_tokens(user_id, when=None):
+    """Revocar todos los tokens del usuario emitidos antes de `when` (ahora)"""
+    from core.models import TokenNotBefore
+
+    TokenNotBefore.objects.update_or_create(
+        user_id=user_id,
+        defaults={'not_before': when or timezone.now()},
+    )
+    get_revocation_list().add_user(user_id)
+    _publish()
+    transaction.on_commit(_publish)
+
+
+def purge_expired():
+    """Borrar los JTIs revocados cuyo token ya expiró; devuelve cuántos se borraron"""
+    from core.models import RevokedToken
+
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,170 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.cache import shared_cache
+
+DEFAULT_SETTINGS = {
+    'ALIASES': [],          # alias de settings.DATABASES que son réplicas de lectura
+    'STICKY_SECONDS': 10,   # segundos que un usuario lee del primario tras escribir
+    # Siempre en el primario: la tabla de la cache es UNLOGGED (no se replica)
+    # y sesiones o admin no justifican leer datos atrasados
+    'PRIMARY_APPS': ['django_cache', 'sessions', 'admin', 'contenttypes'],
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'DATABASE_REPLICAS', {})}
+
+
+def _replicas():
+    return [alias for alias in _get_settings()['ALIASES'] if alias in settings.DATABASES]
+
+
+def _sticky_key(user_id):
+    return f"replica:sticky:{user_id}"
+
+
+class RequestState:
+    """Estado de enrutado de un request: si debe leer del primario y si escribió"""
+
+    __slots__ = ('pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+# Fuera de un request (comandos, hilos de fondo) no hay estado y todo va al primario
+_request_state = ContextVar('replica_request_state', default=None)
+
+
+class ReplicaRouter:
+    """
+    Envía las lecturas de los requests a una réplica y todo lo demás al
+    primario ('default'):
+
+    - Escrituras, y lecturas dentro de transaction.atomic o de apps de
+      PRIMARY_APPS.
+    - Lecturas de un request POST/PUT/PATCH/DELETE o posteriores a una
+      escritura en el mismo request.
+    - Lecturas de un usuario que escribió hace menos de STICKY_SECONDS (ver
+      ReplicaRoutingMiddleware), para que no vea su carrito o sus citas
+      desactualizados por el retraso de replicación.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or state.pinned:
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in _get_settings()['PRIMARY_APPS']:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = _replicas()
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None and model._meta.app_label not in _get_settings()['PRIMARY_APPS']:
+            state.pinned = True
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplicas tienen los mismos datos
+        databases = {DEFAULT_DB_ALIAS, *_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+@contextmanager
+def without_request_routing():
+    """
+    Escrituras internas del request (última actividad, límites de
+    peticiones): van al primario sin fijar el resto del request en él ni
+    marcar al usuario como escritor reciente.
+    """
+    token = _request_state.set(None)
+    try:
+        yield
+    finally:
+        _request_state.reset(token)
+
+
+def pin_to_primary():
+    """Leer del primario el resto del request actual"""
+    state = _request_state.get()
+    if state is not None:
+        state.pinned = True
+
+
+def pin_if_sticky(user_id):
+    """
+    Llamado al autenticar: si el usuario escribió hace poco sus lecturas van
+    al primario. Sin réplicas configuradas no consulta la cache.
+    """
+    state = _request_state.get()
+    if state is None or state.pinned or not _replicas():
+        return
+    if shared_cache.get(_sticky_key(user_id)):
+        state.pinned = True
+
+
+def _begin_request(request):
+    return _request_state.set(RequestState(pinned=request.method not in SAFE_METHODS))
+
+
+def _end_request(request, state):
+    user = getattr(request, 'user', None)
+    if state.wrote and _replicas() and user is not None and user.is_authenticated:
+        shared_cache.set(_sticky_key(user.pk), 1, timeout=_get_settings()['STICKY_SECONDS'])
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Abre el estado de enrutado de cada request y, si el usuario escribió,
+    lo mantiene en el primario STICKY_SECONDS en todos los workers.
+    Funciona en modo síncrono y async sin cambiar de hilo.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _begin_request(request)
+        state = _request_state.get()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        _end_request(request, state)
+        return response
+
+    async def __acall__(self, request):
+        token = _begin_request(request)
+        state = _request_state.get()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state.wrote:
+            await sync_to_async(_end_request)(request, state)
+        return response
@@ -0,0 +1,143 @@
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.renderers import OpenAPIRenderer, SwaggerJSONRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'PATH': 'openapi.json',  # relativo a BASE_DIR
+    'MAX_AGE': 3600,         # segundos que el navegador reutiliza el documento sin revalidar
+}
+
+API_INFO = openapi.Info(
+    title="API Documentation",
+    default_version='v1',
+)
+
+
+def _get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'OPENAPI_SCHEMA', {})}
+
+
+class SchemaDocument:
+    """Documento OpenAPI en JSON ya codificado, con su ETag"""
+
+    def __init__(self, content):
+        self.content = content
+        self.etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+class SchemaStore:
+    """
+    Documento OpenAPI precalculado en disco (build_openapi_schema en cada
+    despliegue). Se lee una vez por proceso y se vuelve a leer si el archivo
+    cambia. Si no existe, el documento se genera en el primer request y se
+    guarda en memoria, no en disco.
+    """
+
+    def __init__(self, path, max_age=3600):
+        self.path = Path(path)
+        self.max_age = max_age
+        self._document = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        conf = _get_settings()
+        return cls(path=Path(settings.BASE_DIR) / conf['PATH'], max_age=conf['MAX_AGE'])
+
+    def get(self):
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+
+        with self._lock:
+            if self._document is not None and mtime == self._mtime:
+                return self._document
+            if mtime is not None:
+                self._document = SchemaDocument(self.path.read_bytes())
+            elif self._document is None or self._mtime is not None:
+                logger.warning("No existe %s; generando el esquema OpenAPI en el request", self.path)
+                self._document = SchemaDocument(generate_schema())
+            self._mtime = mtime
+            return self._document
+
+    def build(self):
+        """Generar el documento y escribirlo en disco de forma atómica"""
+        content = generate_schema()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f'.tmp{os.getpid()}')
+        tmp.write_bytes(content)
+        os.replace(tmp, self.path)
+        with self._lock:
+            self._document = None
+        return SchemaDocument(content)
+
+
+def generate_schema():
+    """Introspeccionar todas las vistas y devolver el documento en JSON"""
+    # Las vistas que miran self.request necesitan uno; sin host en el
+    # documento Swagger UI usa el del servidor que lo sirve
+    request = APIView().initialize_request(APIRequestFactory().get('/swagger/', {'format': 'openapi'}))
+    request.user = AnonymousUser()
+    generator = CachedSchemaView.generator_class(API_INFO, url='')
+    schema = generator.get_schema(request=request, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+_schema_store = None
+_schema_store_lock = threading.Lock()
+
+
+def get_schema_store():
+    global _schema_store
+    if _schema_store is None:
+        with _schema_store_lock:
+            if _schema_store is None:
+                _schema_store = SchemaStore.from_settings()
+    return _schema_store
+
+
+_SchemaView = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+
+class CachedSchemaView(_SchemaView):
+    """
+    Vistas de documentación de drf_yasg que sirven el JSON del esquema desde
+    SchemaStore con ETag y Cache-Control en vez de generarlo en cada request.
+    Las páginas de Swagger UI y ReDoc no introspeccionan las vistas y se
+    mantienen; el YAML sigue generándose al pedirlo.
+    """
+
+    def get(self, request, version='', format=None):
+        if not isinstance(request.accepted_renderer, (OpenAPIRenderer, SwaggerJSONRenderer)):
+            return super().get(request, version, format)
+
+        store = get_schema_store()
+        document = store.get()
+        response = get_conditional_response(request, etag=document.etag)
+        if response is None:
+            response = HttpResponse(document.content, content_type=request.accepted_renderer.media_type)
+        response['ETag'] = document.etag
+        patch_cache_control(response, public=True, max_age=store.max_age)
+        return response
@@ -36,7 +36,11 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def validate(self, attrs):
         username = attrs.get('username')
         password = attrs.get('password')
-        user = authenticate(username=username, password=password)
+        user = authenticate(
+            request=self.context.get('request'),
+            username=username,
+            password=password
+        )
         if user is None:
             raise serializers.ValidationError(
                 {'detail': _('No tiene cuenta registrada')},
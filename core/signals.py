@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.conditional import PROFILE_VERSION, bump_version
+from core.models import User
+from core.principal import invalidate_principal
+from core.token_cache import get_token_cache
+from providers.models import Provider
+from users.models import UserProfile
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_principal(sender, instance, **kwargs):
+    """Descartar los datos de autenticación y los tokens verificados del usuario"""
+    invalidate_principal(instance.pk)
+    get_token_cache().invalidate_user(instance.pk)
+    bump_version(PROFILE_VERSION, instance.pk)
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_principal(sender, instance, **kwargs):
+    """Descartar los datos cacheados cuando cambia el perfil del usuario"""
+    invalidate_principal(instance.user_id)
+    bump_version(PROFILE_VERSION, instance.user_id)
+
+@receiver(post_save, sender=Provider)
+@receiver(post_delete, sender=Provider)
+def bump_provider_profile_version(sender, instance, **kwargs):
+    """El perfil de proveedor (ProviderProfileView) incluye datos de Provider"""
+    bump_version(PROFILE_VERSION, instance.user_id)
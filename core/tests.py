@@ -1,15 +1,71 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import authenticate
 from django.core.cache import cache
-from rest_framework.test import APITestCase, APIClient
+from rest_framework.test import APITestCase, APITransactionTestCase, APIClient, APIRequestFactory
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
 from datetime import date, timedelta
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+from django.conf import settings
+from django.utils import timezone
+import asyncio
+import json
+import os
+import runpy
+import threading
+import time
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.test import AsyncClient
+from django.http import HttpResponse
+from django.db import connection
+from django.contrib.sessions.models import Session
+import unittest
 
 from core.models import User
+from core.last_seen import LastSeenTracker, get_tracker
+from core.principal import get_principal, principal_cache_key
+from core.authentication import CustomJWTAuthentication
+from core.backends import UsernameOrPhoneBackend
+from core.cache import LocalLRUCache, TieredCache, tiered_cache
+from core.ratelimit import (
+    DatabaseRateLimitStore, LocalRateLimitStore, RateLimiter, get_rate_limiter, normalize_identifier, parse_rate,
+)
+from core.passwords import PasswordHashingService, PasswordHashingUnavailable
+from core.token_cache import VerifiedTokenCache, get_token_cache
+from core.warmup import warm_caches
+from core.db import is_pooled, pool_stats
+from core.routers import ReplicaRouter, RequestState, _request_state, _sticky_key, pin_if_sticky
+from core.cache import shared_cache
+from core.schema import SchemaStore
+from core.renderers import FastJSONRenderer
+from core.parsers import FastJSONParser
+from core.conditional import PROFILE_VERSION, get_version
+from core.queries import optimize_queryset
+from core.response_cache import ResponseCache
+from core.instrumentation import get_instrumentation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import JSONParser
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.serializer_helpers import ReturnDict
+from decimal import Decimal
+import datetime
+import uuid
+from django.core.management import call_command
+import io
+import tempfile
+from pathlib import Path
+from core.revocation import BloomFilter, RevocationList, get_revocation_list, revoke_token, revoke_user_tokens
 from core.serializers import UserSerializer, CustomTokenObtainPairSerializer
 from users.models import UserProfile
+from users.appointments.models import Appointment
+from users.appointments.views import check_appointment_availability
+from users.carts.models import Cart
+from providers.models import Provider
+from providers.services.models import Category, Service
+from providers.services.views import CATEGORY_CACHE, ServiceListView
+from providers.services.serializers import ProviderServiceSerializer
 
 
 class UserModelTest(TestCase):
@@ -323,3 +379,2144 @@ class UserPermissionsTest(TestCase):
         self.assertTrue(self.consumer.disabled)
         self.assertIsNotNone(self.consumer.disabled_at)
         self.assertEqual(self.consumer.disabled_reason, "Violación de términos")
+
+
+class LastSeenTrackerTest(APITestCase):
+    """Tests del registro diferido de última actividad"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='seenuser',
+            phone='+593995555555',
+            password='testpass123',
+            role=User.Role.CONSUMER
+        )
+        self.other = User.objects.create_user(
+            username='seenuser2',
+            phone='+593995555556',
+            password='testpass123',
+            role=User.Role.CONSUMER
+        )
+
+    def test_flush_writes_all_users_in_one_query(self):
+        """Test que el flush escribe todas las marcas en un solo UPDATE"""
+        tracker = LastSeenTracker(flush_interval=3600, flush_size=100, min_interval=0)
+        tracker.touch(self.user.pk)
+        tracker.touch(self.other.pk)
+        self.assertEqual(tracker.pending_count(), 2)
+
+        with self.assertNumQueries(1):
+            updated = tracker.flush()
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(tracker.pending_count(), 0)
+        self.user.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen)
+        self.assertIsNotNone(self.other.last_seen)
+
+    def test_min_interval_coalesces_touches(self):
+        """Test que la granularidad limita a una marca por usuario"""
+        tracker = LastSeenTracker(flush_interval=3600, flush_size=100, min_interval=300)
+        now = timezone.now()
+        self.assertTrue(tracker.touch(self.user.pk, when=now))
+        self.assertFalse(tracker.touch(self.user.pk, when=now + timedelta(minutes=1)))
+        self.assertTrue(tracker.touch(self.user.pk, when=now + timedelta(minutes=6)))
+        self.assertEqual(tracker.pending_count(), 1)
+
+    def test_flush_size_threshold(self):
+        """Test que alcanzar el tamaño máximo dispara la escritura"""
+        tracker = LastSeenTracker(flush_interval=3600, flush_size=2, min_interval=0)
+        tracker.touch(self.user.pk)
+        self.assertEqual(tracker.pending_count(), 1)
+        tracker.touch(self.other.pk)
+        self.assertEqual(tracker.pending_count(), 0)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen)
+
+    def test_authenticated_request_does_not_update_user_row(self):
+        """Test que un request autenticado no guarda la fila del usuario"""
+        get_tracker().reset()
+        updated_at = self.user.updated_at
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        response = self.client.get('/api/carts/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.updated_at, updated_at)
+        self.assertEqual(get_tracker().pending_count(), 1)
+
+
+class PrincipalCacheTest(APITestCase):
+    """Tests de la cache de datos de autenticación"""
+
+    def setUp(self):
+        cache.clear()
+        get_tracker().reset()
+        self.user = User.objects.create_user(
+            username='principal',
+            phone='+593996666666',
+            password='testpass123',
+            role=User.Role.CONSUMER
+        )
+
+    def test_cache_hit_runs_no_queries(self):
+        """Test que un acierto de cache no consulta la base de datos"""
+        with self.assertNumQueries(1):
+            get_principal(self.user.pk)
+        with self.assertNumQueries(0):
+            principal = get_principal(self.user.pk)
+        self.assertEqual(principal.pk, self.user.pk)
+        self.assertEqual(principal.role, User.Role.CONSUMER)
+        self.assertTrue(principal.is_active)
+
+    def test_missing_user_raises(self):
+        """Test que un usuario inexistente lanza DoesNotExist"""
+        with self.assertRaises(User.DoesNotExist):
+            get_principal(999999)
+
+    def test_user_save_invalidates_cache(self):
+        """Test que guardar el usuario invalida la entrada"""
+        get_principal(self.user.pk)
+        self.user.disabled = True
+        self.user.disabled_reason = 'Fraude'
+        self.user.save()
+        with self.assertNumQueries(1):
+            principal = get_principal(self.user.pk)
+        self.assertTrue(principal.disabled)
+        self.assertEqual(principal.disabled_reason, 'Fraude')
+
+    def test_bulk_update_invalidates_cache(self):
+        """Test que un update() masivo, sin señales, invalida las entradas"""
+        get_principal(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(disabled=True)
+        with self.assertNumQueries(1):
+            principal = get_principal(self.user.pk)
+        self.assertTrue(principal.disabled)
+
+    def test_bulk_update_of_other_fields_keeps_cache(self):
+        """Test que un update() que no toca campos de autenticación conserva las entradas"""
+        get_principal(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(last_seen=timezone.now())
+        with self.assertNumQueries(0):
+            get_principal(self.user.pk)
+
+    def test_stale_entry_is_not_served(self):
+        """Test que una entrada guardada con una versión anterior no se usa"""
+        key = principal_cache_key(self.user.pk)
+        get_principal(self.user.pk)
+        stale = cache.get(key)
+        User.objects.filter(pk=self.user.pk).update(role=User.Role.PROVIDER)
+        cache.set(key, stale)
+        self.assertEqual(get_principal(self.user.pk).role, User.Role.PROVIDER)
+
+    def test_profile_save_invalidates_cache(self):
+        """Test que guardar el perfil invalida la entrada"""
+        get_principal(self.user.pk)
+        UserProfile.objects.create(
+            user=self.user,
+            firstname='Test',
+            lastname='User',
+            email='principal@example.com',
+            birth_date=date(1990, 1, 1)
+        )
+        with self.assertNumQueries(1):
+            get_principal(self.user.pk)
+
+    def test_profile_bulk_update_invalidates_cache(self):
+        """Test que un update() masivo de perfiles invalida las entradas"""
+        UserProfile.objects.create(
+            user=self.user,
+            firstname='Test',
+            lastname='User',
+            email='principal@example.com',
+            birth_date=date(1990, 1, 1)
+        )
+        get_principal(self.user.pk)
+        UserProfile.objects.filter(user=self.user).update(firstname='Otro')
+        with self.assertNumQueries(1):
+            get_principal(self.user.pk)
+
+    def test_deferred_fields_load_on_access(self):
+        """Test que los campos no cacheados se cargan al usarlos"""
+        get_principal(self.user.pk)
+        principal = get_principal(self.user.pk)
+        self.assertTrue(principal.check_password('testpass123'))
+
+    def test_authenticate_with_cache_hit_runs_no_queries(self):
+        """Test que autenticar un request con la cache llena no hace consultas"""
+        token = RefreshToken.for_user(self.user).access_token
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        authentication = CustomJWTAuthentication()
+        authentication.authenticate(request)
+
+        with self.assertNumQueries(0):
+            user, _ = authentication.authenticate(request)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_suspended_user_is_rejected(self):
+        """Test que un usuario suspendido no puede autenticarse"""
+        self.user.disabled = True
+        self.user.save()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get('/api/carts/')
+        self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+        self.assertEqual(response.data['detail'].code, 'authentication_error')
+
+
+class UsernameOrPhoneBackendTest(APITestCase):
+    """Tests del backend de login por username o teléfono"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='loginuser',
+            phone='+593997777777',
+            password='testpass123',
+            role=User.Role.CONSUMER
+        )
+
+    def test_login_by_phone_single_query(self):
+        """Test login por teléfono con una sola consulta"""
+        with self.assertNumQueries(1):
+            user = authenticate(username='+593997777777', password='testpass123')
+        self.assertEqual(user, self.user)
+
+    def test_unknown_identifier_single_query(self):
+        """Test que un identificador inexistente no prueba otro backend"""
+        with self.assertNumQueries(1):
+            user = authenticate(username='nadie', password='testpass123')
+        self.assertIsNone(user)
+
+    def test_wrong_password_single_query(self):
+        """Test que una contraseña incorrecta no repite la búsqueda"""
+        with self.assertNumQueries(1):
+            user = authenticate(username='loginuser', password='wrongpass')
+        self.assertIsNone(user)
+
+    def test_username_takes_precedence_over_phone(self):
+        """Test que el username tiene prioridad si coincide con el teléfono de otro usuario"""
+        other = User.objects.create_user(
+            username='+593997777777x',
+            phone='loginuser',
+            password='otherpass123'
+        )
+        self.assertEqual(UsernameOrPhoneBackend().get_user_by_identifier('loginuser'), self.user)
+        self.assertEqual(UsernameOrPhoneBackend().get_user_by_identifier('+593997777777x'), other)
+
+    def test_token_view_reports_query_count(self):
+        """Test que la vista de token reporta sus consultas"""
+        response = self.client.post('/api/auth/api/token/', {
+            'username': '+593997777777',
+            'password': 'testpass123'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Query-Count'], '1')
+
+
+class PasswordHashingServiceTest(APITestCase):
+    """Tests del servicio de hashing y de la política de hashers"""
+
+    def setUp(self):
+        self.service = PasswordHashingService(executor='thread', max_workers=2, warn_in_transaction=False)
+        self.addCleanup(self.service.shutdown)
+
+    def test_hash_and_verify_in_pool(self):
+        """Test que el hash calculado en el pool se verifica correctamente"""
+        encoded = self.service.hash_password('testpass123')
+        self.assertEqual(self.service.verify('testpass123', encoded), (True, False))
+        self.assertEqual(self.service.verify('wrongpass', encoded), (False, False))
+
+    def test_invalid_executor(self):
+        """Test que un executor desconocido se rechaza"""
+        with self.assertRaises(ValueError):
+            PasswordHashingService(executor='gpu')
+
+    def test_iterations_from_settings(self):
+        """Test que las iteraciones de PBKDF2 salen de la configuración"""
+        with self.settings(PASSWORD_HASHING={'PBKDF2_ITERATIONS': 1000}):
+            encoded = self.service.hash_password('testpass123')
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$1000$'))
+
+    def test_rehash_on_login_when_iterations_change(self):
+        """Test que el login actualiza el hash si cambian las iteraciones"""
+        with self.settings(PASSWORD_HASHING={'PBKDF2_ITERATIONS': 1000}):
+            user = User.objects.create_user(username='rehash', phone='+593996666666', password='testpass123')
+
+        with self.settings(PASSWORD_HASHING={'PBKDF2_ITERATIONS': 2000}):
+            self.assertEqual(authenticate(username='rehash', password='testpass123'), user)
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$2000$'))
+        self.assertTrue(user.check_password('testpass123'))
+
+    def test_rehash_on_login_when_hasher_changes(self):
+        """Test que el login migra el hash al nuevo hasher preferido"""
+        user = User.objects.create_user(username='rehash', phone='+593996666666', password='testpass123')
+
+        with self.settings(PASSWORD_HASHERS=[
+            'django.contrib.auth.hashers.ScryptPasswordHasher',
+            'core.hashers.ConfigurablePBKDF2PasswordHasher',
+        ]):
+            self.assertEqual(authenticate(username='rehash', password='testpass123'), user)
+            user.refresh_from_db()
+            self.assertTrue(user.password.startswith('scrypt$'))
+            self.assertTrue(user.check_password('testpass123'))
+
+    def test_wrong_password_does_not_rehash(self):
+        """Test que una contraseña incorrecta no modifica el hash"""
+        with self.settings(PASSWORD_HASHING={'PBKDF2_ITERATIONS': 1000}):
+            user = User.objects.create_user(username='rehash', phone='+593996666666', password='testpass123')
+        encoded = user.password
+
+        self.assertFalse(self.service.check_password(user, 'wrongpass'))
+        user.refresh_from_db()
+        self.assertEqual(user.password, encoded)
+
+    def test_timeout_raises_service_unavailable(self):
+        """Test que un hash sin resultado a tiempo lanza un 503 con Retry-After"""
+        service = PasswordHashingService(executor='thread', max_workers=1, timeout=0.01, warn_in_transaction=False)
+        self.addCleanup(service.shutdown)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        service._get_pool().submit(release.wait)
+
+        with self.assertLogs('core.passwords', level='WARNING'), \
+                self.assertRaises(PasswordHashingUnavailable) as raised:
+            service.hash_password('testpass123')
+        self.assertEqual(raised.exception.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(raised.exception.wait, 0.01)
+
+    def test_login_timeout_returns_503(self):
+        """Test que el login responde 503 y no 500 si el pool está saturado"""
+        User.objects.create_user(username='busy', phone='+593996666666', password='testpass123')
+        with patch('core.passwords.PasswordHashingService.verify', side_effect=PasswordHashingUnavailable(wait=10)):
+            response = self.client.post('/api/auth/api/token/', {'username': 'busy', 'password': 'testpass123'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '10')
+
+    def test_change_password_timeout_returns_503(self):
+        """Test que el cambio de contraseña responde 503 y no 500 si el pool está saturado"""
+        user = User.objects.create_user(username='busy', phone='+593996666666', password='testpass123')
+        self.client.force_authenticate(user=user)
+        with patch('users.views.hash_password', side_effect=PasswordHashingUnavailable(wait=10)):
+            response = self.client.post('/api/users/change-password/', {
+                'current_password': 'testpass123',
+                'new_password': 'newpass456',
+                'confirm_password': 'newpass456',
+            })
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@override_settings(PASSWORD_HASHING={'WARN_IN_TRANSACTION': True})
+class PasswordHashingTransactionTest(APITransactionTestCase):
+    """Tests de la advertencia por hashes dentro de transacciones (sin la transacción de TestCase)"""
+
+    def setUp(self):
+        self.service = PasswordHashingService.from_settings()
+        self.addCleanup(self.service.shutdown)
+
+    def test_registration_hashes_outside_transaction(self):
+        """Test que el registro calcula el hash antes de abrir la transacción"""
+        with self.assertNoLogs('core.passwords', level='WARNING'):
+            response = self.client.post('/api/users/guest/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_hash_inside_transaction_logs_warning(self):
+        """Test que se advierte al calcular un hash dentro de una transacción"""
+        from django.db import transaction
+        with self.assertLogs('core.passwords', level='WARNING'):
+            with transaction.atomic():
+                self.service.hash_password('testpass123')
+
+
+class TieredCacheTest(TestCase):
+    """Tests de la cache de dos niveles (L1 por proceso + L2 compartida)"""
+
+    def setUp(self):
+        cache.clear()
+        # Dos instancias con el mismo espacio de nombres simulan dos workers
+        self.worker_a = TieredCache('test', poll_interval=0)
+        self.worker_b = TieredCache('test', poll_interval=0)
+
+    def test_get_or_set_fills_both_tiers(self):
+        """Test que un valor calculado queda en L1 y en L2"""
+        self.assertEqual(self.worker_a.get_or_set('key', lambda: 'value'), 'value')
+        self.assertEqual(self.worker_a.get('key'), 'value')
+        self.assertEqual(self.worker_a.stats()['l1'], {'hits': 1, 'misses': 1})
+        self.assertEqual(self.worker_a.stats()['l2'], {'hits': 0, 'misses': 1})
+
+    def test_l2_shared_between_workers(self):
+        """Test que otro worker encuentra el valor en L2 y lo sube a su L1"""
+        self.worker_a.set('key', 'value')
+
+        self.assertEqual(self.worker_b.get('key'), 'value')
+        self.assertEqual(self.worker_b.get('key'), 'value')
+        self.assertEqual(self.worker_b.stats(), {
+            'l1': {'hits': 1, 'misses': 1},
+            'l2': {'hits': 1, 'misses': 0},
+        })
+
+    def test_invalidation_reaches_other_workers(self):
+        """Test que una invalidación vacía la L1 de los demás workers"""
+        self.worker_a.set('key', 'old')
+        self.assertEqual(self.worker_b.get('key'), 'old')
+
+        self.worker_a.invalidate()
+
+        self.assertIsNone(self.worker_b.get('key'))
+        self.assertEqual(len(self.worker_b.l1), 0)
+
+    def test_invalidation_delayed_until_poll_interval(self):
+        """Test que la versión sólo se consulta una vez por intervalo"""
+        worker = TieredCache('test', poll_interval=60)
+        worker.set('key', 'old')
+        self.worker_a.invalidate()
+
+        self.assertEqual(worker.get('key'), 'old')
+        with patch('core.cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(worker.get('key'))
+
+    def test_local_lru_evicts_and_expires(self):
+        """Test que el L1 descarta la entrada menos usada y las expiradas"""
+        lru = LocalLRUCache(max_entries=2, timeout=30)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+
+        with patch('core.cache.time.monotonic', return_value=time.monotonic() + 31):
+            self.assertIsNone(lru.get('a'))
+
+
+class ResponseCacheTest(TestCase):
+    """Tests de la cache de respuestas versionada (core/response_cache.py)"""
+
+    def setUp(self):
+        cache.clear()
+        self.cache = ResponseCache('test-responses', poll_interval=0)
+        self.builds = 0
+
+    def _builder(self, body, status_code=200, delay=0):
+        async def build():
+            self.builds += 1
+            await asyncio.sleep(delay)
+            return HttpResponse(body, content_type='application/json', status=status_code)
+        return build
+
+    def _get(self, key, build):
+        return async_to_sync(self.cache.aget_or_build)(key, build)
+
+    def _concurrent(self, *calls):
+        async def run():
+            return await asyncio.gather(*(self.cache.aget_or_build(key, build) for key, build in calls))
+        return async_to_sync(run)()
+
+    def test_hit_until_invalidated(self):
+        """Test que la respuesta se sirve desde la cache hasta que se invalida"""
+        self.assertEqual(self._get('page', self._builder(b'[1]')).content, b'[1]')
+        cached = self._get('page', self._builder(b'[2]'))
+        self.assertEqual((cached.content, cached.data), (b'[1]', [1]))
+        self.assertEqual(self.builds, 1)
+
+        self.cache.invalidate()
+        self.assertEqual(self._get('page', self._builder(b'[2]')).content, b'[2]')
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'stale': 0, 'misses': 2})
+
+    def test_invalidation_reaches_other_workers(self):
+        """Test que otro worker ve la versión nueva al consultar la versión"""
+        worker = ResponseCache('test-responses', poll_interval=60)
+        self.assertEqual(async_to_sync(worker.aget_or_build)('page', self._builder(b'old')).content, b'old')
+        self.cache.invalidate()
+
+        self.assertEqual(async_to_sync(worker.aget_or_build)('page', self._builder(b'new')).content, b'old')
+        with patch('core.response_cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(async_to_sync(worker.aget_or_build)('page', self._builder(b'new')).content, b'new')
+
+    def test_concurrent_misses_build_once(self):
+        """Test que los fallos concurrentes de una clave esperan a una sola reconstrucción"""
+        responses = self._concurrent(*[('page', self._builder(b'[1]', delay=0.05))] * 10)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual({response.content for response in responses}, {b'[1]'})
+
+    def test_stale_served_while_rebuilding(self):
+        """Test que tras un cambio se sirve la versión anterior mientras otro request reconstruye"""
+        self._get('page', self._builder(b'old'))
+        self.cache.invalidate()
+
+        leader, follower = self._concurrent(('page', self._builder(b'new', delay=0.05)), ('page', self._builder(b'new')))
+        self.assertEqual((leader.content, follower.content), (b'new', b'old'))
+        self.assertEqual(self.builds, 2)
+        self.assertEqual(self.cache.stats()['stale'], 1)
+
+        # Pasado STALE_TTL los requests esperan a la versión nueva
+        self.cache.invalidate()
+        with patch('core.response_cache.time.time', return_value=time.time() + self.cache.stale_ttl):
+            responses = self._concurrent(*[('page', self._builder(b'newer', delay=0.05))] * 2)
+        self.assertEqual([response.content for response in responses], [b'newer', b'newer'])
+
+    def test_errors_not_cached(self):
+        """Test que sólo se guardan las respuestas 200"""
+        self._get('page', self._builder(b'{}', status_code=404))
+        self.assertEqual(self._get('page', self._builder(b'[1]')).status_code, 200)
+        self.assertEqual(self.builds, 2)
+
+
+class RateLimitTest(APITestCase):
+    """Tests del rate limiting GCRA"""
+
+    def setUp(self):
+        cache.clear()
+        get_rate_limiter().fallback.reset()
+        self.user = User.objects.create_user(
+            username='limited',
+            phone='+593997777777',
+            password='testpass123',
+            role=User.Role.CONSUMER
+        )
+
+    def login(self, username='limited', ip='10.0.0.1'):
+        return self.client.post('/api/auth/api/token/', {
+            'username': username,
+            'password': 'testpass123'
+        }, REMOTE_ADDR=ip)
+
+    def test_parse_rate(self):
+        """Test formatos de rate soportados"""
+        self.assertEqual(parse_rate('5/min'), (5, 60))
+        self.assertEqual(parse_rate('100/hour'), (100, 3600))
+        self.assertEqual(parse_rate('1/5m'), (1, 300))
+        with self.assertRaises(ValueError):
+            parse_rate('cinco')
+
+    def test_gcra_allows_burst_then_spaces_requests(self):
+        """Test que se permite la ráfaga y luego una petición por intervalo"""
+        limiter = RateLimiter(LocalRateLimitStore())
+        with patch('core.ratelimit.time.time', return_value=1000.0):
+            results = [limiter.hit('key', '3/min') for _ in range(4)]
+        self.assertEqual([r.allowed for r in results], [True, True, True, False])
+        self.assertEqual([r.remaining for r in results[:3]], [2, 1, 0])
+        self.assertAlmostEqual(results[3].retry_after, 20)
+
+        with patch('core.ratelimit.time.time', return_value=1020.0):
+            self.assertTrue(limiter.hit('key', '3/min').allowed)
+            self.assertFalse(limiter.hit('key', '3/min').allowed)
+
+    def test_falls_back_to_local_store(self):
+        """Test que si el almacén compartido falla se limita localmente"""
+        store = MagicMock()
+        store.hit.side_effect = ConnectionError
+        limiter = RateLimiter(store)
+
+        with self.assertLogs('core.ratelimit', level='WARNING'):
+            results = [limiter.hit('key', '2/min') for _ in range(3)]
+        self.assertEqual([r.allowed for r in results], [True, True, False])
+
+    def test_login_limited_per_username(self):
+        """Test que el login se limita por identificador aunque cambie la IP"""
+        with self.settings(REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'login_ip': '100/min', 'login_user': '2/min'},
+        }):
+            statuses = [self.login(ip=f'10.0.0.{n}').status_code for n in range(3)]
+            other = self.login(username='+593997777777', ip='10.0.0.9')
+
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(other.status_code, status.HTTP_200_OK)
+
+    def test_login_limited_per_ip(self):
+        """Test que el login se limita por IP"""
+        with self.settings(REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'login_ip': '1/min', 'login_user': '100/min'},
+        }):
+            first = self.login()
+            second = self.login(username='otro')
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', second)
+
+    def test_otp_limited_per_phone(self):
+        """Test que sólo se envía un OTP por teléfono en la ventana"""
+        first = self.client.post('/api/users/otp/send/', {'phone': '+593997777777'})
+        second = self.client.post('/api/users/otp/send/', {'phone': '+593 99 777 7777'}, REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Ya se ha enviado un código', second.data['detail'])
+
+    def test_otp_limited_per_normalized_phone(self):
+        """Test que el mismo teléfono con y sin prefijo internacional comparte límite"""
+        first = self.client.post('/api/users/otp/send/', {'phone': '+593997777777'})
+        second = self.client.post('/api/users/otp/send/', {'phone': '0997777777'}, REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_normalize_identifier(self):
+        """Test que los teléfonos se normalizan a E.164 y el resto a minúsculas"""
+        self.assertEqual(normalize_identifier('099 777 7777'), '+593997777777')
+        self.assertEqual(normalize_identifier('+593 99 777 7777'), '+593997777777')
+        self.assertEqual(normalize_identifier(' Limited '), 'limited')
+        self.assertEqual(normalize_identifier('12345'), '12345')
+
+    def test_ip_ignores_forwarded_for_without_proxies(self):
+        """Test que sin NUM_PROXIES la IP es REMOTE_ADDR y X-Forwarded-For no cambia el límite"""
+        with self.settings(REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'login_ip': '1/min', 'login_user': '100/min'},
+        }):
+            first = self.client.post('/api/auth/api/token/', {'username': 'limited', 'password': 'testpass123'},
+                                     REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.1.1.1')
+            second = self.client.post('/api/auth/api/token/', {'username': 'otro', 'password': 'testpass123'},
+                                      REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='2.2.2.2')
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_disabled(self):
+        """Test que RATE_LIMITING['ENABLED'] desactiva los límites"""
+        with self.settings(RATE_LIMITING={'ENABLED': False}):
+            responses = [self.client.post('/api/users/otp/send/', {'phone': '+593997777777'}) for _ in range(2)]
+        self.assertEqual([r.status_code for r in responses], [200, 200])
+
+
+class DatabaseRateLimitStoreTest(APITransactionTestCase):
+    """Tests del almacén de rate limiting del backend 'database' (sentencias de PostgreSQL)"""
+
+    def setUp(self):
+        self.limiter = RateLimiter(DatabaseRateLimitStore())
+
+    def test_allows_burst_then_rejects(self):
+        """Test que se permite la ráfaga y se rechaza el resto con Retry-After"""
+        results = [self.limiter.hit('key', '2/min') for _ in range(3)]
+
+        self.assertEqual([r.allowed for r in results], [True, True, False])
+        self.assertEqual([r.remaining for r in results[:2]], [1, 0])
+        self.assertAlmostEqual(results[2].retry_after, 30, delta=1)
+
+    def test_concurrent_hits_never_exceed_limit(self):
+        """Test que peticiones simultáneas de la misma clave no superan el límite"""
+        from django.db import connections
+        barrier = threading.Barrier(10)
+        results = []
+
+        def hit():
+            try:
+                barrier.wait()
+                results.append(self.limiter.hit('concurrent', '5/min').allowed)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=hit) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 5)
+
+    def test_prunes_expired_rows(self):
+        """Test que las filas vencidas se borran periódicamente"""
+        from core.models import RateLimitBucket
+        RateLimitBucket.objects.create(key='ratelimit:old', tat=0)
+
+        DatabaseRateLimitStore(prune_every=1).hit('new', 1000, 1000)
+
+        self.assertEqual(list(RateLimitBucket.objects.values_list('key', flat=True)), ['ratelimit:new'])
+
+
+class VerifiedTokenCacheTest(APITestCase):
+    """Tests de la cache de tokens JWT verificados"""
+
+    def setUp(self):
+        self.cache = VerifiedTokenCache(max_entries=2)
+        self.user = User.objects.create_user(
+            username='tokencache',
+            phone='+593998888888',
+            password='testpass123',
+            role=User.Role.CONSUMER
+        )
+        self.raw_token = str(RefreshToken.for_user(self.user).access_token).encode()
+        # Verificación real de simplejwt, sin la cache
+        self.validate = MagicMock(side_effect=JWTAuthentication().get_validated_token)
+
+    def test_repeated_token_verified_once(self):
+        """Test que un token repetido no se vuelve a verificar"""
+        first = self.cache.get_validated_token(self.raw_token, self.validate)
+        second = self.cache.get_validated_token(self.raw_token, self.validate)
+
+        self.assertIs(first, second)
+        self.assertEqual(second['user_id'], self.user.pk)
+        self.assertEqual(self.validate.call_count, 1)
+
+    def test_expired_entry_is_verified_again(self):
+        """Test que una entrada vencida no se sirve desde cache"""
+        token = self.cache.get_validated_token(self.raw_token, self.validate)
+        with patch('core.token_cache.time.time', return_value=token['exp'] + 1):
+            self.cache.get_validated_token(self.raw_token, self.validate)
+        self.assertEqual(self.validate.call_count, 2)
+
+    def test_invalid_token_not_cached(self):
+        """Test que un token inválido no se recuerda"""
+        tampered = self.raw_token[:-2] + b'xx'
+        for _ in range(2):
+            with self.assertRaises(InvalidToken):
+                self.cache.get_validated_token(tampered, self.validate)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_bounded_size(self):
+        """Test que la cache descarta el token menos usado"""
+        for _ in range(3):
+            raw = str(RefreshToken.for_user(self.user).access_token).encode()
+            self.cache.get_validated_token(raw, self.validate)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_login_token_invalidated_by_user_id(self):
+        """Test que los tokens del login (user_id como texto) también se descartan"""
+        raw = str(CustomTokenObtainPairSerializer.get_token(self.user).access_token).encode()
+        self.cache.get_validated_token(raw, self.validate)
+
+        self.cache.invalidate_user(self.user.pk)
+
+        self.assertEqual(len(self.cache), 0)
+
+    def test_user_change_invalidates_tokens(self):
+        """Test que guardar el usuario descarta sus tokens verificados"""
+        token_cache = get_token_cache()
+        authentication = CustomJWTAuthentication()
+        authentication.get_validated_token(self.raw_token)
+        self.assertEqual(len(token_cache._by_user.get(str(self.user.pk), ())), 1)
+
+        self.user.disabled = True
+        self.user.save()
+
+        self.assertNotIn(str(self.user.pk), token_cache._by_user)
+        response = self.client.get('/api/services/services/', HTTP_AUTHORIZATION=f'Bearer {self.raw_token.decode()}')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BloomFilterTest(TestCase):
+    """Tests del filtro de Bloom de la lista de revocación"""
+
+    def test_no_false_negatives(self):
+        """Test que todo elemento añadido se encuentra"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti:{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+
+    def test_false_positive_rate(self):
+        """Test que la tasa de falsos positivos se mantiene cerca de la configurada"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti:{i}")
+        false_positives = sum(f"otro:{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives / 10000, 0.03)
+
+
+class TokenRevocationTest(APITestCase):
+    """Tests de la revocación de tokens JWT"""
+
+    def setUp(self):
+        self.revocation = get_revocation_list()
+        self.revocation.reset()
+        # Tras la primera consulta la versión no vuelve a caducar durante el test
+        poll = patch.object(self.revocation, 'poll_interval', 60)
+        poll.start()
+        self.addCleanup(poll.stop)
+        self.user = User.objects.create_user(
+            username='revocation',
+            phone='+593997777777',
+            password='testpass123',
+            role=User.Role.CONSUMER
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+        # Tokens emitidos antes del segundo actual, como en un uso real
+        self.access.set_iat(at_time=timezone.now() - timedelta(seconds=5))
+
+    def tearDown(self):
+        get_token_cache().clear()
+        self.revocation.reset()
+
+    def get(self, token):
+        return self.client.get('/api/services/services/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_unrevoked_token_checked_without_queries(self):
+        """Test que un token no revocado se resuelve con el filtro, sin consultas"""
+        self.revocation.is_revoked(self.access)
+        with self.assertNumQueries(0):
+            self.assertFalse(self.revocation.is_revoked(self.access))
+        self.assertEqual(self.revocation.stats['filter_hits'], 0)
+
+    def test_logout_revokes_access_and_refresh(self):
+        """Test que el logout revoca el token de acceso y el refresh token"""
+        self.assertEqual(self.get(self.access).status_code, status.HTTP_200_OK)
+
+        response = self.client.post(
+            '/api/auth/api/logout/', {'refresh': str(self.refresh)},
+            HTTP_AUTHORIZATION=f'Bearer {self.access}'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get(self.access).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(self.revocation.is_revoked(self.refresh))
+
+    def test_logout_rejects_foreign_refresh(self):
+        """Test que no se puede revocar el refresh token de otro usuario"""
+        other = User.objects.create_user(username='otro', phone='+593997777778', password='testpass123')
+        response = self.client.post(
+            '/api/auth/api/logout/', {'refresh': str(RefreshToken.for_user(other))},
+            HTTP_AUTHORIZATION=f'Bearer {self.access}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_change_password_revokes_previous_tokens(self):
+        """Test que cambiar la contraseña invalida los tokens anteriores"""
+        other_access = RefreshToken.for_user(self.user).access_token
+        other_access.set_iat(at_time=timezone.now() - timedelta(seconds=5))
+        response = self.client.post('/api/users/change-password/', {
+            'current_password': 'testpass123',
+            'new_password': 'newpass123',
+            'confirm_password': 'newpass123',
+        }, HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.revocation.is_revoked(self.access))
+        self.assertTrue(self.revocation.is_revoked(other_access))
+        # Un token emitido después del cambio sigue siendo válido
+        self.assertFalse(self.revocation.is_revoked(RefreshToken.for_user(self.user).access_token))
+
+    def test_admin_suspension_revokes_tokens(self):
+        """Test que suspender una cuenta revoca sus tokens"""
+        admin = User.objects.create_user(
+            username='admin', phone='+593997777779', password='testpass123',
+            is_staff=True, role=User.Role.MANAGEMENT
+        )
+        self.client.force_authenticate(user=admin)
+        response = self.client.post(f'/api/auth/api/admin/users/{self.user.pk}/suspend/', {'reason': 'Fraude'})
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.disabled)
+        self.assertTrue(self.revocation.is_revoked(self.access))
+
+    def test_false_positive_confirmed_against_store(self):
+        """Test que un positivo del filtro sin fila en el almacén no revoca el token"""
+        self.revocation.is_revoked(self.access)
+        # Simular una colisión: la clave está en el filtro pero no en la base de datos
+        self.revocation.add_jti(self.access['jti'])
+
+        with self.assertNumQueries(1):
+            self.assertFalse(self.revocation.is_revoked(self.access))
+        # El resultado de la consulta se recuerda hasta la siguiente actualización
+        with self.assertNumQueries(0):
+            self.assertFalse(self.revocation.is_revoked(self.access))
+        self.assertEqual(self.revocation.stats['false_positives'], 1)
+        self.assertEqual(self.get(self.access).status_code, status.HTTP_200_OK)
+
+    def test_false_positive_forced_with_tiny_filter(self):
+        """Test que con un filtro saturado los tokens válidos siguen aceptándose"""
+        revocation = RevocationList(capacity=1, error_rate=0.5)
+        revocation.is_revoked(self.access)
+        for i in range(50):
+            revocation.add_jti(f"otro-{i}")
+
+        self.assertFalse(revocation.is_revoked(self.access))
+        self.assertGreater(revocation.stats['false_positives'], 0)
+
+    def test_revocation_seen_by_other_workers(self):
+        """Test que otro proceso ve la revocación en la siguiente consulta de versión"""
+        other_worker = RevocationList(poll_interval=0)
+        self.assertFalse(other_worker.is_revoked(self.access))
+
+        revoke_token(self.access)
+
+        self.assertTrue(other_worker.is_revoked(self.access))
+
+    def test_revoke_user_tokens_keeps_newer_tokens(self):
+        """Test que not_before sólo afecta a los tokens emitidos antes"""
+        revoke_user_tokens(self.user.pk)
+        newer = RefreshToken.for_user(self.user).access_token
+        newer.set_iat(at_time=timezone.now() + timedelta(seconds=5))
+
+        self.assertTrue(self.revocation.is_revoked(self.access))
+        self.assertFalse(self.revocation.is_revoked(newer))
+
+    def test_rows_committed_out_of_order_are_loaded(self):
+        """Test que la carga incremental no pierde filas confirmadas después de otras más nuevas"""
+        from core.models import RevokedToken, TokenNotBefore
+
+        worker = RevocationList(poll_interval=0)
+        worker.rebuild()
+        expires_at = timezone.now() + timedelta(hours=1)
+        RevokedToken.objects.create(id=1000, jti='nuevo', expires_at=expires_at)
+        worker._load_changes()
+
+        # Filas escritas antes de la carga anterior que se confirman después
+        written_at = timezone.now() - timedelta(seconds=5)
+        RevokedToken.objects.create(id=999, jti='anterior', expires_at=expires_at)
+        RevokedToken.objects.filter(id=999).update(revoked_at=written_at)
+        TokenNotBefore.objects.create(user=self.user, not_before=timezone.now())
+        TokenNotBefore.objects.filter(user=self.user).update(updated_at=written_at)
+        worker._load_changes()
+
+        self.assertTrue(worker.is_revoked({'jti': 'anterior'}))
+        self.assertTrue(worker.is_revoked(self.access))
+
+    def test_filter_built_by_a_single_thread(self):
+        """Test que varios hilos a la vez sólo construyen el filtro una vez"""
+        from django.db import connections
+        worker = RevocationList()
+        rebuild = worker.rebuild
+        calls = []
+
+        def slow_rebuild():
+            calls.append(threading.get_ident())
+            time.sleep(0.05)
+            rebuild()
+
+        def check():
+            try:
+                worker.is_revoked(self.access)
+            finally:
+                connections.close_all()
+
+        with patch.object(worker, 'rebuild', side_effect=slow_rebuild):
+            threads = [threading.Thread(target=check) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+
+
+class AsyncReadViewsTest(APITestCase):
+    """Tests de las vistas de lectura async (core/async_views.py)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='asyncviews',
+            phone='+593996666666',
+            password='testpass123',
+            role=User.Role.CONSUMER
+        )
+        provider_user = User.objects.create_user(
+            username='asyncprovider',
+            phone='+593996666667',
+            password='testpass123',
+            role=User.Role.PROVIDER
+        )
+        provider = Provider.objects.create(
+            user=provider_user,
+            is_active=True,
+            verification_status=Provider.VerificationStatus.APPROVED,
+            verified_at=timezone.now(),
+        )
+        self.service = Service.objects.create(
+            provider=provider,
+            category=Category.objects.create(name='Async'),
+            title='Servicio async',
+            description='Servicio de prueba',
+            price=25,
+            duration_minutes=60,
+        )
+        self.appointment_date = date.today() + timedelta(days=1)
+        Appointment.objects.create(
+            consumer=self.user,
+            provider=provider_user,
+            service=self.service,
+            appointment_date=self.appointment_date,
+            appointment_time='10:00',
+            status=Appointment.Status.CONFIRMED,
+            is_temporary=False,
+            expires_at=timezone.now() + timedelta(days=1),
+            service_address='Calle 1',
+            service_latitude=-0.18,
+            service_longitude=-78.47,
+        )
+        # AsyncClient(headers=...) no traduce los nombres a ASGI: se pasan por petición
+        self.auth = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    def test_views_are_async(self):
+        """Test que las vistas de lectura se despachan como corrutinas"""
+        self.assertTrue(iscoroutinefunction(ServiceListView.as_view()))
+        self.assertTrue(iscoroutinefunction(check_appointment_availability))
+
+    def test_sync_client_still_works(self):
+        """Test que bajo WSGI (cliente síncrono) las vistas async responden igual"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/appointments/consumer/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    async def test_async_list_views(self):
+        """Test de las listas async a través del handler ASGI"""
+        client = AsyncClient()
+
+        services = await client.get('/api/services/services/', headers=self.auth)
+        categories = await client.get('/api/services/categories/', headers=self.auth)
+        appointments = await client.get('/api/appointments/consumer/', headers=self.auth)
+
+        self.assertEqual(services.status_code, status.HTTP_200_OK)
+        self.assertEqual(services.json()['results'][0]['provider_name'], 'asyncprovider')
+        self.assertEqual([c['name'] for c in categories.json()], ['Async'])
+        self.assertEqual(appointments.json()[0]['service']['title'], 'Servicio async')
+
+    async def test_async_cart_detail_creates_cart(self):
+        """Test que el carrito se crea con el ORM async si no existe"""
+        client = AsyncClient()
+
+        response = await client.get('/api/carts/', headers=self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['total_items'], 0)
+        self.assertTrue(await Cart.objects.filter(user=self.user).aexists())
+
+    async def test_async_availability(self):
+        """Test de disponibilidad con el ORM async, incluidos los errores"""
+        client = AsyncClient()
+        url = '/api/appointments/availability/'
+        day = self.appointment_date.isoformat()
+
+        response = await client.get(url, {'service_id': self.service.pk, 'date': day}, headers=self.auth)
+        missing = await client.get(url, {'service_id': 999999, 'date': day}, headers=self.auth)
+        bad_date = await client.get(url, {'service_id': self.service.pk, 'date': 'mañana'}, headers=self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['occupied_times'], ['10:00'])
+        self.assertNotIn('10:00', response.json()['available_times'])
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(bad_date.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_async_permission_denied(self):
+        """Test que autenticación y permisos se aplican en la ruta async"""
+        response = await AsyncClient().get('/api/appointments/consumer/')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+
+class WorkerWarmupTest(APITestCase):
+    """Tests del warmup de workers y de gunicorn.conf.py"""
+
+    def load_gunicorn_conf(self, **env):
+        with patch.dict('os.environ', env):
+            return runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+
+    def test_warmup_fills_category_cache(self):
+        """Test que el warmup deja las categorías en L1 antes del primer request"""
+        Category.objects.create(name='Warmup')
+        tiered_cache(CATEGORY_CACHE).invalidate()
+
+        results = warm_caches(['providers.services.views.active_categories'])
+
+        self.assertIsNotNone(results['providers.services.views.active_categories'])
+        cache = tiered_cache(CATEGORY_CACHE)
+        cache.reset_stats()
+        self.client.get('/api/services/categories/')
+        self.assertEqual(cache.stats()['l1']['hits'], 1)
+
+    def test_failing_warmer_does_not_raise(self):
+        """Test que un warmer que falla se reporta sin detener el worker"""
+        with self.assertLogs('core.warmup', level='WARNING'):
+            results = warm_caches(['core.tests.no_existe', 'core.revocation.warm_revocation_list'])
+
+        self.assertIsNone(results['core.tests.no_existe'])
+        self.assertIsNotNone(results['core.revocation.warm_revocation_list'])
+
+    def test_gunicorn_worker_classes(self):
+        """Test que la clase de worker elige la app WSGI o ASGI"""
+        sync = self.load_gunicorn_conf(GUNICORN_WORKER_CLASS='sync')
+        gthread = self.load_gunicorn_conf(GUNICORN_WORKER_CLASS='gthread', GUNICORN_THREADS='8')
+        wsgi = self.load_gunicorn_conf(SERVER_MODE='wsgi')
+
+        self.assertEqual(sync['wsgi_app'], 'backend_homeService.wsgi:application')
+        self.assertEqual(sync['threads'], 1)
+        self.assertEqual(gthread['threads'], 8)
+        self.assertEqual(wsgi['worker_class'], 'sync')
+        self.assertEqual(wsgi['wsgi_app'], 'backend_homeService.wsgi:application')
+
+    def test_gunicorn_defaults_to_asgi(self):
+        """Test que sin configuración gunicorn usa workers de uvicorn y la app ASGI"""
+        with patch.dict('os.environ'):
+            for name in ('SERVER_MODE', 'GUNICORN_WORKER_CLASS', 'GUNICORN_PROFILE'):
+                os.environ.pop(name, None)
+            conf = runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+        cpu = self.load_gunicorn_conf(GUNICORN_PROFILE='cpu')
+
+        self.assertEqual(conf['worker_class'], 'uvicorn.workers.UvicornWorker')
+        self.assertEqual(conf['wsgi_app'], 'backend_homeService.asgi:application')
+        self.assertEqual(cpu['worker_class'], 'uvicorn.workers.UvicornWorker')
+
+    def test_gunicorn_profiles_and_recycling(self):
+        """Test de los perfiles cpu/io y del reciclado con jitter"""
+        cpu = self.load_gunicorn_conf(GUNICORN_PROFILE='cpu')
+        io = self.load_gunicorn_conf(GUNICORN_PROFILE='io', GUNICORN_MAX_REQUESTS='500')
+
+        self.assertEqual(cpu['workers'], cpu['CPUS'] + 1)
+        self.assertEqual(io['worker_class'], 'gthread')
+        self.assertGreater(io['threads'], 1)
+        self.assertGreater(io['timeout'], cpu['timeout'])
+        self.assertEqual(io['max_requests'], 500)
+        self.assertEqual(io['max_requests_jitter'], 50)
+        self.assertNotIn('config', io)
+
+
+class DatabasePoolTest(APITestCase):
+    """Tests del pool de conexiones y de su endpoint de estadísticas"""
+
+    url = '/api/auth/api/admin/db-pool/'
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='pooladmin', phone='+593996666661', password='testpass123',
+            is_staff=True, role=User.Role.MANAGEMENT
+        )
+        self.user = User.objects.create_user(
+            username='pooluser', phone='+593996666662', password='testpass123',
+            role=User.Role.CONSUMER
+        )
+
+    def test_stats_require_admin(self):
+        """Test que sólo el personal interno ve las estadísticas"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_stats_report_every_database(self):
+        """Test que el endpoint reporta cada base de datos del worker"""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('pid', response.data)
+        self.assertEqual(response.data['databases']['default']['pooled'], is_pooled())
+
+    def test_persistent_connections_without_pool(self):
+        """Test que sin pool se reportan las conexiones persistentes"""
+        with patch.dict(connection.settings_dict, {'OPTIONS': {}, 'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True}):
+            stats = pool_stats()
+
+        self.assertEqual(stats, {'pooled': False, 'conn_max_age': 60, 'health_checks': True})
+
+    @unittest.skipUnless(is_pooled(), "Requiere PostgreSQL con DB_POOL")
+    def test_pool_counts_connection_in_use(self):
+        """Test que la conexión de la transacción del test cuenta como en uso"""
+        User.objects.exists()
+        stats = pool_stats()
+
+        self.assertTrue(stats['pooled'])
+        self.assertGreaterEqual(stats['in_use'], 1)
+        self.assertLessEqual(stats['size'], stats['max_size'])
+        self.assertEqual(stats['waiting'], 0)
+
+
+class ReplicaRouterTest(APITestCase):
+    """Tests del enrutado de lecturas a réplicas con lectura del primario tras escribir"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.user = User.objects.create_user(
+            username='replicauser', phone='+593995555551', password='testpass123',
+            role=User.Role.CONSUMER
+        )
+        replicas = patch('core.routers._replicas', return_value=['replica'])
+        replicas.start()
+        self.addCleanup(replicas.stop)
+        shared_cache.clear()
+
+    def in_request(self, method='GET'):
+        """Simular un request fuera de la transacción del test"""
+        token = _request_state.set(RequestState(pinned=method not in ('GET', 'HEAD', 'OPTIONS')))
+        self.addCleanup(_request_state.reset, token)
+        atomic = patch.object(connection, 'in_atomic_block', False)
+        atomic.start()
+        self.addCleanup(atomic.stop)
+
+    def test_reads_outside_requests_use_primary(self):
+        """Test que comandos y tareas de fondo leen del primario"""
+        self.assertEqual(self.router.db_for_read(Appointment), 'default')
+
+    def test_safe_request_reads_from_replica(self):
+        """Test que las lecturas de un GET van a la réplica"""
+        self.in_request('GET')
+
+        self.assertEqual(self.router.db_for_read(Appointment), 'replica')
+        self.assertEqual(self.router.db_for_write(Appointment), 'default')
+        # Tras escribir, el resto del request lee del primario
+        self.assertEqual(self.router.db_for_read(Appointment), 'default')
+
+    def test_write_request_reads_from_primary(self):
+        """Test que un POST lee del primario desde el principio"""
+        self.in_request('POST')
+
+        self.assertEqual(self.router.db_for_read(Cart), 'default')
+
+    def test_atomic_block_and_primary_apps_use_primary(self):
+        """Test que las transacciones y las sesiones no usan la réplica"""
+        self.in_request('GET')
+
+        self.assertEqual(self.router.db_for_read(Session), 'default')
+        self.router.db_for_write(Session)
+        self.assertEqual(self.router.db_for_read(Cart), 'replica')
+        with patch.object(connection, 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(Cart), 'default')
+
+    def test_recent_writer_sticks_to_primary(self):
+        """Test que un usuario que escribió hace poco lee del primario en otro request"""
+        shared_cache.set(_sticky_key(self.user.pk), 1)
+        self.in_request('GET')
+
+        pin_if_sticky(self.user.pk)
+
+        self.assertEqual(self.router.db_for_read(Appointment), 'default')
+
+    def test_write_request_marks_user_sticky(self):
+        """Test que un request con escrituras marca al usuario en la cache compartida"""
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        response = self.client.post('/api/auth/api/logout/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(shared_cache.get(_sticky_key(self.user.pk)))
+
+    def test_read_request_does_not_mark_user_sticky(self):
+        """Test que un request sólo de lectura no marca al usuario"""
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        response = self.client.get('/api/services/categories/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(shared_cache.get(_sticky_key(self.user.pk)))
+
+    def test_last_seen_flush_does_not_mark_user_sticky(self):
+        """Test que un GET que escribe la última actividad no queda en el primario ni marca al usuario"""
+        tracker = get_tracker()
+        tracker.reset()
+        self.addCleanup(tracker.reset)
+        for name, value in (('flush_interval', 0), ('min_interval', 0)):
+            patcher = patch.object(tracker, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        response = self.client.get('/api/services/categories/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen)
+        self.assertIsNone(shared_cache.get(_sticky_key(self.user.pk)))
+
+    def test_rate_limit_write_keeps_request_on_replica(self):
+        """Test que el límite de peticiones en base de datos no fija el request al primario"""
+        state = RequestState(pinned=False)
+        token = _request_state.set(state)
+        self.addCleanup(_request_state.reset, token)
+
+        DatabaseRateLimitStore().hit('replica-get', 1000, 1000)
+
+        self.assertFalse(state.pinned)
+        self.assertFalse(state.wrote)
+
+
+class OpenAPISchemaTest(APITestCase):
+    """Tests del esquema OpenAPI precalculado"""
+
+    url = '/swagger/?format=openapi'
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.store = SchemaStore(Path(tmpdir.name) / 'openapi.json', max_age=3600)
+        store = patch('core.schema._schema_store', self.store)
+        store.start()
+        self.addCleanup(store.stop)
+
+    def test_command_writes_schema(self):
+        """Test que build_openapi_schema escribe el documento en disco"""
+        call_command('build_openapi_schema', stdout=io.StringIO())
+
+        self.assertTrue(self.store.path.exists())
+        self.assertIn(b'"paths"', self.store.path.read_bytes())
+
+    def test_serves_file_with_cache_headers(self):
+        """Test que el JSON se sirve desde el archivo sin introspeccionar las vistas"""
+        self.store.path.write_bytes(b'{"swagger": "2.0", "paths": {}}')
+
+        with patch('core.schema.generate_schema') as generate:
+            response = self.client.get(self.url)
+
+        generate.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b'{"swagger": "2.0", "paths": {}}')
+        self.assertIn('max-age=3600', response['Cache-Control'])
+        self.assertTrue(response['ETag'])
+
+    def test_matching_etag_returns_304(self):
+        """Test que un ETag vigente responde 304 sin cuerpo"""
+        self.store.path.write_bytes(b'{"swagger": "2.0", "paths": {}}')
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_new_file_changes_etag(self):
+        """Test que un despliegue con otro esquema cambia el ETag"""
+        self.store.path.write_bytes(b'{"swagger": "2.0", "paths": {}}')
+        old = self.client.get(self.url)['ETag']
+        self.store.path.write_bytes(b'{"swagger": "2.0", "paths": {"/x/": {}}}')
+        os.utime(self.store.path, (time.time() + 10, time.time() + 10))
+
+        self.assertNotEqual(self.client.get(self.url)['ETag'], old)
+
+    def test_missing_file_generates_once(self):
+        """Test que sin archivo el esquema se genera en el primer request y se reutiliza"""
+        with patch('core.schema.generate_schema', return_value=b'{"paths": {}}') as generate, \
+                self.assertLogs('core.schema', level='WARNING'):
+            self.client.get(self.url)
+            response = self.client.get(self.url)
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(response.content, b'{"paths": {}}')
+        self.assertFalse(self.store.path.exists())
+
+    def test_ui_page_still_rendered(self):
+        """Test que la página de Swagger UI sigue disponible"""
+        response = self.client.get('/swagger/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'swagger', response.content.lower())
+
+
+class APIMiddlewareStackTest(APITestCase):
+    """Tests del stack de middleware reducido para las rutas de la API"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='stackuser', phone='+593994444441', password='testpass123',
+            role=User.Role.CONSUMER
+        )
+
+    def test_api_skips_browser_middleware(self):
+        """Test que la API no pasa por sesiones, CSRF ni X-Frame-Options"""
+        response = self.client.get('/api/services/categories/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Frame-Options', response)
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test_admin_keeps_full_stack(self):
+        """Test que /admin/ mantiene sesiones, CSRF y X-Frame-Options"""
+        response = self.client.get('/admin/login/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+        self.assertIn('csrftoken', response.cookies)
+
+    def test_api_ignores_session_login(self):
+        """Test que una sesión de Django no autentica en la API"""
+        self.client.force_login(self.user)
+
+        response = self.client.get('/api/carts/')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_api_post_without_csrf_token(self):
+        """Test que la API con JWT no exige token CSRF"""
+        client = APIClient(enforce_csrf_checks=True)
+        refresh = RefreshToken.for_user(self.user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+        response = client.post('/api/auth/api/logout/', {'refresh': str(refresh)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_admin_checks_accept_browser_only_middleware(self):
+        """Test que los checks del admin reconocen las subclases de core/middleware.py"""
+        from django.core import checks
+
+        errors = [e for e in checks.run_checks(tags=['admin']) if e.id in ('admin.E408', 'admin.E409', 'admin.E410')]
+
+        self.assertEqual(errors, [])
+
+
+class FastJSONTest(TestCase):
+    """Tests del renderer y el parser JSON con orjson"""
+
+    def payload(self):
+        return {
+            'price': Decimal('10.50'),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'created_at': datetime.datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc),
+            'naive': datetime.datetime(2025, 1, 2, 3, 4, 5),
+            'date': datetime.date(2025, 1, 2),
+            'time': datetime.time(10, 30),
+            'duration': datetime.timedelta(minutes=90),
+            'text': 'Señor Ñandú \u2028 línea',
+            'nested': ReturnDict({'items': [1, 2.5, None, True, {'a': []}]}, serializer=None),
+            1: 'clave numérica',
+        }
+
+    def test_same_output_as_drf(self):
+        """Test que, sin floats con exponente ni NaN, la salida es idéntica byte a byte a la de DRF"""
+        self.assertEqual(FastJSONRenderer().render(self.payload()), JSONRenderer().render(self.payload()))
+
+    def test_fallbacks_match_drf(self):
+        """Test que enteros enormes, indentación y la ausencia de orjson dan la salida de DRF"""
+        big = {'n': 2 ** 70}
+        self.assertEqual(FastJSONRenderer().render(big), JSONRenderer().render(big))
+
+        indented = 'application/json; indent=4'
+        self.assertEqual(
+            FastJSONRenderer().render(self.payload(), indented),
+            JSONRenderer().render(self.payload(), indented),
+        )
+        with patch('core.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.payload()), JSONRenderer().render(self.payload()))
+
+    def test_floats(self):
+        """Test que los floats decodifican igual que con DRF aunque cambie el formato del exponente"""
+        floats = {'values': [0.1, 2.5, -3.75, 123456789.125, 1e16, 1e-7, 1e300]}
+
+        fast = FastJSONRenderer().render(floats)
+
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(floats)))
+        self.assertIn(b'1e16', fast)
+        self.assertIn(b'1e-7', fast)
+
+    def test_nan_renders_as_null(self):
+        """Test que NaN e infinito salen como null, mientras que DRF los rechaza"""
+        data = {'nan': float('nan'), 'inf': float('inf')}
+
+        self.assertEqual(FastJSONRenderer().render(data), b'{"nan":null,"inf":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+
+    def test_parser_matches_drf(self):
+        """Test que el parser devuelve lo mismo que el JSONParser de DRF"""
+        body = '{"a": [1, 2.5, null], "b": "ñ", "big": 1180591620717411303424}'.encode()
+
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+
+    def test_parser_rejects_invalid_json_like_drf(self):
+        """Test que JSON inválido y NaN dan el mismo error que DRF"""
+        for body in (b'{"a": ', b'{"a": NaN}'):
+            with self.assertRaises(ParseError) as fast:
+                FastJSONParser().parse(io.BytesIO(body))
+            with self.assertRaises(ParseError) as drf:
+                JSONParser().parse(io.BytesIO(body))
+
+            self.assertEqual(str(fast.exception), str(drf.exception))
+
+
+class ConditionalGetTest(APITestCase):
+    """Tests de las respuestas condicionales (core/conditional.py)"""
+
+    def setUp(self):
+        cache.clear()
+        self.consumer = User.objects.create_user(
+            username='etagconsumer', phone='+593993333331', password='testpass123',
+            role=User.Role.CONSUMER
+        )
+        self.profile = UserProfile.objects.create(
+            user=self.consumer, firstname='Etag', lastname='Consumer',
+            email='etag@example.com', birth_date=date(1990, 1, 1)
+        )
+        provider_user = User.objects.create_user(
+            username='etagprovider', phone='+593993333332', password='testpass123',
+            role=User.Role.PROVIDER
+        )
+        UserProfile.objects.create(
+            user=provider_user, firstname='Etag', lastname='Provider',
+            email='etagprovider@example.com', birth_date=date(1990, 1, 1)
+        )
+        self.provider = Provider.objects.create(
+            user=provider_user, is_active=True,
+            verification_status=Provider.VerificationStatus.APPROVED,
+            verified_at=timezone.now(),
+        )
+        self.category = Category.objects.create(name='Etag')
+        self.service = Service.objects.create(
+            provider=self.provider, category=self.category, title='Servicio etag',
+            price=25, duration_minutes=60,
+        )
+
+    def revalidate(self, url, response, **headers):
+        return self.client.get(url, headers={'If-None-Match': response['ETag'], **headers})
+
+    def test_category_list_not_modified(self):
+        """Test que el listado de categorías responde 304 con un ETag débil"""
+        url = '/api/services/categories/'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+
+        not_modified = self.revalidate(url, response)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        self.category.name = 'Etag renombrada'
+        self.category.save()
+        self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_200_OK)
+
+    def test_service_list_skips_serialization(self):
+        """Test que un 304 del listado de servicios no serializa nada"""
+        url = '/api/services/services/'
+        response = self.client.get(url)
+
+        with patch.object(ProviderServiceSerializer, 'to_representation') as to_representation:
+            not_modified = self.revalidate(url, response)
+
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        to_representation.assert_not_called()
+
+    def test_service_list_etag_changes_with_data(self):
+        """Test que altas, ediciones, filtros y cambios de proveedor cambian el ETag"""
+        url = '/api/services/services/'
+        response = self.client.get(url)
+
+        self.assertNotEqual(self.client.get(url, {'search': 'otro'})['ETag'], response['ETag'])
+
+        def rename_provider():
+            user = User.objects.get(pk=self.provider.user_id)
+            user.username = 'etagrenamed'
+            user.save()
+
+        changes = [
+            lambda: Service.objects.filter(pk=self.service.pk).update(is_active=False),
+            lambda: Service.objects.create(
+                provider=self.provider, category=self.category, title='Nuevo',
+                price=10, duration_minutes=30,
+            ),
+            lambda: self.service.save(),
+            rename_provider,
+            lambda: self.category.save(),
+        ]
+        for change in changes:
+            change()
+            self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_200_OK)
+            response = self.client.get(url)
+            self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_consumer_profile_validators(self):
+        """Test que el perfil del consumidor usa ETag y Last-Modified de su versión"""
+        url = '/api/users/me/profile/'
+        self.client.force_authenticate(user=self.consumer)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response['ETag'].startswith('W/'))
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(
+            self.client.get(url, headers={'If-Modified-Since': response['Last-Modified']}).status_code,
+            status.HTTP_304_NOT_MODIFIED
+        )
+
+        version = get_version(PROFILE_VERSION, self.consumer.pk)
+        self.profile.firstname = 'Cambiado'
+        self.profile.save()
+
+        self.assertNotEqual(get_version(PROFILE_VERSION, self.consumer.pk), version)
+        updated = self.revalidate(url, response)
+        self.assertEqual(updated.status_code, status.HTTP_200_OK)
+        self.assertEqual(updated.data['firstname'], 'Cambiado')
+
+    def test_provider_profile_validators(self):
+        """Test que el perfil del proveedor cambia de ETag al guardar Provider"""
+        url = '/api/providers/me/profile/'
+        self.client.force_authenticate(user=self.provider.user)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.provider.bio = 'Nueva bio'
+        self.provider.save()
+        self.assertEqual(self.revalidate(url, response).status_code, status.HTTP_200_OK)
+
+    def test_etag_is_per_user_and_errors_have_none(self):
+        """Test que otro usuario no reutiliza el ETag y los errores no llevan validadores"""
+        url = '/api/users/me/profile/'
+        self.client.force_authenticate(user=self.consumer)
+        response = self.client.get(url)
+
+        self.client.force_authenticate(user=self.provider.user)
+        forbidden = self.revalidate(url, response)
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertNotIn('ETag', forbidden)
+
+    @override_settings(CONDITIONAL_GET={'ENABLED': False})
+    def test_disabled(self):
+        """Test que con CONDITIONAL_GET desactivado no se envían validadores"""
+        response = self.client.get('/api/services/categories/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('ETag', response)
+
+
+@override_settings(INSTRUMENTATION={'ENABLED': True, 'SERVER_TIMING': True})
+class InstrumentationTest(APITestCase):
+    """Tests de la instrumentación por request (core/instrumentation.py)"""
+
+    def setUp(self):
+        cache.clear()
+        get_instrumentation().reset()
+        self.user = User.objects.create_user(
+            username='timinguser', phone='+593992222221', password='testpass123',
+            role=User.Role.CONSUMER
+        )
+        self.admin = User.objects.create_superuser(
+            username='timingadmin', phone='+593992222222', password='testpass123'
+        )
+        Category.objects.create(name='Timing')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def timings(self, response):
+        metrics = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_server_timing_header(self):
+        """Test que la respuesta publica total, base de datos, cache, serializer y auth"""
+        response = self.client.get('/api/services/categories/')
+        timings = self.timings(response)
+
+        self.assertEqual(set(timings), {'total', 'db', 'cache', 'serializer', 'auth'})
+        self.assertGreater(float(timings['auth']['dur']), 0)
+        self.assertGreater(float(timings['serializer']['dur']), 0)
+        self.assertGreaterEqual(float(timings['total']['dur']), float(timings['db']['dur']))
+
+        cached = self.timings(self.client.get('/api/services/categories/'))
+        self.assertNotIn('hits=0', cached['cache']['desc'])
+
+    def test_counts_queries(self):
+        """Test que el número de consultas coincide con las ejecutadas"""
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/me/profile/')
+
+        self.assertEqual(self.timings(response)['db']['desc'], f'"{len(queries)} queries"')
+
+    def test_async_request(self):
+        """Test que el modo async del middleware mide también las vistas async"""
+        from asgiref.sync import async_to_sync
+
+        response = async_to_sync(AsyncClient().get)('/api/services/categories/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('serializer;dur=', response['Server-Timing'])
+
+    def test_serializers_not_patched(self):
+        """Test que la serialización se mide desde las vistas sin modificar BaseSerializer de DRF"""
+        from rest_framework.serializers import BaseSerializer
+
+        self.client.get('/api/services/categories/')
+
+        self.assertEqual(BaseSerializer.data.fget.__module__, 'rest_framework.serializers')
+
+    def test_sync_view_times_rendering(self):
+        """Test que en una vista síncrona el renderizado del JSON cuenta como serialización"""
+        response = self.client.get('/api/users/me/profile/')
+
+        self.assertGreater(float(self.timings(response)['serializer']['dur']), 0)
+
+    def test_route_percentiles_admin_only(self):
+        """Test que el agregado por ruta sólo lo leen administradores"""
+        for _ in range(3):
+            self.client.get('/api/services/categories/')
+        url = '/api/auth/api/admin/request-metrics/'
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['pid'], os.getpid())
+        stats = response.data['routes']['GET /api/services/categories/']
+        self.assertEqual(stats['count'], 3)
+        self.assertLessEqual(stats['total_ms']['p50'], stats['total_ms']['p99'])
+
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertNotIn('GET /api/services/categories/', get_instrumentation().snapshot()['routes'])
+
+    @override_settings(INSTRUMENTATION={'ENABLED': True, 'LOG': True})
+    def test_structured_log_line(self):
+        """Test que con LOG activo se escribe una línea JSON por request"""
+        with self.assertLogs('core.instrumentation', level='INFO') as logs:
+            self.client.get('/api/services/categories/')
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['route'], 'GET /api/services/categories/')
+        self.assertEqual(line['status'], 200)
+        self.assertIn('db_queries', line)
+
+    @override_settings(INSTRUMENTATION={'ENABLED': False})
+    def test_disabled(self):
+        """Test que con ENABLED=False el middleware no se carga"""
+        response = self.client.get('/api/services/categories/')
+
+        self.assertNotIn('Server-Timing', response)
+
+    def test_instrumentation_created_once(self):
+        """Test que los hilos concurrentes comparten una única instrumentación"""
+        from core import instrumentation
+
+        patcher = patch.object(instrumentation, '_instrumentation', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        barrier = threading.Barrier(8)
+        created = []
+
+        def get():
+            barrier.wait()
+            created.append(instrumentation.get_instrumentation())
+
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(instance) for instance in created}), 1)
+
+
+class QueryBudgetTest(APITestCase):
+    """
+    Presupuesto de consultas de cada GET de la API (query_budget en la vista,
+    core/queries.py). Cada endpoint se mide con volúmenes de datos distintos:
+    las consultas no pueden crecer con las filas (N+1) ni superar el
+    presupuesto declarado.
+    """
+
+    SIZES = (2, 5)
+
+    # Ruta de backend_homeService/urls.py -> (usuario, URL con los ids sembrados)
+    ENDPOINTS = {
+        'api/auth/api/ping/': ('consumer', '/api/auth/api/ping/'),
+        'api/auth/api/admin/db-pool/': ('admin', '/api/auth/api/admin/db-pool/'),
+        'api/auth/api/admin/request-metrics/': ('admin', '/api/auth/api/admin/request-metrics/'),
+        'api/users/me/profile/': ('consumer', '/api/users/me/profile/'),
+        'api/carts/': ('consumer', '/api/carts/'),
+        'api/appointments/consumer/': ('consumer', '/api/appointments/consumer/'),
+        'api/appointments/consumer/<int:pk>/': ('consumer', '/api/appointments/consumer/{appointment}/'),
+        'api/appointments/provider/': ('provider', '/api/appointments/provider/'),
+        'api/appointments/provider/<int:pk>/': ('provider', '/api/appointments/provider/{appointment}/'),
+        'api/appointments/provider/service/<int:service_id>/': (
+            'provider', '/api/appointments/provider/service/{service}/'
+        ),
+        'api/appointments/provider/dashboard/': ('provider', '/api/appointments/provider/dashboard/'),
+        'api/appointments/statistics/': ('provider', '/api/appointments/statistics/'),
+        'api/appointments/availability/': (
+            'consumer', '/api/appointments/availability/?service_id={service}&date={today}'
+        ),
+        'api/providers/providers/': ('admin', '/api/providers/providers/'),
+        'api/providers/me/profile/': ('provider', '/api/providers/me/profile/'),
+        'api/providers/providers/<int:id>/': ('admin', '/api/providers/providers/{provider}/'),
+        'api/services/categories/': ('consumer', '/api/services/categories/'),
+        'api/services/services/': ('consumer', '/api/services/services/'),
+        'api/services/suggest/': ('consumer', '/api/services/suggest/?q=serv'),
+        'api/services/my-services/': ('provider', '/api/services/my-services/'),
+        'api/payments/history/': ('provider', '/api/payments/history/'),
+        'api/payments/list/': ('provider', '/api/payments/list/'),
+        'api/fee-policies/policies/': ('admin', '/api/fee-policies/policies/'),
+        'api/fee-policies/policies/<int:pk>/': ('admin', '/api/fee-policies/policies/{fee_policy}/'),
+        'api/fee-policies/policies/current/': ('consumer', '/api/fee-policies/policies/current/'),
+        'api/images/profile/': ('consumer', '/api/images/profile/'),
+        'api/images/services/<int:service_id>/images/': ('provider', '/api/images/services/{service}/images/'),
+        'api/images/services/<int:service_id>/images/summary/': (
+            'provider', '/api/images/services/{service}/images/summary/'
+        ),
+        'api/images/services/images/<int:pk>/': ('provider', '/api/images/services/images/{image}/'),
+        'api/images/logs/': ('provider', '/api/images/logs/'),
+        'api/addresses/': ('consumer', '/api/addresses/'),
+        'api/addresses/<int:pk>/': ('consumer', '/api/addresses/{address}/'),
+        'api/addresses/default/': ('consumer', '/api/addresses/default/'),
+        'api/addresses/suggestions/': ('consumer', '/api/addresses/suggestions/?query=Malecon'),
+        'api/addresses/summary/': ('consumer', '/api/addresses/summary/'),
+    }
+
+    # ServiceImage no tiene FK `service` e IsServiceOwner niega el objeto: se mide el 403
+    EXPECTED_STATUS = {'api/images/services/images/<int:pk>/': status.HTTP_403_FORBIDDEN}
+
+    def setUp(self):
+        test_settings = override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+        test_settings.enable()
+        self.addCleanup(test_settings.disable)
+
+    @staticmethod
+    def get_endpoints():
+        """Rutas de la API con GET y la clase de su vista"""
+        from django.urls import URLResolver, get_resolver
+
+        def walk(patterns, prefix=''):
+            for pattern in patterns:
+                if isinstance(pattern, URLResolver):
+                    yield from walk(pattern.url_patterns, prefix + str(pattern.pattern))
+                else:
+                    yield prefix + str(pattern.pattern), pattern.callback
+
+        for route, callback in walk(get_resolver().url_patterns):
+            view_class = getattr(callback, 'cls', None)
+            if route.startswith('api/') and hasattr(view_class, 'get'):
+                yield route, view_class
+
+    def create_user(self, username, role, **extra):
+        user = User.objects.create_user(
+            username=username, phone=f'+5939{uuid.uuid4().int % 10 ** 8:08d}',
+            password='testpass123', role=role, **extra
+        )
+        UserProfile.objects.create(
+            user=user, firstname='Budget', lastname=username, email=f'{username}@test.com',
+            cedula=f'{uuid.uuid4().int % 10 ** 10:010d}', birth_date=date(1990, 1, 1)
+        )
+        return user
+
+    def seed(self, size):
+        """Usuarios fijos y `size` filas de cada listado (3 direcciones como máximo)"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from addresses.models import Address
+        from image_storage.models import ImageUploadLog, ServiceImage
+        from providers.fee_policies.models import FeePolicy
+        from providers.payments.models import ProviderPayment
+        from users.carts.models import CartItem
+
+        today = date.today()
+        self.users = {
+            'consumer': self.create_user('budgetconsumer', User.Role.CONSUMER),
+            'provider': self.create_user('budgetprovider', User.Role.PROVIDER),
+            'admin': User.objects.create_superuser(username='budgetadmin', phone='+593991111000', password='testpass123'),
+        }
+        provider = Provider.objects.create(
+            user=self.users['provider'], is_active=True,
+            verification_status=Provider.VerificationStatus.APPROVED, verified_at=timezone.now()
+        )
+        for i in range(size):
+            Provider.objects.create(user=self.create_user(f'budgetprovider{i}', User.Role.PROVIDER), verified_at=timezone.now())
+
+        services = [
+            Service.objects.create(
+                provider=provider, category=Category.objects.create(name=f'Budget {i}'),
+                title=f'Servicio {i}', description='Servicio de prueba', price=20 + i, duration_minutes=60
+            )
+            for i in range(size)
+        ]
+        cart, _ = Cart.objects.get_or_create(user=self.users['consumer'])
+        appointments = []
+        for i, service in enumerate(services):
+            CartItem.objects.create(cart=cart, service=service)
+            for day in (today, today + timedelta(days=1)):
+                appointments.append(Appointment.objects.create(
+                    consumer=self.users['consumer'], provider=self.users['provider'], service=services[0],
+                    appointment_date=day, appointment_time=f'{8 + i:02d}:00',
+                    status=Appointment.Status.CONFIRMED, is_temporary=False,
+                    expires_at=timezone.now() + timedelta(days=1), service_address='Calle 1',
+                    service_latitude=-0.18, service_longitude=-78.47
+                ))
+            ProviderPayment.objects.create(
+                provider=provider, amount=Decimal('10.00'), transaction_type=ProviderPayment.TransactionType.PAYOUT,
+                is_completed=True, completed_at=timezone.now()
+            )
+            fee_policy = FeePolicy.objects.create(
+                category=service.category, fee_percentage=Decimal('10.00'), valid_from=today - timedelta(days=1),
+                valid_to=today + timedelta(days=30), created_by=self.users['admin']
+            )
+            # bulk_create: el post_save de image_storage/signals.py espera un FK `service`
+            image, = ServiceImage.objects.bulk_create([ServiceImage(
+                service_id=services[0].id, is_primary=i == 0,
+                image=SimpleUploadedFile(f'budget{i}.png', b'imagen', content_type='image/png')
+            )])
+            ImageUploadLog.objects.create(
+                user=self.users['provider'], upload_type='service', file_name=f'budget{i}.png', file_size=6
+            )
+        addresses = [
+            Address.objects.create(
+                user=self.users['consumer'], title=f'Dirección {i}', street='Malecón 2000', city='Guayaquil',
+                latitude=Decimal('-2.189400'), longitude=Decimal('-79.889100'), is_default=i == 0
+            )
+            for i in range(min(size, 3))
+        ]
+        return {
+            'today': today.isoformat(),
+            'service': services[0].id,
+            'provider': provider.id,
+            'appointment': appointments[0].id,
+            'fee_policy': fee_policy.id,
+            'image': image.id,
+            'address': addresses[0].id,
+        }
+
+    def count_queries(self, role, url, expected_status=status.HTTP_200_OK):
+        """Consultas de un GET con las caches vacías (incluye autenticación)"""
+        from django.test.utils import CaptureQueriesContext
+        from core.cache import _tiered_caches
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.users[role]).access_token}')
+        self.client.get(url)  # inicializaciones perezosas del proceso
+        cache.clear()
+        for tiered in list(_tiered_caches.values()):
+            tiered.l1.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, expected_status, (url, response.content[:300]))
+        return len(queries)
+
+    def test_every_endpoint_declares_budget(self):
+        """Test que cada GET de la API declara query_budget y lo cubre este test"""
+        endpoints = dict(self.get_endpoints())
+
+        self.assertEqual(sorted(endpoints), sorted(self.ENDPOINTS))
+        missing = [route for route, view_class in endpoints.items() if getattr(view_class, 'query_budget', None) is None]
+        self.assertEqual(missing, [])
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Test que las consultas de cada endpoint son constantes y caben en su presupuesto"""
+        from django.db import transaction
+
+        endpoints = dict(self.get_endpoints())
+        counts = {route: [] for route in self.ENDPOINTS}
+        for size in self.SIZES:
+            with transaction.atomic():
+                ids = self.seed(size)
+                for route, (role, url) in self.ENDPOINTS.items():
+                    counts[route].append(self.count_queries(
+                        role, url.format(**ids), self.EXPECTED_STATUS.get(route, status.HTTP_200_OK)
+                    ))
+                transaction.set_rollback(True)
+
+        problems = {
+            route: {'consultas': found, 'presupuesto': getattr(endpoints[route], 'query_budget', None)}
+            for route, found in counts.items()
+            if len(set(found)) > 1 or max(found) > getattr(endpoints[route], 'query_budget', 0)
+        }
+        self.assertEqual(problems, {})
+
+
+class SerializerQuerysetTest(APITestCase):
+    """Tests de la carga de relaciones declarada por los serializers (core/queries.py)"""
+
+    def setUp(self):
+        self.users = {}
+        for role in (User.Role.CONSUMER, User.Role.PROVIDER):
+            user = self.users[role] = User.objects.create_user(
+                username=f'plan{role}', phone=f'+59399555{len(self.users)}000', password='testpass123', role=role
+            )
+            UserProfile.objects.create(
+                user=user, firstname='Plan', lastname=role, email=f'plan{role}@test.com', birth_date=date(1990, 1, 1)
+            )
+        self.provider = Provider.objects.create(
+            user=self.users[User.Role.PROVIDER], is_active=True,
+            verification_status=Provider.VerificationStatus.APPROVED, verified_at=timezone.now(),
+        )
+        self.category = Category.objects.create(name='Plan')
+        self.client.force_authenticate(self.users[User.Role.PROVIDER])
+
+    def _seed(self, total):
+        services = Service.objects.bulk_create([
+            Service(provider=self.provider, category=self.category, title=f'Servicio {i}', price=20, duration_minutes=60)
+            for i in range(total)
+        ])
+        today = date.today()
+        Appointment.objects.bulk_create([
+            Appointment(
+                consumer=self.users[User.Role.CONSUMER], provider=self.users[User.Role.PROVIDER], service=service,
+                appointment_date=today + timedelta(days=i // 10), appointment_time=f'{8 + i % 10:02d}:00',
+                status=Appointment.Status.CONFIRMED, is_temporary=False, service_address='Calle 1',
+                service_latitude=-0.18, service_longitude=-78.47, expires_at=timezone.now() + timedelta(days=1),
+            )
+            for i, service in enumerate(services)
+        ])
+
+    def _count_queries(self, url):
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response.data
+
+    def test_queries_constant_for_1_and_1000_rows(self):
+        """Test que los listados hacen las mismas consultas con 1 y con 1000 filas"""
+        urls = ['/api/services/my-services/', '/api/appointments/provider/']
+        self._seed(1)
+        single = [self._count_queries(url) for url in urls]
+        self._seed(999)
+        many = [self._count_queries(url) for url in urls]
+
+        for url, (queries, data), (more_queries, more_data) in zip(urls, single, many):
+            self.assertEqual((len(data), len(more_data)), (1, 1000), url)
+            self.assertEqual(queries, more_queries, url)
+        self.assertEqual(many[0][1][0]['provider_name'], 'planprovider')
+        self.assertEqual(many[1][1][0]['provider']['profile']['firstname'], 'Plan')
+
+    def test_plan_follows_serializer(self):
+        """Test que se cargan las relaciones y columnas que lee el serializer, incluidas las declaradas en Meta.reads"""
+        queryset = optimize_queryset(Service.objects.all(), ProviderServiceSerializer)
+        self.assertEqual(queryset.query.select_related, {'category': {}, 'provider': {'user': {}}})
+        only, defer = queryset.query.deferred_loading
+        self.assertFalse(defer)
+        self.assertIn('provider__user__username', only)
+        self.assertNotIn('search_vector', only)
+        self.assertNotIn('provider__user__password', only)
+
+    def test_undeclared_computed_field_loads_all_columns(self):
+        """Test que un campo calculado sin Meta.reads carga todas las columnas de su nivel"""
+        from rest_framework import serializers
+
+        class CategoryWithCountSerializer(serializers.ModelSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Category
+                fields = ['id', 'label']
+
+            def get_label(self, obj):
+                return f'{obj.name} ({obj.description})'
+
+        only, _ = optimize_queryset(Category.objects.all(), CategoryWithCountSerializer).query.deferred_loading
+        self.assertEqual(set(only), {field.name for field in Category._meta.concrete_fields})
+
+    def test_nested_many_prefetched(self):
+        """Test que un serializer anidado de una relación múltiple se carga con prefetch_related"""
+        from rest_framework import serializers
+
+        class CategoryServicesSerializer(serializers.ModelSerializer):
+            services = ProviderServiceSerializer(many=True, read_only=True)
+
+            class Meta:
+                model = Category
+                fields = ['id', 'name', 'services']
+
+        self._seed(3)
+        Category.objects.create(name='Plan vacía')
+        with self.assertNumQueries(2):
+            data = CategoryServicesSerializer(
+                optimize_queryset(Category.objects.all(), CategoryServicesSerializer), many=True
+            ).data
+        self.assertEqual([len(category['services']) for category in data], [3, 0])
+        self.assertEqual(data[0]['services'][0]['provider_name'], 'planprovider')
+
+
+class KeysetPaginationTest(APITestCase):
+    """Tests de la paginación por keyset del catálogo (core/pagination.py)"""
+
+    url = '/api/services/services/'
+
+    def setUp(self):
+        cache.clear()
+        provider_user = User.objects.create_user(
+            username='keysetprovider', phone='+593994444441', password='testpass123',
+            role=User.Role.PROVIDER
+        )
+        provider = Provider.objects.create(
+            user=provider_user, is_active=True,
+            verification_status=Provider.VerificationStatus.APPROVED,
+            verified_at=timezone.now(),
+        )
+        category = Category.objects.create(name='Keyset')
+        self.services = [
+            Service.objects.create(
+                provider=provider, category=category, title=f'Servicio {i}',
+                price=10 + i % 3, duration_minutes=60,
+            )
+            for i in range(8)
+        ]
+        # Empates en el campo de orden: el id decide
+        Service.objects.filter(pk__in=[s.pk for s in self.services[:4]]).update(created_at=timezone.now())
+
+    def walk(self, url, link='next'):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(service['id'] for service in response.data['results'])
+            url, pages = response.data[link], pages + 1
+        return ids, pages
+
+    def expected(self, ordering):
+        tie_break = '-id' if ordering.startswith('-') else 'id'
+        return list(Service.objects.order_by(ordering, tie_break).values_list('id', flat=True))
+
+    def test_walks_every_row_once(self):
+        """Test que recorrer las páginas devuelve cada servicio una vez, en orden y con empates"""
+        for ordering in ('-created_at', 'price', '-price'):
+            with self.subTest(ordering=ordering):
+                ids, pages = self.walk(f'{self.url}?page_size=3&ordering={ordering}')
+                self.assertEqual(ids, self.expected(ordering))
+                self.assertEqual(pages, 3)
+
+    def test_previous_returns_same_pages(self):
+        """Test que volver atrás con previous reproduce las páginas anteriores"""
+        first = self.client.get(f'{self.url}?page_size=3&ordering=price')
+        second = self.client.get(first.data['next'])
+        third = self.client.get(second.data['next'])
+        self.assertIsNone(first.data['previous'])
+        self.assertIsNone(third.data['next'])
+
+        back = self.client.get(third.data['previous'])
+        self.assertEqual(back.data['results'], second.data['results'])
+        start = self.client.get(back.data['previous'])
+        self.assertEqual(start.data['results'], first.data['results'])
+        self.assertIsNone(start.data['previous'])
+
+    def test_no_count_by_default(self):
+        """Test que la página no ejecuta COUNT(*) salvo con include_total"""
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'page_size': 3})
+        self.assertNotIn('approximate_total', response.data)
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'].upper()])
+
+        if connection.vendor == 'postgresql':
+            # La estimación sale de las estadísticas del planificador
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {Service._meta.db_table}')
+        response = self.client.get(self.url, {'page_size': 3, 'include_total': 'true'})
+        self.assertEqual(response.data['approximate_total'], 8)
+
+    def test_invalid_cursor(self):
+        """Test que un cursor manipulado o de otro orden responde 404"""
+        self.assertEqual(self.client.get(self.url, {'cursor': 'no-es-un-cursor'}).status_code, status.HTTP_404_NOT_FOUND)
+
+        next_url = self.client.get(f'{self.url}?page_size=3&ordering=price').data['next']
+        other_ordering = next_url.replace('ordering=price', 'ordering=-created_at')
+        self.assertEqual(self.client.get(other_ordering).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_etag(self):
+        """Test que el ETag es propio de cada página y cambia con la versión del catálogo"""
+        params = {'page_size': 3, 'ordering': 'price'}
+        first = self.client.get(self.url, params)
+        second = self.client.get(first.data['next'])
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+        revalidated = self.client.get(self.url, params, headers={'If-None-Match': first['ETag']})
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Service.objects.filter(pk=self.services[-1].pk).update(title='Editado', updated_at=timezone.now())
+        revalidated = self.client.get(self.url, params, headers={'If-None-Match': first['ETag']})
+        self.assertEqual(revalidated.status_code, status.HTTP_200_OK)
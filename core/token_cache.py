@@ -0,0 +1,110 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+
+from core.instrumentation import record_cache
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 10000,   # tokens verificados que se recuerdan por proceso
+}
+
+
+class VerifiedTokenCache:
+    """
+    Cache LRU por proceso de tokens JWT ya verificados.
+
+    La clave es el SHA-256 del token completo, así que sólo un token idéntico
+    byte a byte (misma firma) reutiliza la verificación. Cada entrada vence
+    con el claim `exp` del token y se descarta al cambiar el usuario (ver
+    core/signals.py). Las comprobaciones de estado del usuario en
+    CustomJWTAuthentication.get_user se siguen haciendo en cada request.
+    """
+
+    def __init__(self, max_entries=10000, enabled=True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._by_user = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        conf = {**DEFAULT_SETTINGS, **getattr(settings, 'TOKEN_CACHE', {})}
+        return cls(max_entries=conf['MAX_ENTRIES'], enabled=conf['ENABLED'])
+
+    def get_validated_token(self, raw_token, validate):
+        """
+        Devolver el token validado desde cache o, en un fallo, llamar a
+        validate(raw_token) y recordar el resultado hasta que expire.
+        """
+        if not self.enabled:
+            return validate(raw_token)
+
+        digest = hashlib.sha256(raw_token).digest()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                expires_at, user_id, token = entry
+                if expires_at > now:
+                    self._entries.move_to_end(digest)
+                    record_cache(True)
+                    return token
+                self._remove(digest)
+
+        record_cache(False)
+        token = validate(raw_token)
+        expires_at = token.get('exp')
+        if expires_at is None or expires_at <= now:
+            return token
+
+        # Los tokens del login guardan el id como texto y los de for_user como entero
+        user_id = str(token.get(api_settings.USER_ID_CLAIM))
+        with self._lock:
+            self._entries[digest] = (expires_at, user_id, token)
+            self._entries.move_to_end(digest)
+            self._by_user.setdefault(user_id, set()).add(digest)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return token
+
+    def invalidate_user(self, user_id):
+        """Olvidar todos los tokens verificados de un usuario"""
+        with self._lock:
+            for digest in self._by_user.pop(str(user_id), ()):
+                self._entries.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _remove(self, digest):
+        _, user_id, _ = self._entries.pop(digest)
+        digests = self._by_user.get(user_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._by_user[user_id]
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = VerifiedTokenCache.from_settings()
+    return _token_cache
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import CustomTokenObtainPairView
+from .views import CustomTokenObtainPairView, LogoutView, SuspendUserView, DatabasePoolStatsView, RequestMetricsView
 from .views import test_connection
 
 app_name = 'core'
@@ -7,4 +7,8 @@ app_name = 'core'
 urlpatterns = [
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/ping/', test_connection),
+    path('api/logout/', LogoutView.as_view(), name='logout'),
+    path('api/admin/users/<int:user_id>/suspend/', SuspendUserView.as_view(), name='suspend_user'),
+    path('api/admin/db-pool/', DatabasePoolStatsView.as_view(), name='db_pool_stats'),
+    path('api/admin/request-metrics/', RequestMetricsView.as_view(), name='request_metrics'),
 ]
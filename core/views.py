@@ -1,12 +1,106 @@
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import CustomTokenObtainPairSerializer
+from .queries import QueryCounter
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from .models import User
+from .revocation import revoke_token, revoke_user_tokens
+from .db import all_pool_stats
+from .instrumentation import get_instrumentation
+from .queries import query_budget
 
+@query_budget(1)
 @api_view(['GET'])
 def test_connection(request):
     return Response({'status': 'ok', 'message': 'Conexión exitosa'})
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    rate_limits = [('login_ip', 'ip'), ('login_user', 'username')]
 
+    def post(self, request, *args, **kwargs):
+        # Reportar cuántas consultas hizo el login para vigilar la ruta rápida
+        with QueryCounter() as counter:
+            response = super().post(request, *args, **kwargs)
+        response['X-Query-Count'] = str(counter.count)
+        return response
+
+
+class LogoutView(APIView):
+    """
+    Revoca el token de acceso actual y, si se envía, el refresh token.
+    Con "all": true se revocan todos los tokens del usuario.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        refresh = request.data.get('refresh')
+        if refresh:
+            try:
+                refresh_token = RefreshToken(refresh)
+            except TokenError:
+                return Response({'error': 'Refresh token inválido'}, status=status.HTTP_400_BAD_REQUEST)
+            if str(refresh_token.get('user_id')) != str(request.user.pk):
+                return Response({'error': 'Refresh token inválido'}, status=status.HTTP_400_BAD_REQUEST)
+            revoke_token(refresh_token)
+
+        if request.auth is not None:
+            revoke_token(request.auth)
+        if str(request.data.get('all', '')).lower() in ('1', 'true'):
+            revoke_user_tokens(request.user.pk)
+
+        return Response({'message': 'Sesión cerrada correctamente'}, status=status.HTTP_200_OK)
+
+
+class SuspendUserView(APIView):
+    """Suspende una cuenta y revoca todos sus tokens emitidos"""
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, user_id):
+        user = get_object_or_404(User, pk=user_id)
+        user.disabled = True
+        user.disabled_at = timezone.now()
+        user.disabled_reason = request.data.get('reason', 'Sin razón especificada')
+        user.save(update_fields=['disabled', 'disabled_at', 'disabled_reason', 'updated_at'])
+        revoke_user_tokens(user.pk)
+
+        return Response({
+            'status': 'success',
+            'message': 'Usuario suspendido',
+            'user_id': user.pk,
+        })
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    Estado del pool de conexiones a la base de datos del worker que atiende
+    el request (cada proceso de gunicorn tiene su propio pool).
+    """
+    permission_classes = [IsAdminUser]
+    query_budget = 1
+
+    def get(self, request):
+        return Response(all_pool_stats())
+
+
+class RequestMetricsView(APIView):
+    """
+    Percentiles por ruta de los requests que atendió este worker (ver
+    core/instrumentation.py). DELETE reinicia el agregado.
+    """
+    permission_classes = [IsAdminUser]
+    query_budget = 1
+
+    def get(self, request):
+        return Response(get_instrumentation().snapshot())
+
+    def delete(self, request):
+        get_instrumentation().reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
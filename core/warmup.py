@@ -0,0 +1,28 @@
+import logging
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def warm_caches(paths=None):
+    """
+    Ejecutar las funciones de settings.WORKER_WARMUP al arrancar un worker
+    (ver gunicorn.conf.py), para que el primer request no pague las caches
+    vacías. Un warmer que falla se registra y no impide arrancar el worker.
+    Devuelve {ruta: segundos} con None para los que fallaron.
+    """
+    results = {}
+    for path in getattr(settings, 'WORKER_WARMUP', []) if paths is None else paths:
+        started = time.perf_counter()
+        try:
+            import_string(path)()
+        except Exception:
+            logger.warning("Falló el warmup %s", path, exc_info=True)
+            results[path] = None
+        else:
+            results[path] = time.perf_counter() - started
+
+    return results
@@ -0,0 +1,127 @@
+"""
+Configuración de gunicorn para producción.
+
+gunicorn la carga sola desde el directorio del proyecto (o con
+`gunicorn -c gunicorn.conf.py`); start_gunicorn.sh la usa. Todo se ajusta
+con variables de entorno (o .env):
+
+    GUNICORN_PROFILE         default | cpu | io (valores base, ver PROFILES)
+    SERVER_MODE              asgi (por defecto) | wsgi
+    GUNICORN_WORKER_CLASS    sync | gthread | uvicorn
+    GUNICORN_WORKERS         procesos (por defecto según CPUs y perfil)
+    GUNICORN_THREADS         hilos por worker (sólo gthread)
+    GUNICORN_TIMEOUT         segundos antes de reiniciar un worker colgado
+    GUNICORN_MAX_REQUESTS    requests antes de reciclar un worker (0 = nunca)
+    GUNICORN_MAX_REQUESTS_JITTER  aleatorio sumado a MAX_REQUESTS
+    GUNICORN_PRELOAD         cargar la app en el master antes del fork
+    GUNICORN_WARMUP          ejecutar settings.WORKER_WARMUP en cada worker
+    GUNICORN_BIND            dirección de escucha
+
+Las subidas de imágenes (/api/images/) pasan casi todo el tiempo esperando
+a la red y al almacenamiento, mientras que el catálogo es JSON generado en
+CPU. Para ajustarlos por separado se levantan dos instancias y el proxy
+enruta /api/images/ a la de perfil `io`:
+
+    GUNICORN_PROFILE=cpu GUNICORN_BIND=0.0.0.0:8000 ./start_gunicorn.sh
+    GUNICORN_PROFILE=io  GUNICORN_BIND=0.0.0.0:8001 ./start_gunicorn.sh
+"""
+
+import os
+
+# `config` es un setting de gunicorn: el nombre no puede quedar en el módulo
+from decouple import config as _config
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'uvicorn': 'uvicorn.workers.UvicornWorker',
+}
+
+
+def _cpu_count():
+    # Respeta la afinidad de CPU del contenedor cuando el sistema la expone
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+CPUS = _cpu_count()
+
+PROFILES = {
+    # Workers de uvicorn: las vistas de lectura son async y bajo WSGI cada
+    # request pagaría async_to_sync; los recomendados por gunicorn
+    'default': {'worker_class': 'uvicorn', 'workers': 2 * CPUS + 1, 'threads': 1, 'timeout': 30},
+    # JSON del catálogo: un proceso por núcleo más uno para cubrir esperas de BD
+    'cpu': {'worker_class': 'uvicorn', 'workers': CPUS + 1, 'threads': 1, 'timeout': 30},
+    # Subidas de imágenes: pocos procesos con muchos hilos y más margen de tiempo
+    'io': {'worker_class': 'gthread', 'workers': CPUS, 'threads': 16, 'timeout': 120},
+}
+
+profile = PROFILES[_config('GUNICORN_PROFILE', default='default')]
+
+# SERVER_MODE=wsgi vuelve a los workers síncronos en los perfiles que usan uvicorn
+_default_class = profile['worker_class']
+if _default_class == 'uvicorn' and _config('SERVER_MODE', default='asgi') == 'wsgi':
+    _default_class = 'sync'
+_worker_class = _config('GUNICORN_WORKER_CLASS', default=_default_class)
+
+worker_class = WORKER_CLASSES[_worker_class]
+wsgi_app = (
+    'backend_homeService.asgi:application' if _worker_class == 'uvicorn'
+    else 'backend_homeService.wsgi:application'
+)
+workers = _config('GUNICORN_WORKERS', default=profile['workers'], cast=int)
+threads = _config('GUNICORN_THREADS', default=profile['threads'], cast=int) if _worker_class == 'gthread' else 1
+timeout = _config('GUNICORN_TIMEOUT', default=profile['timeout'], cast=int)
+graceful_timeout = _config('GUNICORN_GRACEFUL_TIMEOUT', default=timeout, cast=int)
+keepalive = _config('GUNICORN_KEEPALIVE', default=5, cast=int)
+bind = _config('GUNICORN_BIND', default='0.0.0.0:8000')
+backlog = _config('GUNICORN_BACKLOG', default=2048, cast=int)
+
+# Reciclar workers acota el crecimiento de memoria; el jitter evita que
+# todos se reinicien a la vez
+max_requests = _config('GUNICORN_MAX_REQUESTS', default=1000, cast=int)
+max_requests_jitter = _config('GUNICORN_MAX_REQUESTS_JITTER', default=max_requests // 10, cast=int)
+
+# Con preload el código se importa una vez en el master y se comparte con
+# copy-on-write; las conexiones abiertas durante la carga se cierran antes del fork
+preload_app = _config('GUNICORN_PRELOAD', default=True, cast=bool)
+warmup = _config('GUNICORN_WARMUP', default=True, cast=bool)
+
+# '-' escribe el access log en stdout; desactivado por defecto como antes
+accesslog = _config('GUNICORN_ACCESS_LOG', default=None)
+loglevel = _config('GUNICORN_LOG_LEVEL', default='info')
+
+
+def _close_db_connections():
+    from core.db import close_all_connections
+    close_all_connections()
+
+
+def pre_fork(server, worker):
+    # Un socket de PostgreSQL (o un pool) heredado por varios workers corrompe el protocolo
+    if preload_app:
+        _close_db_connections()
+
+
+def post_fork(server, worker):
+    # El worker empieza sin conexiones propias: si heredó alguna (abierta por
+    # otro hook del master) la descarta antes de su primer request
+    if preload_app:
+        _close_db_connections()
+
+
+def post_worker_init(worker):
+    if not warmup:
+        return
+    from core.warmup import warm_caches
+    for path, took in warm_caches().items():
+        if took is None:
+            worker.log.warning("Warmup %s falló en el worker %s", path, worker.pid)
+        else:
+            worker.log.info("Warmup %s: %.0f ms (worker %s)", path, took * 1000, worker.pid)
+    # La conexión de este hilo no es la que usarán los requests con gthread o
+    # uvicorn; con DB_POOL vuelve al pool, que queda abierto para el worker
+    from django.db import connections
+    connections.close_all()
@@ -1,6 +1,6 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.core.cache import cache
+from core.cache import shared_cache
 from .models import UserProfileImage, ServiceImage, ImageUploadLog
 import logging
 
@@ -14,7 +14,7 @@ def user_profile_image_saved(sender, instance, created, **kwargs):
         
         # Limpiar cache relacionado con el usuario
         cache_key = f"user_profile_{instance.user.id}"
-        cache.delete(cache_key)
+        shared_cache.delete(cache_key)
 
 @receiver(post_delete, sender=UserProfileImage)
 def user_profile_image_deleted(sender, instance, **kwargs):
@@ -23,7 +23,7 @@ def user_profile_image_deleted(sender, instance, **kwargs):
     
     # Limpiar cache relacionado con el usuario
     cache_key = f"user_profile_{instance.user.id}"
-    cache.delete(cache_key)
+    shared_cache.delete(cache_key)
 
 @receiver(post_save, sender=ServiceImage)
 def service_image_saved(sender, instance, created, **kwargs):
@@ -33,7 +33,7 @@ def service_image_saved(sender, instance, created, **kwargs):
         
         # Limpiar cache relacionado con el servicio
         cache_key = f"service_images_{instance.service.id}"
-        cache.delete(cache_key)
+        shared_cache.delete(cache_key)
         
         # Si es la primera imagen, marcarla como principal
         if not ServiceImage.objects.filter(service=instance.service, is_primary=True).exists():
@@ -48,7 +48,7 @@ def service_image_deleted(sender, instance, **kwargs):
     
     # Limpiar cache relacionado con el servicio
     cache_key = f"service_images_{instance.service.id}"
-    cache.delete(cache_key)
+    shared_cache.delete(cache_key)
     
     # Si era la imagen principal, asignar otra como principal
     if instance.is_primary:
@@ -19,6 +19,7 @@ import logging
 # Swagger (drf_yasg)
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from core.queries import query_budget
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,7 @@ class UserProfileImageView(generics.RetrieveUpdateDestroyAPIView):
     """Vista para gestionar la imagen de perfil del usuario autenticado"""
     serializer_class = UserProfileImageSerializer
     permission_classes = [IsProfileOwner]
+    query_budget = 2
     parser_classes = [MultiPartParser, FormParser]
     
     def get_object(self):
@@ -99,6 +101,7 @@ class ServiceImageListCreateView(generics.ListCreateAPIView):
     """Vista para listar y crear imágenes de servicios"""
     serializer_class = ServiceImageSerializer
     permission_classes = [CanManageServiceImages]
+    query_budget = 4
     parser_classes = [MultiPartParser, FormParser]
     
     def get_queryset(self):
@@ -153,6 +156,7 @@ class ServiceImageDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Vista para gestionar una imagen específica de servicio"""
     serializer_class = ServiceImageSerializer
     permission_classes = [IsServiceOwner]
+    query_budget = 2
     parser_classes = [MultiPartParser, FormParser]
     
     def get_queryset(self):
@@ -272,12 +276,13 @@ class ImageUploadLogListView(generics.ListAPIView):
     """Vista para listar logs de subida de imágenes"""
     serializer_class = ImageUploadLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
     
     def get_queryset(self):
         """Obtener logs del usuario actual"""
         if getattr(self, 'swagger_fake_view', False):
             return ImageUploadLog.objects.none()
-        return ImageUploadLog.objects.filter(user=self.request.user)
+        return ImageUploadLog.objects.filter(user=self.request.user).select_related('user')
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -304,6 +309,7 @@ def set_primary_image(request, image_id):
             'error': str(e)
         }, status=status.HTTP_400_BAD_REQUEST)
 
+@query_budget(8)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def service_images_summary(request, service_id):
@@ -315,7 +321,7 @@ def service_images_summary(request, service_id):
         if service.provider.user != request.user:
             raise PermissionDenied("No tienes permisos para ver este servicio.")
         
-        images = ServiceImage.objects.filter(service=service, is_active=True)
+        images = ServiceImage.objects.filter(service_id=service.id, is_active=True)
         primary_image = images.filter(is_primary=True).first()
         
         if not images.exists():
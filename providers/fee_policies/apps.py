@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FeePoliciesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'providers.fee_policies'
+
+    def ready(self):
+        import providers.fee_policies.signals
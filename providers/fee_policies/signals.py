@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.cache import tiered_cache
+from providers.services.models import Category
+from .models import FeePolicy
+from .views import FEE_POLICY_CACHE
+
+
+@receiver(post_save, sender=FeePolicy)
+@receiver(post_delete, sender=FeePolicy)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_fee_policy_cache(sender, instance, **kwargs):
+    """Descartar las políticas vigentes cacheadas (incluyen su categoría)"""
+    cache = tiered_cache(FEE_POLICY_CACHE)
+    cache.invalidate()
+    # Evita que un request concurrente guarde datos previos al commit
+    transaction.on_commit(cache.invalidate)
@@ -1,3 +1,65 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from core.cache import tiered_cache
+from core.models import User
+from providers.fee_policies.models import FeePolicy
+from providers.fee_policies.views import FEE_POLICY_CACHE
+from providers.services.models import Category
+
+
+class CurrentFeePolicyViewTest(APITestCase):
+    """Tests para las políticas de comisión vigentes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='feeuser',
+            phone='+593991234567',
+            password='testpass123',
+            role=User.Role.CONSUMER
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Limpieza')
+        today = timezone.now().date()
+        self.policy = FeePolicy.objects.create(
+            category=self.category,
+            fee_percentage='10.00',
+            valid_from=today - timedelta(days=1),
+            valid_to=today + timedelta(days=30),
+            created_by=self.user
+        )
+
+    def test_current_policies_cached_and_invalidated(self):
+        """Test que las políticas vigentes se cachean y se invalidan al cambiar"""
+        # La versión se consulta en la primera petición y no vuelve a caducar
+        # durante el test, por lento que sea
+        poll = patch.object(tiered_cache(FEE_POLICY_CACHE), 'poll_interval', 60)
+        poll.start()
+        self.addCleanup(poll.stop)
+
+        response = self.client.get('/api/fee-policies/policies/current/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['fee_percentage'], '10.00')
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/fee-policies/policies/current/')
+
+        self.policy.fee_percentage = '12.50'
+        self.policy.save()
+        response = self.client.get('/api/fee-policies/policies/current/')
+        self.assertEqual(response.data[0]['fee_percentage'], '12.50')
+
+    def test_category_change_invalidates_policies(self):
+        """Test que renombrar la categoría actualiza las políticas cacheadas"""
+        self.client.get('/api/fee-policies/policies/current/')
+
+        self.category.name = 'Limpieza profunda'
+        self.category.save()
+
+        response = self.client.get('/api/fee-policies/policies/current/')
+        self.assertEqual(response.data[0]['category']['name'], 'Limpieza profunda')
@@ -1,38 +1,62 @@
 from rest_framework import generics, permissions
+from rest_framework.response import Response
 from .models import FeePolicy
 from .serializers import FeePolicySerializer
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
+from core.cache import tiered_cache
+
+# Espacio de nombres de core.cache.TieredCache; se invalida en signals.py
+FEE_POLICY_CACHE = 'fee_policies'
 
 class FeePolicyListView(generics.ListCreateAPIView):
     serializer_class = FeePolicySerializer
     permission_classes = [permissions.IsAdminUser]
+    query_budget = 2
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['category', 'is_active']
 
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             return FeePolicy.objects.none()
-        return FeePolicy.objects.all().order_by('-valid_from')
+        return FeePolicy.objects.select_related('category', 'created_by').order_by('-valid_from')
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
 class FeePolicyDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = FeePolicy.objects.all()
+    queryset = FeePolicy.objects.select_related('category', 'created_by')
     serializer_class = FeePolicySerializer
     permission_classes = [permissions.IsAdminUser]
+    query_budget = 2
 
 class CurrentFeePolicyView(generics.ListAPIView):
     serializer_class = FeePolicySerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
 
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             return FeePolicy.objects.none()
-        today = timezone.now().date()
-        return FeePolicy.objects.filter(
-            valid_from__lte=today,
-            valid_to__gte=today,
-            is_active=True
-        )
\ No newline at end of file
+        return _current_queryset(timezone.now().date())
+
+    def list(self, request, *args, **kwargs):
+        return Response(current_fee_policies())
+
+
+def _current_queryset(today):
+    return FeePolicy.objects.filter(
+        valid_from__lte=today,
+        valid_to__gte=today,
+        is_active=True
+    ).select_related('category', 'created_by')
+
+
+def current_fee_policies():
+    """Políticas vigentes serializadas, desde la TieredCache (core/warmup.py la precarga)"""
+    # La vigencia depende del día, así que forma parte de la clave
+    today = timezone.now().date()
+    return tiered_cache(FEE_POLICY_CACHE).get_or_set(
+        f'current:{today.isoformat()}',
+        lambda: FeePolicySerializer(_current_queryset(today), many=True).data
+    )
\ No newline at end of file
@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from core.models import User
+from core.revocation import revoke_user_tokens
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
@@ -90,4 +91,7 @@ class Provider(models.Model):
         self.save()
         
         # Desactivar servicios asociados
-        self.services.update(is_active=False)
\ No newline at end of file
+        self.services.update(is_active=False)
+
+        # Cerrar las sesiones abiertas del proveedor
+        revoke_user_tokens(self.user_id)
\ No newline at end of file
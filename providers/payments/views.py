@@ -15,6 +15,7 @@ from .serializers import (
 class ProviderPaymentListView(generics.ListAPIView):
     serializer_class = ProviderPaymentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
     queryset = ProviderPayment.objects.none()
 
     def get_queryset(self):
@@ -27,6 +28,7 @@ class ProviderPaymentListView(generics.ListAPIView):
 class PaymentSimulationView(generics.GenericAPIView):
     serializer_class = PaymentSimulationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    rate_limits = [('payment_user', 'user')]
 
     def post(self, request, *args, **kwargs):
         """Procesar simulación de pago"""
@@ -214,6 +216,7 @@ class PaymentHistoryView(generics.ListAPIView):
     """Vista mejorada para historial de pagos"""
     serializer_class = ProviderPaymentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
     
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
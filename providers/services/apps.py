@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ServicesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'providers.services'
+
+    def ready(self):
+        import providers.services.signals
+        post_migrate.connect(create_trigram_indexes, sender=self)
+
+
+def create_trigram_indexes(sender, using, **kwargs):
+    """Los índices de trigramas dependen de pg_trgm y no se declaran en los modelos"""
+    from .suggest import install_trigram_indexes
+    install_trigram_indexes(using)
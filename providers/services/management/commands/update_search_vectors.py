@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from providers.services.models import Service
+
+
+class Command(BaseCommand):
+    help = 'Recalcular el vector de búsqueda de los servicios (p. ej. tras añadir la columna)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        database, batch_size = options['database'], options['batch_size']
+        services = Service.objects.using(database).order_by('pk')
+        updated, last_pk = 0, 0
+        # Por lotes de ids, para que cada UPDATE sea una transacción corta
+        while True:
+            pks = list(services.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            updated += services.filter(pk__in=pks).update_search_vector()
+            last_pk = pks[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'Se actualizaron {updated} servicios.'))
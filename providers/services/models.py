@@ -1,6 +1,10 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from providers.models import Provider
 from django.core.validators import MinValueValidator, MaxValueValidator
+from core.response_cache import response_cache
+from .search import SEARCH_WEIGHTS, search_vector
 
 class Category(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -16,6 +20,51 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+# Espacio de nombres de core.response_cache con las respuestas del listado de
+# servicios (con su categoría, proveedor e imágenes); se invalida en
+# signals.py y en las escrituras masivas de Service
+CATALOG_CACHE = 'catalog'
+
+
+class ServiceQuerySet(models.QuerySet):
+    """
+    Mantiene Service.search_vector al día en las escrituras masivas, que no
+    pasan por save() ni por post_save: update() (y bulk_update, que lo usa)
+    recalcula el vector en la misma sentencia si cambian el título o la
+    descripción, y bulk_create lo calcula para las filas insertadas. Ambos
+    invalidan las respuestas cacheadas del catálogo.
+    """
+
+    def update(self, **kwargs):
+        if SEARCH_WEIGHTS.keys() & kwargs.keys() and 'search_vector' not in kwargs:
+            kwargs['search_vector'] = search_vector(**{
+                field: kwargs[field] for field in SEARCH_WEIGHTS if field in kwargs
+            })
+        rows = super().update(**kwargs)
+        if rows:
+            response_cache(CATALOG_CACHE).invalidate()
+        return rows
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        pks = [obj.pk for obj in objs if obj.pk is not None]
+        if pks:
+            self.model.objects.using(self.db).filter(pk__in=pks).update_search_vector()
+        if objs:
+            response_cache(CATALOG_CACHE).invalidate()
+        return objs
+
+    bulk_create.alters_data = True
+
+    def update_search_vector(self):
+        """Recalcular el vector de búsqueda de las filas del queryset"""
+        return super().update(search_vector=search_vector())
+
+    update_search_vector.alters_data = True
+
+
 class Service(models.Model):
     provider = models.ForeignKey(
         Provider, 
@@ -39,6 +88,10 @@ class Service(models.Model):
     photo = models.URLField(max_length=300, blank=True)  # <--- Nuevo campo
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Título (peso A) y descripción (peso B) en configuración 'spanish' (search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ServiceQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Service'
@@ -47,8 +100,29 @@ class Service(models.Model):
             models.Index(fields=['provider']),
             models.Index(fields=['category']),
             models.Index(fields=['is_active']),
+            # Paginación por keyset del catálogo (core/pagination.py): una
+            # entrada por servicio activo en cada orden de ServiceListView
+            models.Index(
+                fields=['-created_at', '-id'], name='service_active_created_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['price', 'id'], name='service_active_price_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # Búsqueda de texto del catálogo (search.ServiceSearchFilter)
+            GinIndex(fields=['search_vector'], name='service_search_vector_idx'),
         ]
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.title} - {self.provider.user.username}"
\ No newline at end of file
+        return f"{self.title} - {self.provider.user.username}"
+
+    def save(self, *args, **kwargs):
+        # El vector se calcula en el mismo INSERT/UPDATE que el título y la descripción
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'search_vector', *SEARCH_WEIGHTS} & set(update_fields):
+            self.search_vector = search_vector(title=self.title, description=self.description)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_vector'}
+        super().save(*args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,107 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast
+from rest_framework import filters
+
+# Configuración de texto de PostgreSQL: stemming y stopwords en español
+SEARCH_CONFIG = 'spanish'
+
+# Campos indexados y su peso en el ranking (A pesa más que B)
+SEARCH_WEIGHTS = {'title': 'A', 'description': 'B'}
+
+# Términos que se tienen en cuenta por búsqueda
+MAX_SEARCH_TERMS = 8
+
+# Un término más corto no se expande como prefijo: "a:*" coincidiría con casi todo
+MIN_PREFIX_LENGTH = 2
+
+# Con más coincidencias los resultados se ordenan por fecha: calcular
+# ts_rank de todas las filas y ordenarlas costaría más que la búsqueda
+# (prefijos cortos, términos que aparecen en casi todo el catálogo)
+MAX_RANKED_ROWS = 1000
+
+_TERM = re.compile(r'([^\W_]+)(\*?)')
+
+
+def search_vector(**values):
+    """
+    Expresión del tsvector de un servicio. Por defecto lee las columnas;
+    `values` sustituye alguna por el valor o la expresión que se va a
+    guardar (en un UPDATE, PostgreSQL evalúa las columnas con el valor
+    anterior).
+    """
+    vector = None
+    for field, weight in SEARCH_WEIGHTS.items():
+        value = values.get(field, F(field))
+        if not hasattr(value, 'resolve_expression'):
+            value = Value(value or '')
+        part = SearchVector(value, config=SEARCH_CONFIG, weight=weight)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def tsquery_text(text):
+    """
+    Convertir lo que escribe el usuario en el texto de un tsquery: todos los
+    términos deben aparecer (AND) y el último, mientras se sigue escribiendo,
+    o los que terminan en `*` se buscan como prefijo. Sólo se conservan
+    letras y números, así que la entrada no puede inyectar operadores de
+    tsquery. Devuelve None si no queda ningún término.
+    """
+    terms = _TERM.findall(text)[:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+    typing = not text[-1:].isspace()
+    lexemes = []
+    for index, (term, star) in enumerate(terms):
+        prefix = star or (typing and index == len(terms) - 1)
+        suffix = ':*' if prefix and len(term) >= MIN_PREFIX_LENGTH else ''
+        lexemes.append(f"'{term.lower()}'{suffix}")
+    return ' & '.join(lexemes)
+
+
+def parse_search_query(text):
+    """SearchQuery para `text` (ver tsquery_text), o None si no hay términos"""
+    query = tsquery_text(text)
+    if query is None:
+        return None
+    return SearchQuery(query, search_type='raw', config=SEARCH_CONFIG)
+
+
+class ServiceSearchFilter(filters.SearchFilter):
+    """
+    ?search= sobre el tsvector de Service (índice GIN) con los resultados
+    ordenados por relevancia (anotación `search_rank`), salvo que se pida
+    otro orden con ?ordering= o que haya más de MAX_RANKED_ROWS
+    coincidencias: entonces se usa el orden de OrderingFilter. Debe ir
+    antes de OrderingFilter en filter_backends: la paginación toma el orden
+    del primer backend que lo define.
+    """
+
+    rank_ordering = '-search_rank'
+
+    def filter_queryset(self, request, queryset, view):
+        query = self._query(request)
+        if query is None:
+            return queryset
+        queryset = queryset.filter(search_vector=query)
+        if filters.OrderingFilter.ordering_param in request.query_params or self._is_broad(queryset):
+            return queryset
+        # ts_rank devuelve real; como double precision el valor que llega a
+        # Python es exacto y el cursor de la paginación lo compara sin redondeos
+        rank = Cast(SearchRank(F('search_vector'), query), FloatField())
+        return queryset.annotate(search_rank=rank)
+
+    def get_ordering(self, request, queryset, view):
+        if 'search_rank' in queryset.query.annotations:
+            return (self.rank_ordering,)
+        return filters.OrderingFilter().get_ordering(request, queryset, view)
+
+    def _is_broad(self, queryset):
+        # Recorre como mucho MAX_RANKED_ROWS + 1 coincidencias del índice GIN
+        return queryset.order_by()[MAX_RANKED_ROWS:MAX_RANKED_ROWS + 1].exists()
+
+    def _query(self, request):
+        return parse_search_query(request.query_params.get(self.search_param, ''))
@@ -25,6 +25,8 @@ class ProviderServiceSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at', 'provider_name']
         ref_name = 'ProviderService'
+        # get_provider_name y Service.__str__ (core.queries.optimize_queryset)
+        reads = ['provider__user__username']
 
     def get_provider_name(self, obj):
         return obj.provider.user.username
@@ -70,3 +72,20 @@ class CategoryCreateSerializer(serializers.ModelSerializer):
         model = Category
         fields = ['id', 'name', 'description', 'icon_url', 'is_active']
         read_only_fields = ['id']
+
+
+class ServiceSuggestionSerializer(serializers.Serializer):
+    text = serializers.CharField()
+    type = serializers.ChoiceField(choices=['category', 'service', 'provider'])
+    id = serializers.IntegerField()
+
+    class Meta:
+        ref_name = 'ServiceSuggestion'
+
+
+class ServiceSuggestResponseSerializer(serializers.Serializer):
+    query = serializers.CharField(help_text='Texto normalizado al que corresponden las sugerencias')
+    suggestions = ServiceSuggestionSerializer(many=True)
+
+    class Meta:
+        ref_name = 'ServiceSuggestResponse'
@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.cache import tiered_cache
+from core.response_cache import response_cache
+from core.models import User
+from providers.models import Provider
+from .models import CATALOG_CACHE, Category, Service
+from .views import CATEGORY_CACHE
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    """Descartar el listado de categorías cacheado en todos los workers"""
+    cache = tiered_cache(CATEGORY_CACHE)
+    cache.invalidate()
+    # Evita que un request concurrente guarde datos previos al commit
+    transaction.on_commit(cache.invalidate)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=Provider)
+@receiver(post_delete, sender=Provider)
+@receiver(post_save, sender='image_storage.ServiceImage')
+@receiver(post_delete, sender='image_storage.ServiceImage')
+def invalidate_catalog_responses(sender, instance, **kwargs):
+    """
+    Descartar las respuestas cacheadas del catálogo en todos los workers; el
+    listado de servicios incluye la categoría, el proveedor y las imágenes
+    """
+    response_cache(CATALOG_CACHE).invalidate()
+
+
+@receiver(post_save, sender=User)
+def invalidate_catalog_on_username(sender, instance, created=False, update_fields=None, **kwargs):
+    """provider_name es el username del proveedor: sólo cuenta si cambia el de un proveedor"""
+    if created or instance.role != User.Role.PROVIDER:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    if instance.username_changed():
+        response_cache(CATALOG_CACHE).invalidate()
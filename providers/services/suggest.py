@@ -0,0 +1,185 @@
+import re
+import threading
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, connections, router
+from django.db.models import F, FloatField, Max, Min, Value
+from django.db.models.functions import Lower
+
+from core.cache import LocalLRUCache
+from core.instrumentation import record_cache
+
+DEFAULT_SETTINGS = {
+    'LIMIT': 8,             # sugerencias por defecto
+    'MAX_LIMIT': 20,        # máximo que se puede pedir con ?limit=
+    'MIN_LENGTH': 2,        # caracteres mínimos para buscar
+    'MAX_LENGTH': 64,       # el resto del texto se ignora
+    'CACHE_ENTRIES': 2000,  # prefijos recientes por proceso
+    'CACHE_TIMEOUT': 60,    # segundos que una sugerencia cacheada sigue valiendo
+}
+
+
+def get_suggest_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'SERVICE_SUGGEST', {})}
+
+
+def _sources():
+    """
+    (tipo, modelo, campo, filtro) de cada origen de sugerencias. El filtro
+    incluye la condición del índice parcial de TRIGRAM_INDEXES. El nombre
+    visible de un proveedor es su username (provider_name en el catálogo);
+    sólo se sugieren proveedores aprobados, activos y sin suspender.
+    """
+    from core.models import User
+    from providers.models import Provider
+    from .models import Category, Service
+
+    return [
+        ('category', Category, 'name', {'is_active': True}),
+        ('service', Service, 'title', {'is_active': True}),
+        ('provider', User, 'username', {
+            'role': User.Role.PROVIDER,
+            'is_active': True,
+            'disabled': False,
+            'provider__is_active': True,
+            'provider__verification_status': Provider.VerificationStatus.APPROVED,
+        }),
+    ]
+
+
+def _index_conditions():
+    from core.models import User
+    return {'category': 'is_active', 'service': 'is_active', 'provider': f"role = '{User.Role.PROVIDER}'"}
+
+
+# Índices GIN de trigramas (extensión pg_trgm). Se crean en post_migrate
+# (install_trigram_indexes) porque dependen de la extensión, que no se
+# declara en los modelos.
+TRIGRAM_INDEXES = {
+    'category': 'category_name_trgm_idx',
+    'service': 'service_title_trgm_idx',
+    'provider': 'user_provider_username_trgm_idx',
+}
+
+
+def install_trigram_indexes(using):
+    """
+    Crear la extensión pg_trgm y los índices de TRIGRAM_INDEXES.
+    Idempotente. Las sugerencias no funcionan sin pg_trgm: si no se puede
+    crear, migrate falla.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DatabaseError as exc:
+        raise ImproperlyConfigured(
+            f"Las sugerencias requieren la extensión pg_trgm de PostgreSQL: {exc}"
+        ) from exc
+
+    conditions = _index_conditions()
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for kind, model, field, _ in _sources():
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {quote(TRIGRAM_INDEXES[kind])} ON {quote(model._meta.db_table)} '
+                f'USING gin ({quote(model._meta.get_field(field).column)} gin_trgm_ops) '
+                f'WHERE {conditions[kind]}'
+            )
+
+
+def normalize_query(text):
+    """Texto de búsqueda sin espacios repetidos ni mayúsculas, recortado a MAX_LENGTH"""
+    return re.sub(r'\s+', ' ', text).strip().lower()[:get_suggest_settings()['MAX_LENGTH']]
+
+
+def _candidates(kind, model, field, filters, query, limit, using):
+    """
+    Los `limit` textos distintos (sin distinguir mayúsculas) de un origen que
+    mejor coinciden, con su puntuación. Filtra con el operador de similitud
+    por palabra de pg_trgm (usa el índice GIN) y puntúa con word_similarity.
+    """
+    queryset = (
+        model._default_manager.using(using).filter(**filters)
+        .filter(**{f'{field}__trigram_word_similar': query})
+    )
+    score = TrigramWordSimilarity(query, field)
+    return (
+        queryset.annotate(key=Lower(field)).order_by().values('key')
+        .annotate(text=Min(field), object_id=Min('pk'), score=Max(score, output_field=FloatField()))
+        .annotate(kind=Value(kind))
+        .values_list('kind', 'object_id', 'text', 'score')
+        .order_by('-score', F('text').asc())[:limit]
+    )
+
+
+def suggest(query, limit, using=None):
+    """
+    Sugerencias para `query` (ya normalizado) de categorías, servicios y
+    proveedores, ordenadas por puntuación y sin textos repetidos: si el
+    mismo texto sale de varios orígenes queda el de mayor puntuación.
+    """
+    if using is None:
+        from .models import Service
+        using = router.db_for_read(Service)
+    querysets = [
+        _candidates(kind, model, field, filters, query, limit, using)
+        for kind, model, field, filters in _sources()
+    ]
+    if connections[using].features.supports_slicing_ordering_in_compound:
+        rows = list(querysets[0].union(*querysets[1:], all=True))
+    else:
+        rows = [row for queryset in querysets for row in queryset]
+
+    best = {}
+    for kind, object_id, text, score in rows:
+        key = text.casefold()
+        if key not in best or score > best[key]['score']:
+            best[key] = {'text': text, 'type': kind, 'id': object_id, 'score': score}
+    ranked = sorted(best.values(), key=lambda item: (-item['score'], item['text'].casefold()))[:limit]
+    return [{'text': item['text'], 'type': item['type'], 'id': item['id']} for item in ranked]
+
+
+class SuggestionCache:
+    """
+    Sugerencias recientes por proceso: mientras se escribe llegan muchos
+    requests con los mismos prefijos cortos, que se sirven sin consultar la
+    base de datos. Las entradas caducan a los CACHE_TIMEOUT segundos.
+    """
+
+    def __init__(self, max_entries=2000, timeout=60):
+        self.cache = LocalLRUCache(max_entries=max_entries, timeout=timeout)
+
+    @classmethod
+    def from_settings(cls):
+        conf = get_suggest_settings()
+        return cls(max_entries=conf['CACHE_ENTRIES'], timeout=conf['CACHE_TIMEOUT'])
+
+    def get(self, query, limit):
+        suggestions = self.cache.get((query, limit))
+        record_cache(suggestions is not None)
+        return suggestions
+
+    def set(self, query, limit, suggestions):
+        self.cache.set((query, limit), suggestions)
+
+    def clear(self):
+        self.cache.clear()
+
+
+_suggestion_cache = None
+_suggestion_cache_lock = threading.Lock()
+
+
+def get_suggestion_cache():
+    """SuggestionCache compartida del proceso"""
+    global _suggestion_cache
+    if _suggestion_cache is None:
+        with _suggestion_cache_lock:
+            if _suggestion_cache is None:
+                _suggestion_cache = SuggestionCache.from_settings()
+    return _suggestion_cache
@@ -1,10 +1,12 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from datetime import date, timedelta
 from decimal import Decimal
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from core.models import User
 from users.models import UserProfile
@@ -392,10 +394,10 @@ class ServiceViewsTest(APITestCase):
         response = self.client.get('/api/services/services/')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIsInstance(response.data, list)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
         
-        service_data = response.data[0]
+        service_data = response.data['results'][0]
         self.assertEqual(service_data['title'], 'Limpieza de Hogar')
         self.assertEqual(service_data['price'], '50.00')
 
@@ -461,6 +463,28 @@ class CategoryViewsTest(APITestCase):
         # Verificar ordenamiento alfabético
         self.assertEqual(response.data[0]['name'], 'Jardinería')
         self.assertEqual(response.data[1]['name'], 'Limpieza')
+
+    def test_list_categories_cached(self):
+        """Test que el listado se sirve desde cache y se invalida al cambiar"""
+        from core.cache import tiered_cache
+        from providers.services.views import CATEGORY_CACHE
+
+        # La versión se consulta en la primera petición y no vuelve a caducar
+        # durante el test, por lento que sea
+        poll = patch.object(tiered_cache(CATEGORY_CACHE), 'poll_interval', 60)
+        poll.start()
+        self.addCleanup(poll.stop)
+
+        self.client.get('/api/services/categories/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/services/categories/')
+        self.assertEqual(len(response.data), 2)
+
+        self.category2.is_active = False
+        self.category2.save()
+
+        response = self.client.get('/api/services/categories/')
+        self.assertEqual([c['name'] for c in response.data], ['Limpieza'])
     
     # def test_get_category_detail(self):
     #     """Test obtener detalle de categoría"""
@@ -582,5 +606,332 @@ class ServiceIntegrationTest(APITestCase):
         service_data = list_response.data[0]
         self.assertEqual(service_data['title'], 'Servicio Actualizado')
         self.assertEqual(service_data['price'], '120.00')
-        
-      
+
+
+class ServiceSearchTest(APITestCase):
+    """Tests para la búsqueda de texto del catálogo (providers/services/search.py)"""
+
+    def setUp(self):
+        user = User.objects.create_user(
+            username='searchprovider', phone='+593991112233', password='providerpass123', role=User.Role.PROVIDER
+        )
+        self.provider = Provider.objects.create(
+            user=user, verification_status=Provider.VerificationStatus.APPROVED, is_active=True,
+            verified_at=timezone.now(),
+        )
+        self.category = Category.objects.create(name='Hogar')
+        self.plumbing = self._service('Plomería urgente', 'Reparación de tuberías y grifos')
+        self.cleaning = self._service('Limpieza de oficinas', 'Incluye limpieza de baños y tuberías exteriores')
+        self.painting = self._service('Pintura de interiores', 'Paredes y techos')
+
+    def _service(self, title, description):
+        return Service.objects.create(
+            provider=self.provider, category=self.category, title=title, description=description,
+            price=Decimal('20.00'), duration_minutes=60,
+        )
+
+    def _search(self, text, **params):
+        response = self.client.get('/api/services/services/', {'search': text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['title'] for item in response.data['results']]
+
+    def test_tsquery_text(self):
+        """Test que el último término es un prefijo mientras se escribe y que no se cuelan operadores"""
+        from providers.services.search import tsquery_text
+
+        self.assertEqual(tsquery_text('Plomer'), "'plomer':*")
+        self.assertEqual(tsquery_text('plomería urgente '), "'plomería' & 'urgente'")
+        self.assertEqual(tsquery_text("tub* & !grifo's"), "'tub':* & 'grifo' & 's'")
+        self.assertEqual(tsquery_text('a'), "'a'")
+        self.assertIsNone(tsquery_text(' | & '))
+
+    def test_search_matches_title_and_description(self):
+        """Test que la búsqueda encuentra servicios por título o descripción"""
+        self.assertEqual(self._search('pintura '), ['Pintura de interiores'])
+        self.assertCountEqual(self._search('tuberías '), ['Plomería urgente', 'Limpieza de oficinas'])
+        self.assertEqual(self._search('nada que ver '), [])
+
+    def test_spanish_stemming_and_prefix(self):
+        """Test que se buscan las formas de la palabra y prefijos mientras se escribe"""
+        self.assertEqual(self._search('reparaciones '), ['Plomería urgente'])
+        self.assertEqual(self._search('plom'), ['Plomería urgente'])
+        self.assertEqual(self._search('oficina limp'), ['Limpieza de oficinas'])
+
+    def test_title_ranks_above_description(self):
+        """Test que una coincidencia en el título pesa más que en la descripción"""
+        self._service('Grifos', 'Cambio')
+        self.assertEqual(self._search('grifos ')[0], 'Grifos')
+        # Un orden explícito tiene prioridad sobre la relevancia
+        self.assertEqual(self._search('grifos ', ordering='-created_at'), ['Grifos', 'Plomería urgente'])
+
+    def test_ranked_results_paginate(self):
+        """Test que el cursor recorre los resultados por relevancia sin repetir ni saltar filas"""
+        for index in range(5):
+            self._service(f'Tuberías {index}', 'Tuberías de cobre' if index % 2 else 'Cobre')
+        expected = self._search('tuberías ', page_size=100)
+
+        titles, url = [], '/api/services/services/?search=tuber%C3%ADas+&page_size=2'
+        while url:
+            response = self.client.get(url)
+            titles += [item['title'] for item in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(titles, expected)
+        self.assertEqual(len(titles), 7)
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': False})
+    def test_broad_search_orders_by_date(self):
+        """Test que con más de MAX_RANKED_ROWS coincidencias no se ordena por relevancia sino por fecha"""
+        self._service('Grifos', 'Cambio')
+        self._service('Baños', 'Grifos y duchas')
+
+        self.assertEqual(self._search('grifos ')[0], 'Grifos')
+        with patch('providers.services.search.MAX_RANKED_ROWS', 2):
+            self.assertEqual(self._search('grifos '), ['Baños', 'Grifos', 'Plomería urgente'])
+            self.assertEqual(self._search('grifos ', ordering='price'), ['Plomería urgente', 'Grifos', 'Baños'])
+
+    def test_save_writes_vector_in_one_statement(self):
+        """Test que save() calcula el vector en la misma sentencia, sin un UPDATE posterior"""
+        self.painting.title = 'Jardinería'
+        with self.assertNumQueries(1):
+            self.painting.save(update_fields=['title'])
+
+        self.assertEqual(self._search('jardinería '), ['Jardinería'])
+
+    def test_vector_follows_writes(self):
+        """Test que el vector se actualiza con save, update, bulk_update y bulk_create"""
+        self.painting.title = 'Jardinería'
+        self.painting.save()
+        self.assertEqual(self._search('jardinería '), ['Jardinería'])
+
+        Service.objects.filter(pk=self.painting.pk).update(title='Carpintería')
+        self.assertEqual(self._search('carpintería '), ['Carpintería'])
+        self.assertEqual(self._search('jardinería '), [])
+
+        self.cleaning.description = 'Ventanas'
+        Service.objects.bulk_update([self.cleaning], ['description'])
+        self.assertEqual(self._search('ventanas '), ['Limpieza de oficinas'])
+
+        Service.objects.bulk_create([
+            Service(provider=self.provider, category=self.category, title='Electricidad',
+                    price=Decimal('30.00'), duration_minutes=30),
+        ])
+        self.assertEqual(self._search('electricidad '), ['Electricidad'])
+
+        # save() sin cambiar el texto no deja el vector vacío
+        self.plumbing.price = Decimal('25.00')
+        self.plumbing.save(update_fields=['price'])
+        self.assertEqual(self._search('plomería '), ['Plomería urgente'])
+
+
+class ServiceSuggestTest(APITestCase):
+    """Tests para el autocompletado del catálogo (providers/services/suggest.py)"""
+
+    def setUp(self):
+        from providers.services.suggest import get_suggestion_cache
+
+        get_suggestion_cache().clear()
+        self.addCleanup(get_suggestion_cache().clear)
+        user = User.objects.create_user(
+            username='plomeros_quito', phone='+593991112244', password='providerpass123', role=User.Role.PROVIDER
+        )
+        self.provider = Provider.objects.create(
+            user=user, verification_status=Provider.VerificationStatus.APPROVED, is_active=True,
+            verified_at=timezone.now(),
+        )
+        self.category = Category.objects.create(name='Plomería')
+        for title in ('Plomería urgente', 'plomería urgente', 'Pintura de interiores'):
+            Service.objects.create(
+                provider=self.provider, category=self.category, title=title,
+                price=Decimal('20.00'), duration_minutes=60,
+            )
+        Service.objects.create(
+            provider=self.provider, category=self.category, title='Plomería inactiva',
+            price=Decimal('20.00'), duration_minutes=60, is_active=False,
+        )
+
+    def _suggest(self, q, **params):
+        response = self.client.get('/api/services/suggest/', {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_suggestions_from_every_source(self):
+        """Test que sugiere categorías, servicios y proveedores activos sin textos repetidos"""
+        data = self._suggest('  PLOM ')
+        self.assertEqual(data['query'], 'plom')
+        suggestions = {(item['type'], item['text'].lower()) for item in data['suggestions']}
+        self.assertIn(('category', 'plomería'), suggestions)
+        self.assertIn(('service', 'plomería urgente'), suggestions)
+        self.assertIn(('provider', 'plomeros_quito'), suggestions)
+        texts = [item['text'].casefold() for item in data['suggestions']]
+        self.assertEqual(len(texts), len(set(texts)))
+        self.assertNotIn('plomería inactiva', texts)
+
+    def test_only_listed_providers(self):
+        """Test que sólo se sugieren proveedores aprobados, activos y sin suspender"""
+        hidden = {
+            'plomero_pendiente': {'verification_status': Provider.VerificationStatus.PENDING},
+            'plomero_suspendido': {'verification_status': Provider.VerificationStatus.SUSPENDED},
+            'plomero_inactivo': {'is_active': False},
+        }
+        for index, (username, fields) in enumerate(hidden.items()):
+            user = User.objects.create_user(
+                username=username, phone=f'+59399111230{index}', password='providerpass123', role=User.Role.PROVIDER
+            )
+            Provider.objects.create(user=user, verified_at=timezone.now(), **{
+                'verification_status': Provider.VerificationStatus.APPROVED, 'is_active': True, **fields,
+            })
+
+        def providers(q):
+            return [item['text'] for item in self._suggest(q, limit=20)['suggestions'] if item['type'] == 'provider']
+
+        self.assertEqual(providers('plomero'), ['plomeros_quito'])
+        User.objects.filter(username='plomeros_quito').update(disabled=True)
+        self.assertEqual(providers('plomer'), [])
+
+    def test_suggestion_cache_created_once(self):
+        """Test que los hilos concurrentes comparten una única cache de sugerencias"""
+        import threading
+        from providers.services import suggest
+
+        patcher = patch.object(suggest, '_suggestion_cache', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        barrier = threading.Barrier(8)
+        caches = []
+
+        def get():
+            barrier.wait()
+            caches.append(suggest.get_suggestion_cache())
+
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(cache) for cache in caches}), 1)
+
+    def test_short_query_and_limit(self):
+        """Test que un texto corto no consulta y que limit se valida y se acota"""
+        with self.assertNumQueries(0):
+            self.assertEqual(self._suggest('p')['suggestions'], [])
+        self.assertEqual(len(self._suggest('plom', limit=1)['suggestions']), 1)
+        response = self.client.get('/api/services/suggest/', {'q': 'plom', 'limit': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_repeated_prefix_is_cached(self):
+        """Test que el mismo prefijo se sirve desde la cache del proceso"""
+        first = self._suggest('pintu')
+        with self.assertNumQueries(0):
+            self.assertEqual(self._suggest('Pintu'), first)
+
+    def test_typo_tolerance(self):
+        """Test que se encuentran textos mal escritos"""
+        texts = [item['text'] for item in self._suggest('plomria')['suggestions']]
+        self.assertIn('Plomería', texts)
+        texts = [item['text'] for item in self._suggest('pintira')['suggestions']]
+        self.assertIn('Pintura de interiores', texts)
+
+    def test_trigram_indexes_exist(self):
+        """Test que migrate crea los índices GIN de trigramas de las sugerencias"""
+        from providers.services.suggest import TRIGRAM_INDEXES
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes WHERE indexname = ANY(%s)",
+                [list(TRIGRAM_INDEXES.values())],
+            )
+            indexes = dict(cursor.fetchall())
+
+        self.assertEqual(set(indexes), {
+            'category_name_trgm_idx', 'service_title_trgm_idx', 'user_provider_username_trgm_idx',
+        })
+        for definition in indexes.values():
+            self.assertIn('USING gin', definition)
+            self.assertIn('gin_trgm_ops', definition)
+
+
+class CatalogResponseCacheTest(APITestCase):
+    """Tests de la cache de respuestas del catálogo (core/response_cache.py)"""
+
+    def setUp(self):
+        from providers.services.models import CATALOG_CACHE
+        from core.response_cache import response_cache
+
+        self.cache = response_cache(CATALOG_CACHE)
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+        # Un único worker: la versión se consulta al invalidar, no en cada request
+        patcher = patch.object(self.cache, 'poll_interval', 60)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        user = User.objects.create_user(
+            username='catalogcache', phone='+593991112255', password='providerpass123', role=User.Role.PROVIDER
+        )
+        self.provider = Provider.objects.create(
+            user=user, verification_status=Provider.VerificationStatus.APPROVED, is_active=True,
+            verified_at=timezone.now(),
+        )
+        self.category = Category.objects.create(name='Cache')
+        self.service = Service.objects.create(
+            provider=self.provider, category=self.category, title='Servicio cacheado',
+            price=Decimal('20.00'), duration_minutes=60,
+        )
+
+    def _titles(self):
+        response = self.client.get('/api/services/services/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [service['title'] for service in response.data['results']]
+
+    def test_repeated_request_served_from_cache(self):
+        """Test que una página repetida no se vuelve a consultar ni serializar"""
+        first = self.client.get('/api/services/services/', {'ordering': 'price', 'category': ''})
+        # Ni el ETag consulta; los parámetros vacíos o en otro orden son la misma clave
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/services/services/', {'category': '', 'ordering': 'price'})
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+
+        self.client.get('/api/services/categories/')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/services/categories/').data[0]['name'], 'Cache')
+
+    def test_username_change_of_provider_only(self):
+        """Test que sólo invalida el catálogo cambiar el username de un proveedor"""
+        user = User.objects.get(pk=self.provider.user_id)
+        consumer = User.objects.create_user(
+            username='catalogconsumer', phone='+593991112256', password='consumerpass123', role=User.Role.CONSUMER
+        )
+        self._titles()
+        version = self.cache.version()
+
+        user.save()
+        consumer.username = 'otroconsumidor'
+        consumer.save()
+        self.assertEqual(self.cache.version(), version)
+
+        user.username = 'catalogrenombrado'
+        user.save(update_fields=['username'])
+        self.assertNotEqual(self.cache.version(), version)
+        self.assertEqual(self.client.get('/api/services/services/').data['results'][0]['provider_name'],
+                         'catalogrenombrado')
+
+    def test_invalidated_by_catalog_writes(self):
+        """Test que guardar, actualizar en bloque o suspender al proveedor invalida las respuestas"""
+        self.assertEqual(self._titles(), ['Servicio cacheado'])
+
+        self.service.title = 'Servicio editado'
+        self.service.save()
+        self.assertEqual(self._titles(), ['Servicio editado'])
+
+        Service.objects.filter(pk=self.service.pk).update(title='Servicio actualizado')
+        self.assertEqual(self._titles(), ['Servicio actualizado'])
+
+        self.category.name = 'Cache editada'
+        self.category.save()
+        response = self.client.get('/api/services/services/')
+        self.assertEqual(response.data['results'][0]['category']['name'], 'Cache editada')
+
+        self.provider.suspend_provider('Prueba', suspended_by=None)
+        self.assertEqual(self._titles(), [])
@@ -6,13 +6,15 @@ from .views import (
     ServiceCreateView,
     ServiceUpdateView,
     ProviderMyServicesView,
-    AdminServiceCreateView
+    AdminServiceCreateView,
+    ServiceSuggestView,
 )
 
 urlpatterns = [
     # Público / Consumer
     path('categories/', CategoryListView.as_view(), name='category-list'),
     path('services/', ServiceListView.as_view(), name='service-list'),
+    path('suggest/', ServiceSuggestView.as_view(), name='service-suggest'),
 
     # Provider
     path('my-services/', ProviderMyServicesView.as_view(), name='provider-my-services'),
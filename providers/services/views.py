@@ -1,44 +1,105 @@
 from rest_framework import generics, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Category, Service
+from .models import CATALOG_CACHE, Category, Service
 from .serializers import (
     CategorySerializer,
     ProviderServiceSerializer,
     ServiceCreateSerializer,
     ServiceUpdateSerializer,
-    CategoryCreateSerializer
+    CategoryCreateSerializer,
+    ServiceSuggestResponseSerializer,
 )
+from asgiref.sync import sync_to_async
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from core.cache import tiered_cache
+from core.async_views import AsyncAPIView, AsyncListAPIView
+from core.conditional import conditional_get
+from core.pagination import KeysetPagination
+from core.queries import SerializerQuerysetMixin
+from core.response_cache import cached_response, request_key, response_cache
+from .search import ServiceSearchFilter
+from .suggest import get_suggestion_cache, get_suggest_settings, normalize_query, suggest
+
+# Espacio de nombres de core.cache.TieredCache; se invalida en signals.py
+CATEGORY_CACHE = 'categories'
 
 
 # 1. Lista de categorías (para todos)
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(AsyncListAPIView):
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 2
     queryset = Category.objects.filter(is_active=True)
     pagination_class = None
 
+    def get_etag(self, request, *args, **kwargs):
+        # El listado sale de la TieredCache: su versión identifica el contenido
+        return tiered_cache(CATEGORY_CACHE).version()
+
+    # Sin cache de respuestas: el listado ya sale serializado de la TieredCache
+    @conditional_get(etag_func=get_etag, weak=True)
+    async def get(self, request, *args, **kwargs):
+        return await self.list(request, *args, **kwargs)
+
+    async def list(self, request, *args, **kwargs):
+        async def load():
+            categories = [category async for category in self.get_queryset()]
+            return await self.serialize(categories, many=True)
+
+        data = await tiered_cache(CATEGORY_CACHE).aget_or_set('active', load)
+        return Response(data)
+
+
+def active_categories():
+    """Categorías activas serializadas, desde la TieredCache (core/warmup.py la precarga)"""
+    return tiered_cache(CATEGORY_CACHE).get_or_set(
+        'active',
+        lambda: CategorySerializer(Category.objects.filter(is_active=True), many=True).data
+    )
+
 
 # 2. Lista de servicios activos (para consumer)
-class ServiceListView(generics.ListAPIView):
+class ServiceListView(SerializerQuerysetMixin, AsyncListAPIView):
     serializer_class = ProviderServiceSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    query_budget = 3
+    # Con ?search= los resultados se ordenan por relevancia (search.py)
+    filter_backends = [DjangoFilterBackend, ServiceSearchFilter, filters.OrderingFilter]
     filterset_fields = ['category']
-    search_fields = ['title', 'description']
     ordering_fields = ['price', 'created_at']
     ordering = ['-created_at']
+    # Cada orden usa un índice parcial (campo, id) de Service.Meta.indexes
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             return Service.objects.none()
         return Service.objects.filter(is_active=True)
 
+    def get_etag(self, request, *args, **kwargs):
+        """
+        Petición normalizada y versión del catálogo de la cache de
+        respuestas, que cambia con cualquier escritura de servicios,
+        categorías, proveedores o imágenes (signals.py). No consulta la base
+        de datos, así que un 304 o un acierto de la cache no cuestan nada.
+        """
+        return f"{request_key(request)}:{response_cache(CATALOG_CACHE).version()}"
+
+    @conditional_get(etag_func=get_etag, weak=True)
+    @cached_response(CATALOG_CACHE)
+    async def get(self, request, *args, **kwargs):
+        return await self.list(request, *args, **kwargs)
+
 
 # 3. Lista de servicios del provider autenticado
-class ProviderMyServicesView(generics.ListAPIView):
+class ProviderMyServicesView(SerializerQuerysetMixin, generics.ListAPIView):
     serializer_class = ProviderServiceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
 
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
@@ -85,3 +146,41 @@ class AdminServiceCreateView(generics.CreateAPIView):
     serializer_class = ServiceCreateSerializer
     permission_classes = [permissions.IsAdminUser]
     queryset = Service.objects.all()
+
+
+# 8. Autocompletado de categorías, servicios y proveedores (para todos)
+class ServiceSuggestView(AsyncAPIView):
+    """
+    Sugerencias mientras se escribe, por similitud de trigramas con
+    pg_trgm, que tolera errores de escritura (suggest.py). Las
+    respuestas recientes se sirven desde una cache del proceso sin salir
+    del event loop.
+    """
+    permission_classes = [permissions.AllowAny]
+    query_budget = 3
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Texto escrito hasta ahora"),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Máximo de sugerencias"),
+        ],
+        responses={200: ServiceSuggestResponseSerializer},
+    )
+    async def get(self, request, *args, **kwargs):
+        conf = get_suggest_settings()
+        query = normalize_query(request.query_params.get('q', ''))
+        try:
+            limit = int(request.query_params.get('limit', conf['LIMIT']))
+        except ValueError:
+            return Response({"error": "limit debe ser un número entero"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, conf['MAX_LIMIT']))
+
+        if len(query) < conf['MIN_LENGTH']:
+            return Response({'query': query, 'suggestions': []})
+
+        cache = get_suggestion_cache()
+        suggestions = cache.get(query, limit)
+        if suggestions is None:
+            suggestions = await sync_to_async(suggest)(query, limit)
+            cache.set(query, limit, suggestions)
+        return Response({'query': query, 'suggestions': suggestions})
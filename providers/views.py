@@ -2,6 +2,8 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from django.db import transaction
 from core.models import User
+from core.conditional import conditional_get, profile_etag, profile_last_modified
+from core.passwords import hash_password
 from users.models import UserProfile
 from .models import Provider
 from datetime import date
@@ -20,7 +22,6 @@ class ProviderRegisterView(generics.CreateAPIView):
     serializer_class = ProviderRegisterSerializer
     permission_classes = [AllowAny]
 
-    @transaction.atomic
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -29,28 +30,32 @@ class ProviderRegisterView(generics.CreateAPIView):
         profile_data = serializer.validated_data.pop('profile')
         documents = serializer.validated_data.pop('documents', {})
 
-        user = User.objects.create_user(
-            username=user_data['username'],
-            phone=user_data['phone'],
-            password=user_data['password'],
-            role=User.Role.PROVIDER
-        )
-
-        UserProfile.objects.create(
-            user=user,
-            firstname=profile_data['firstname'],
-            lastname=profile_data['lastname'],
-            email=profile_data.get('email', f"{user_data['phone']}@temp.com"),
-            cedula=profile_data['cedula'],
-            birth_date=profile_data.get('birth_date', date(2000, 1, 1))
-        )
-
-        provider = Provider.objects.create(
-            user=user,
-            verification_documents=documents,
-            verification_status=Provider.VerificationStatus.PENDING,
-            bio=serializer.validated_data.get('bio', "")
-        )
+        # El hash se calcula antes de abrir la transacción para no retener locks
+        password_hash = hash_password(user_data['password'])
+
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=user_data['username'],
+                phone=user_data['phone'],
+                password_hash=password_hash,
+                role=User.Role.PROVIDER
+            )
+
+            UserProfile.objects.create(
+                user=user,
+                firstname=profile_data['firstname'],
+                lastname=profile_data['lastname'],
+                email=profile_data.get('email', f"{user_data['phone']}@temp.com"),
+                cedula=profile_data['cedula'],
+                birth_date=profile_data.get('birth_date', date(2000, 1, 1))
+            )
+
+            provider = Provider.objects.create(
+                user=user,
+                verification_documents=documents,
+                verification_status=Provider.VerificationStatus.PENDING,
+                bio=serializer.validated_data.get('bio', "")
+            )
 
         refresh = RefreshToken.for_user(user)
 
@@ -115,6 +120,10 @@ class ProviderVerificationAdminView(generics.UpdateAPIView):
             reason = request.data.get('reason', 'Sin razón especificada')
             provider.reject_provider(reason=reason, rejected_by=request.user)
             message = "Proveedor rechazado"
+        elif action == 'suspend':
+            reason = request.data.get('reason', 'Sin razón especificada')
+            provider.suspend_provider(reason=reason, suspended_by=request.user)
+            message = "Proveedor suspendido"
         else:
             return Response(
                 {"error": "Acción no válida"}, 
@@ -136,12 +145,14 @@ class ProviderUpdateView(generics.UpdateAPIView):
 class ProviderListView(generics.ListAPIView):
     serializer_class = ProviderAdminSerializer
     permission_classes = [permissions.IsAdminUser]
-    queryset = Provider.objects.all()
+    query_budget = 2
+    queryset = Provider.objects.select_related('user__profile')
 
 # ✅ Nuevo endpoint para perfil propio
 class ProviderProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = ProviderProfileSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 3
 
     def get_object(self):
         if not hasattr(self.request.user, 'provider'):
@@ -149,9 +160,14 @@ class ProviderProfileView(generics.RetrieveUpdateAPIView):
             raise Http404("Perfil de proveedor no encontrado")
         return self.request.user.provider
 
+    @conditional_get(etag_func=profile_etag, last_modified_func=profile_last_modified)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
 # ✅ Endpoint para admin ver perfil por ID
 class ProviderDetailAdminView(generics.RetrieveAPIView):
     queryset = Provider.objects.select_related('user__profile')
     serializer_class = ProviderAdminSerializer
     permission_classes = [permissions.IsAdminUser]
+    query_budget = 2
     lookup_field = 'id'
@@ -2,5 +2,10 @@
 
 source /home/savage/Escritorio/homeService_API/venv/bin/activate
 
-# Ejecutar gunicorn con 3 workers y bind 0.0.0.0:8000
-exec gunicorn --workers 3 --bind 0.0.0.0:8000 backend_homeService.wsgi:application
+# Workers, threads, reciclado y warmup se configuran en gunicorn.conf.py
+# (variables GUNICORN_*). Por defecto workers de uvicorn; SERVER_MODE=wsgi
+# usa workers síncronos.
+cd "$(dirname "$0")"
+# Esquema OpenAPI precalculado: /swagger/ no introspecciona las vistas en cada visita
+python manage.py build_openapi_schema
+exec gunicorn --config gunicorn.conf.py
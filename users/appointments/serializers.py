@@ -37,6 +37,8 @@ class AppointmentSerializer(serializers.ModelSerializer):
             'time_until_expiry'
         ]
         read_only_fields = ['created_at', 'updated_at']
+        # is_expired y time_until_expiry (core.queries.optimize_queryset)
+        reads = ['is_temporary', 'expires_at']
 
 
 class CreateAppointmentSerializer(serializers.ModelSerializer):
@@ -181,6 +183,8 @@ class AppointmentDetailSerializer(serializers.ModelSerializer):
             'time_until_expiry'
         ]
         read_only_fields = ['id', 'consumer', 'provider', 'service', 'created_at', 'updated_at']
+        # is_expired y time_until_expiry (core.queries.optimize_queryset)
+        reads = ['is_temporary', 'expires_at']
 
 
 class MarkAppointmentAsPaidSerializer(serializers.Serializer):
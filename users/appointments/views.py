@@ -3,8 +3,10 @@ from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.decorators import api_view, permission_classes
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
-from datetime import date, datetime
+from django.db.models import Count, Q
+from datetime import date, datetime, timedelta
+from core.async_views import AsyncListAPIView, async_api_view
+from core.queries import SerializerQuerysetMixin, optimize_queryset, query_budget
 from .models import Appointment
 from .serializers import (
     AppointmentSerializer,
@@ -15,11 +17,11 @@ from .serializers import (
     MarkAppointmentAsPaidSerializer
 )
 
-
 # ---------- CONSUMER ----------
-class ConsumerAppointmentListView(generics.ListAPIView):
+class ConsumerAppointmentListView(SerializerQuerysetMixin, AsyncListAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
 
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
@@ -89,10 +91,11 @@ class ConsumerCreateAppointmentView(generics.CreateAPIView):
         return response
 
 
-class ConsumerAppointmentDetailView(generics.RetrieveAPIView):
+class ConsumerAppointmentDetailView(SerializerQuerysetMixin, generics.RetrieveAPIView):
     """Obtener detalles de un appointment específico"""
     serializer_class = AppointmentDetailSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
     queryset = Appointment.objects.all()
 
     def get_queryset(self):
@@ -204,9 +207,10 @@ class MarkAppointmentAsPaidView(generics.UpdateAPIView):
 
 
 # ---------- PROVIDER ----------
-class ProviderAppointmentListView(generics.ListAPIView):
+class ProviderAppointmentListView(SerializerQuerysetMixin, generics.ListAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
 
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
@@ -255,10 +259,11 @@ class ProviderAppointmentListView(generics.ListAPIView):
         return queryset.order_by('-appointment_date')
 
 
-class ProviderAppointmentDetailView(generics.RetrieveAPIView):
+class ProviderAppointmentDetailView(SerializerQuerysetMixin, generics.RetrieveAPIView):
     """Obtener detalles de un appointment específico para provider"""
     serializer_class = AppointmentDetailSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
     queryset = Appointment.objects.all()
 
     def get_queryset(self):
@@ -308,10 +313,11 @@ class ProviderUpdateAppointmentView(generics.UpdateAPIView):
         }, status=status.HTTP_200_OK)
 
 
-class ProviderServiceAppointmentsView(generics.ListAPIView):
+class ProviderServiceAppointmentsView(SerializerQuerysetMixin, generics.ListAPIView):
     """Obtener appointments de un servicio específico del provider"""
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
 
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
@@ -344,6 +350,7 @@ class ProviderServiceAppointmentsView(generics.ListAPIView):
 
 
 # ---------- ENDPOINTS GENERALES ----------
+@query_budget(8)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def appointment_statistics(request):
@@ -396,6 +403,7 @@ def appointment_statistics(request):
     })
 
 
+@query_budget(8)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def provider_dashboard(request):
@@ -413,32 +421,40 @@ def provider_dashboard(request):
     from providers.services.models import Service
     provider_services = Service.objects.filter(provider__user=request.user)
     
+    # Conteos de todos los servicios en una sola consulta agrupada
+    counts = {
+        row.pop('service_id'): row
+        for row in appointments.order_by().values('service_id').annotate(
+            total_appointments=Count('id'),
+            pending=Count('id', filter=Q(status=Appointment.Status.PENDING)),
+            confirmed=Count('id', filter=Q(status=Appointment.Status.CONFIRMED)),
+            completed=Count('id', filter=Q(status=Appointment.Status.COMPLETED)),
+            cancelled=Count('id', filter=Q(status=Appointment.Status.CANCELLED)),
+        )
+    }
+    empty = dict.fromkeys(['total_appointments', 'pending', 'confirmed', 'completed', 'cancelled'], 0)
+    
     service_stats = []
     for service in provider_services:
-        service_appointments = appointments.filter(service=service)
         service_stats.append({
             "service_id": service.id,
             "service_title": service.title,
-            "total_appointments": service_appointments.count(),
-            "pending": service_appointments.filter(status=Appointment.Status.PENDING).count(),
-            "confirmed": service_appointments.filter(status=Appointment.Status.CONFIRMED).count(),
-            "completed": service_appointments.filter(status=Appointment.Status.COMPLETED).count(),
-            "cancelled": service_appointments.filter(status=Appointment.Status.CANCELLED).count(),
+            **counts.get(service.id, empty),
         })
     
     # Próximas citas (hoy y mañana)
     today = date.today()
     tomorrow = today + timedelta(days=1)
     
-    today_appointments = appointments.filter(
+    today_appointments = optimize_queryset(appointments.filter(
         appointment_date=today,
         status__in=[Appointment.Status.PENDING, Appointment.Status.CONFIRMED]
-    ).order_by('appointment_time')
+    ), AppointmentSerializer).order_by('appointment_time')
     
-    tomorrow_appointments = appointments.filter(
+    tomorrow_appointments = optimize_queryset(appointments.filter(
         appointment_date=tomorrow,
         status__in=[Appointment.Status.PENDING, Appointment.Status.CONFIRMED]
-    ).order_by('appointment_time')
+    ), AppointmentSerializer).order_by('appointment_time')
     
     return Response({
         "service_statistics": service_stats,
@@ -450,9 +466,10 @@ def provider_dashboard(request):
     })
 
 
-@api_view(['GET'])
+@query_budget(3)
+@async_api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
-def check_appointment_availability(request):
+async def check_appointment_availability(request):
     """Verificar disponibilidad de horarios para un servicio"""
     service_id = request.GET.get('service_id')
     date = request.GET.get('date')
@@ -464,7 +481,7 @@ def check_appointment_availability(request):
     
     try:
         from providers.services.models import Service
-        service = Service.objects.get(id=service_id)
+        service = await Service.objects.aget(id=service_id)
         
         # Simular horarios disponibles (en producción esto sería más complejo)
         available_times = [
@@ -473,14 +490,14 @@ def check_appointment_availability(request):
         
         # Obtener horarios ocupados para esa fecha (excluir temporales no pagados)
         appointment_date = datetime.strptime(date, '%Y-%m-%d').date()
-        occupied_times = Appointment.objects.filter(
+        occupied_times = [occupied async for occupied in Appointment.objects.filter(
             service=service,
             appointment_date=appointment_date,
             status__in=[Appointment.Status.PENDING, Appointment.Status.CONFIRMED]
         ).exclude(
             is_temporary=True,
             payment_completed=False
-        ).values_list('appointment_time', flat=True)
+        ).values_list('appointment_time', flat=True)]
         
         # Convertir a strings para comparación
         occupied_times_str = [time.strftime('%H:%M') for time in occupied_times]
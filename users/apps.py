@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        post_migrate.connect(create_guest_sequence, sender=self)
+
+
+def create_guest_sequence(sender, using, **kwargs):
+    """La secuencia de usernames guest no se declara en los modelos"""
+    from .guest_pool import install_guest_sequence
+    install_guest_sequence(using)
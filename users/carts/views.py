@@ -5,21 +5,23 @@ from rest_framework.exceptions import NotFound, PermissionDenied
 from django.db import transaction
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from core.async_views import AsyncRetrieveAPIView
 
 from .models import Cart, CartItem
 from .serializers import CartSerializer, CartItemSerializer
 from providers.services.models import Service
 
 
-class CartDetailView(generics.RetrieveAPIView):
+class CartDetailView(AsyncRetrieveAPIView):
     """
     Obtener el carrito del usuario autenticado
     """
     serializer_class = CartSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 4
 
-    def get_object(self):
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
+    async def aget_object(self):
+        cart, _ = await Cart.objects.prefetch_related('items__service').aget_or_create(user=self.request.user)
         return cart
 
 
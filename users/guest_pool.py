@@ -0,0 +1,196 @@
+import logging
+import threading
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+from core.cache import shared_cache
+
+from core.models import User
+from core.passwords import hash_password
+from users.models import GuestPoolEntry, UserProfile
+
+logger = logging.getLogger(__name__)
+
+GUEST_PASSWORD = 'guestpass'
+GUEST_BIRTH_DATE = date(2000, 1, 1)
+
+# Secuencia de PostgreSQL que numera los usernames guestNNNN (users/apps.py la crea)
+GUEST_SEQUENCE = 'users_guest_number_seq'
+
+# Cuentas disponibles según shared_cache: el refill guarda el COUNT real y
+# cada entrega lo decrementa, así claim_guest no cuenta filas
+AVAILABLE_KEY = 'guest_pool:available'
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'SIZE': 200,        # cuentas disponibles tras un refill
+    'LOW_WATER': 50,    # por debajo se programa un refill en segundo plano
+    'BATCH_SIZE': 100,  # cuentas por transacción al rellenar
+}
+
+
+def _get_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'GUEST_POOL', {})}
+
+
+def install_guest_sequence(using):
+    """
+    Crear la secuencia GUEST_SEQUENCE si no existe. Arranca después de los
+    ids existentes, que era la numeración de los guests creados antes del
+    pool. Idempotente.
+    """
+    quote = connections[using].ops.quote_name
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {GUEST_SEQUENCE}")
+        # Sólo se ajusta una secuencia recién creada (is_called = false)
+        cursor.execute(
+            f"SELECT setval(%s, (SELECT COALESCE(MAX(id), 0) + 1 FROM {quote(User._meta.db_table)}), false) "
+            f"FROM {GUEST_SEQUENCE} WHERE NOT is_called",
+            [GUEST_SEQUENCE],
+        )
+
+
+def _next_numbers(count):
+    """Reservar `count` números de guest sin colisiones entre workers"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT nextval(%s) FROM generate_series(1, %s)", [GUEST_SEQUENCE, count])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def create_guests(count, password_hash):
+    """
+    Crear `count` usuarios guest con su perfil y su carrito en tres INSERT
+    masivos. bulk_create no envía post_save, por eso el carrito se crea aquí
+    en lugar de en users/carts/signals.py.
+    """
+    from users.carts.models import Cart
+
+    users = User.objects.bulk_create([
+        User(
+            username=f'guest{number:04d}',
+            phone=f'guest{number:04d}',
+            password=password_hash,
+            role=User.Role.GUEST,
+        )
+        for number in _next_numbers(count)
+    ])
+
+    profiles = []
+    for user in users:
+        number = int(user.username[len('guest'):])
+        profile = UserProfile(
+            user=user,
+            firstname=f"Guest{number}",
+            lastname="Temp",
+            email=f"guest{number}@temp.com",
+            birth_date=GUEST_BIRTH_DATE,
+        )
+        profile.calculate_age()
+        profiles.append(profile)
+    UserProfile.objects.bulk_create(profiles)
+    Cart.objects.bulk_create([Cart(user=user) for user in users])
+    return users
+
+
+def available():
+    """Cuentas disponibles (COUNT exacto; sólo para refill y el comando)"""
+    return GuestPoolEntry.objects.count()
+
+
+def refill(size=None, batch_size=None):
+    """
+    Completar el pool hasta `size` cuentas disponibles. Devuelve cuántas
+    cuentas se crearon.
+    """
+    conf = _get_settings()
+    size = conf['SIZE'] if size is None else size
+    batch_size = batch_size or conf['BATCH_SIZE']
+
+    total = available()
+    missing = size - total
+    if missing <= 0:
+        shared_cache.set(AVAILABLE_KEY, total, timeout=None)
+        return 0
+
+    # La contraseña de los guests es la misma para todos, así que basta con
+    # un solo hash por refill, calculado fuera de las transacciones
+    password_hash = hash_password(GUEST_PASSWORD)
+
+    created = 0
+    while created < missing:
+        count = min(batch_size, missing - created)
+        with transaction.atomic():
+            users = create_guests(count, password_hash)
+            GuestPoolEntry.objects.bulk_create([GuestPoolEntry(user=user) for user in users])
+        created += count
+    shared_cache.set(AVAILABLE_KEY, total + created, timeout=None)
+    return created
+
+
+def claim_guest():
+    """
+    Entregar una cuenta guest. Se toma del pool con SELECT ... FOR UPDATE
+    SKIP LOCKED, de modo que requests concurrentes nunca esperan ni reciben
+    la misma cuenta. Si el pool está vacío se crea una en el momento.
+    """
+    conf = _get_settings()
+    user = _claim_from_pool() if conf['ENABLED'] else None
+    claimed = user is not None
+
+    if user is None:
+        password_hash = hash_password(GUEST_PASSWORD)
+        with transaction.atomic():
+            user = create_guests(1, password_hash)[0]
+
+    if conf['ENABLED'] and _remaining(claimed) < conf['LOW_WATER']:
+        transaction.on_commit(schedule_refill)
+    return user
+
+
+def _remaining(claimed):
+    """Cuentas que quedan tras una entrega según AVAILABLE_KEY; 0 si se desconoce"""
+    if not claimed:
+        return 0
+    try:
+        return shared_cache.decr(AVAILABLE_KEY)
+    except ValueError:
+        # Sin contador (expulsado o sin refill previo): el refill lo recalcula
+        return 0
+
+
+def _claim_from_pool():
+    with transaction.atomic():
+        entry = (
+            GuestPoolEntry.objects
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('user__profile')
+            .order_by('id')
+            .first()
+        )
+        if entry is None:
+            return None
+        GuestPoolEntry.objects.filter(pk=entry.pk).delete()
+    return entry.user
+
+
+_refill_lock = threading.Lock()
+
+
+def schedule_refill():
+    """Rellenar el pool en un hilo aparte; como máximo un refill por proceso"""
+    if not _refill_lock.acquire(blocking=False):
+        return False
+    threading.Thread(target=_refill_in_background, name='guest-pool-refill', daemon=True).start()
+    return True
+
+
+def _refill_in_background():
+    try:
+        refill()
+    except Exception:
+        logger.exception("No se pudo rellenar el pool de guests")
+    finally:
+        connection.close()
+        _refill_lock.release()
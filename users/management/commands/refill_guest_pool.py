@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from users import guest_pool
+
+
+class Command(BaseCommand):
+    help = 'Crear por adelantado cuentas guest hasta completar el pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=None,
+            help='Cuentas disponibles que debe tener el pool (default: GUEST_POOL["SIZE"])',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Cuentas creadas por transacción (default: GUEST_POOL["BATCH_SIZE"])',
+        )
+
+    def handle(self, *args, **options):
+        created = guest_pool.refill(size=options['size'], batch_size=options['batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Se crearon {created} cuentas guest. Disponibles: {guest_pool.available()}.'
+            )
+        )
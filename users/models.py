@@ -1,6 +1,21 @@
 from django.db import models
 from django.utils import timezone
 from core.models import User
+from core.principal import invalidate_all_principals
+
+class UserProfileQuerySet(models.QuerySet):
+    """
+    update() no emite post_save (core/signals.py): las escrituras masivas
+    invalidan todas las entradas de core/principal.py.
+    """
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if rows:
+            invalidate_all_principals()
+        return rows
+
+    update.alters_data = True
 
 class UserProfile(models.Model):
     user = models.OneToOneField(
@@ -23,6 +38,8 @@ class UserProfile(models.Model):
     photo = models.URLField(max_length=300, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = UserProfileQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'User Profile'
         verbose_name_plural = 'User Profiles'
@@ -32,12 +49,34 @@ class UserProfile(models.Model):
         ]
 
     def save(self, *args, **kwargs):
+        self.calculate_age()
+        super().save(*args, **kwargs)
+
+    def calculate_age(self):
         if self.birth_date:
             today = timezone.now().date()
             self.edad = today.year - self.birth_date.year - (
                 (today.month, today.day) < (self.birth_date.month, self.birth_date.day)
             )
-        super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.firstname} {self.lastname}"
\ No newline at end of file
+        return f"{self.firstname} {self.lastname}"
+
+class GuestPoolEntry(models.Model):
+    """
+    Cuenta guest creada por adelantado (users/guest_pool.py) que todavía no
+    se ha entregado a ningún visitante. La fila se elimina al reclamarla.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='guest_pool_entry'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Guest Pool Entry'
+        verbose_name_plural = 'Guest Pool Entries'
+
+    def __str__(self):
+        return f"Guest pool #{self.id} - {self.user_id}"
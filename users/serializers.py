@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from core.models import User
+from core.passwords import hash_password
 from users.models import UserProfile
 import phonenumbers
 from django.core.validators import validate_email
@@ -212,7 +213,7 @@ class RegisterConsumerSerializer(serializers.ModelSerializer):
         user = User.objects.create_user(
             username=validated_data['username'],
             phone=validated_data['phone'],
-            password=validated_data['password'],
+            password_hash=hash_password(validated_data['password']),
             role=User.Role.CONSUMER,
             is_verified=True
         )
@@ -5,8 +5,17 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from datetime import date, timedelta
 from unittest.mock import patch, MagicMock
 
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from io import StringIO
+
+from core.cache import UnloggedDatabaseCache
 from core.models import User
-from users.models import UserProfile
+from users import guest_pool
+from users.models import GuestPoolEntry, UserProfile
 from users.serializers import (
     ConsumerProfileSerializer, UpdateConsumerProfileSerializer,
     ChangePasswordSerializer, GuestSerializer
@@ -252,6 +261,167 @@ class GuestAccessTest(APITestCase):
 
 
 
+class GuestPoolTest(APITestCase):
+    """Tests para el pool de cuentas guest creadas por adelantado"""
+
+    def setUp(self):
+        self.client = APIClient()
+        caches['default'].clear()
+
+    def test_refill_creates_accounts(self):
+        """Test que el refill crea usuario, perfil y carrito por cuenta"""
+        created = guest_pool.refill(size=5, batch_size=2)
+
+        self.assertEqual(created, 5)
+        self.assertEqual(guest_pool.available(), 5)
+        for entry in GuestPoolEntry.objects.select_related('user__profile', 'user__cart'):
+            user = entry.user
+            self.assertEqual(user.role, User.Role.GUEST)
+            self.assertTrue(user.username.startswith('guest'))
+            self.assertEqual(user.profile.firstname, f"Guest{int(user.username[5:])}")
+            self.assertIsNotNone(user.profile.edad)
+            self.assertIsNotNone(user.cart)
+            self.assertTrue(user.check_password('guestpass'))
+
+    def test_refill_only_fills_missing(self):
+        """Test que el refill no supera el tamaño del pool"""
+        guest_pool.refill(size=3)
+        self.assertEqual(guest_pool.refill(size=5), 2)
+        self.assertEqual(guest_pool.refill(size=5), 0)
+        self.assertEqual(guest_pool.available(), 5)
+
+    def test_usernames_are_unique(self):
+        """Test que los guests del pool y los creados al vuelo no colisionan"""
+        guest_pool.refill(size=3)
+        with self.settings(GUEST_POOL={'ENABLED': False}):
+            guest_pool.claim_guest()
+        guest_pool.refill(size=6)
+
+        usernames = list(User.objects.filter(role=User.Role.GUEST).values_list('username', flat=True))
+        self.assertEqual(len(usernames), 7)
+        self.assertEqual(len(set(usernames)), 7)
+
+    def test_claim_takes_account_from_pool(self):
+        """Test que el endpoint entrega una cuenta del pool y la retira"""
+        guest_pool.refill(size=2)
+        pooled = set(GuestPoolEntry.objects.values_list('user_id', flat=True))
+
+        response = self.client.post('/api/users/guest/')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(response.data['user']['id'], pooled)
+        self.assertEqual(response.data['user']['profile']['lastname'], 'Temp')
+        self.assertEqual(guest_pool.available(), 1)
+
+    def test_claim_with_empty_pool_creates_account(self):
+        """Test que con el pool vacío se crea una cuenta en el momento"""
+        user = guest_pool.claim_guest()
+
+        self.assertEqual(user.role, User.Role.GUEST)
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
+        self.assertFalse(GuestPoolEntry.objects.filter(user=user).exists())
+
+    def test_claim_schedules_refill_below_low_water(self):
+        """Test que se programa un refill cuando el pool baja del mínimo"""
+        guest_pool.refill(size=2)
+        with self.captureOnCommitCallbacks() as callbacks:
+            guest_pool.claim_guest()
+        self.assertEqual(callbacks, [guest_pool.schedule_refill])
+
+    def test_claim_does_not_count_pool(self):
+        """Test que entregar una cuenta no ejecuta un COUNT sobre el pool"""
+        guest_pool.refill(size=3)
+        with self.settings(GUEST_POOL={'LOW_WATER': 1}):
+            with CaptureQueriesContext(connection) as queries, \
+                    self.captureOnCommitCallbacks() as callbacks:
+                guest_pool.claim_guest()
+        table = GuestPoolEntry._meta.db_table
+        self.assertFalse([q['sql'] for q in queries if 'COUNT(' in q['sql'].upper() and table in q['sql']])
+        self.assertEqual(callbacks, [])
+
+    def test_claim_without_counter_schedules_refill(self):
+        """Test que sin contador en la cache se programa un refill que lo recalcula"""
+        guest_pool.refill(size=3)
+        caches['default'].delete(guest_pool.AVAILABLE_KEY)
+        with self.settings(GUEST_POOL={'LOW_WATER': 1}):
+            with self.captureOnCommitCallbacks() as callbacks:
+                guest_pool.claim_guest()
+        self.assertEqual(callbacks, [guest_pool.schedule_refill])
+
+        guest_pool.refill(size=2)
+        self.assertEqual(caches['default'].get(guest_pool.AVAILABLE_KEY), 2)
+
+    def test_sequence_install_is_idempotent(self):
+        """Test que reinstalar la secuencia no reinicia la numeración"""
+        guest_pool.refill(size=1)
+        first = GuestPoolEntry.objects.get().user.username
+        guest_pool.install_guest_sequence('default')
+        with self.settings(GUEST_POOL={'ENABLED': False}):
+            second = guest_pool.claim_guest().username
+        self.assertGreater(int(second[len('guest'):]), int(first[len('guest'):]))
+
+    def test_refill_command(self):
+        """Test del comando refill_guest_pool"""
+        out = StringIO()
+        call_command('refill_guest_pool', size=4, stdout=out)
+
+        self.assertEqual(guest_pool.available(), 4)
+        self.assertIn('Se crearon 4 cuentas guest', out.getvalue())
+
+
+class SharedCacheOTPTest(APITestCase):
+    """Tests de OTP con varios workers compartiendo la cache"""
+
+    def setUp(self):
+        self.client = APIClient()
+        caches['default'].clear()
+        self.phone = '+593991234567'
+        User.objects.create_user(
+            username='otpguest',
+            phone=self.phone,
+            password='testpass123',
+            role=User.Role.GUEST
+        )
+
+    def send_and_verify(self, send_worker, verify_worker):
+        """Enviar el OTP atendido por un worker y verificarlo en otro"""
+        with patch('users.views.shared_cache', send_worker):
+            response = self.client.post('/api/users/otp/send/', {'phone': self.phone})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with patch('users.views.shared_cache', verify_worker):
+            return self.client.post('/api/users/otp/verify/', {
+                'phone': self.phone,
+                'otp': response.data['otp']
+            })
+
+    def test_otp_verified_through_shared_backend(self):
+        """Test que el OTP guardado con una instancia del backend 'database' se verifica con otra"""
+        # Dos instancias independientes del backend, como las de dos workers:
+        # sólo comparten la tabla. Todo ocurre en este proceso; dos instancias
+        # de locmem compartirían además su diccionario y no probarían nada.
+        call_command('createcachetable', 'hs_shared_cache_test', verbosity=0)
+        worker_a = UnloggedDatabaseCache('hs_shared_cache_test', {})
+        worker_b = UnloggedDatabaseCache('hs_shared_cache_test', {})
+
+        response = self.send_and_verify(worker_a, worker_b)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user = User.objects.get(phone=self.phone)
+        self.assertTrue(user.is_verified)
+        self.assertEqual(user.role, User.Role.CONSUMER)
+        self.assertIsNone(worker_a.get(f'otp_{self.phone}'))
+
+    def test_otp_fails_with_per_process_cache(self):
+        """Test de control: con una cache por proceso la verificación falla"""
+        worker_a = LocMemCache('worker-a', {})
+        worker_b = LocMemCache('worker-b', {})
+
+        response = self.send_and_verify(worker_a, worker_b)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class ConsumerRegistrationTest(APITestCase):
     """Tests para registro de consumidores"""
     
@@ -1,12 +1,15 @@
 from django.urls import path
 from .views import (
     GuestAccessView, RegisterConsumerView,
-    ConsumerProfileView, UpdateConsumerProfileView, ChangePasswordView
+    ConsumerProfileView, UpdateConsumerProfileView, ChangePasswordView,
+    SendOTPView, VerifyOTPView
 )
 
 urlpatterns = [
     path('guest/', GuestAccessView.as_view(), name='guest_access'),
     path('register/consumer/', RegisterConsumerView.as_view(), name='register_consumer'),
+    path('otp/send/', SendOTPView.as_view(), name='send_otp'),
+    path('otp/verify/', VerifyOTPView.as_view(), name='verify_otp'),
     
     # Endpoints para perfil de usuario consumer
     path('me/profile/', ConsumerProfileView.as_view(), name='consumer_profile'),
@@ -2,62 +2,51 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from django.core.cache import cache
-from django.db import transaction
+from rest_framework.exceptions import Throttled
+from core.cache import shared_cache
+from core.conditional import conditional_get, profile_etag, profile_last_modified
 from core.models import User
+from core.passwords import PasswordHashingUnavailable, hash_password
+from core.revocation import revoke_token, revoke_user_tokens
 from users.models import UserProfile
+from users.guest_pool import claim_guest
 from users.serializers import (
     GuestSerializer, RegisterConsumerSerializer, ConsumerProfileSerializer,
-    UpdateConsumerProfileSerializer, ChangePasswordSerializer
+    UpdateConsumerProfileSerializer, ChangePasswordSerializer,
+    OTPSerializer, VerifyOTPSerializer
 )
 from .utils.otp import generate_otp
-from datetime import date
 from rest_framework_simplejwt.tokens import RefreshToken
 from drf_yasg.utils import swagger_auto_schema
 
 class GuestAccessView(APIView):
     permission_classes = [AllowAny]
+    rate_limits = [('guest_ip', 'ip')]
 
     def post(self, request):
         try:
-            with transaction.atomic():
-                # Obtener el último ID de usuario guest
-                last_guest = User.objects.filter(role=User.Role.GUEST).order_by('-id').first()
-                count = (last_guest.id + 1) if last_guest else 1
-                username = f'guest{count:04d}'
-                
-                user = User.objects.create_user(
-                    username=username,
-                    phone=username,  
-                    password='guestpass',
-                    role=User.Role.GUEST
-                )
-                
-                UserProfile.objects.create(
-                    user=user,
-                    firstname=f"Guest{count}",
-                    lastname="Temp",
-                    email=f"guest{count}@temp.com",
-                    birth_date=date(2000, 1, 1),
-                )
-                
-                # Generar tokens JWT
-                refresh = RefreshToken.for_user(user)
-                access_token = str(refresh.access_token)
-                
-                return Response(
-                    {
-                        "status": "success",
-                        "user": GuestSerializer(user).data,
-                        "tokens": {
-                            "access": access_token,
-                            "refresh": str(refresh)
-                        },
-                        "message": "Usuario guest creado correctamente"
+            # Cuenta creada por adelantado (users/guest_pool.py)
+            user = claim_guest()
+
+            # Generar tokens JWT
+            refresh = RefreshToken.for_user(user)
+            access_token = str(refresh.access_token)
+
+            return Response(
+                {
+                    "status": "success",
+                    "user": GuestSerializer(user).data,
+                    "tokens": {
+                        "access": access_token,
+                        "refresh": str(refresh)
                     },
-                    status=status.HTTP_201_CREATED
-                )
+                    "message": "Usuario guest creado correctamente"
+                },
+                status=status.HTTP_201_CREATED
+            )
 
+        except PasswordHashingUnavailable:
+            raise
         except Exception as e:
             return Response(
                 {
@@ -70,6 +59,11 @@ class GuestAccessView(APIView):
 
 class SendOTPView(APIView):
     permission_classes = [AllowAny]
+    # otp_phone reemplaza la espera entre envíos al mismo teléfono
+    rate_limits = [('otp_ip', 'ip'), ('otp_phone', 'phone')]
+
+    def throttled(self, request, wait):
+        raise Throttled(wait, detail='Ya se ha enviado un código. Intenta más tarde.')
     
     def post(self, request):
         serializer = OTPSerializer(data=request.data)
@@ -78,15 +72,8 @@ class SendOTPView(APIView):
         
         phone = serializer.validated_data['phone']
         otp = generate_otp()
-        cache_key = f'otp_{phone}'
         
-        if cache.get(cache_key):
-            return Response(
-                {'error': 'Ya se ha enviado un código. Intenta más tarde.'},
-                status=status.HTTP_429_TOO_MANY_REQUESTS
-            )
-        
-        cache.set(cache_key, otp, timeout=300)
+        shared_cache.set(f'otp_{phone}', otp, timeout=300)
         return Response(
             {'otp': otp, 'expires_in': 300}, 
             status=status.HTTP_200_OK
@@ -102,7 +89,7 @@ class VerifyOTPView(APIView):
         
         phone = serializer.validated_data['phone']
         otp_input = serializer.validated_data['otp']
-        otp_real = cache.get(f'otp_{phone}')
+        otp_real = shared_cache.get(f'otp_{phone}')
 
         if otp_input != otp_real:
             return Response(
@@ -122,7 +109,7 @@ class VerifyOTPView(APIView):
             user.role = User.Role.CONSUMER
             user.save()
             
-            cache.delete(f'otp_{phone}')
+            shared_cache.delete(f'otp_{phone}')
             
             return Response(
                 {'message': 'Usuario verificado correctamente'},
@@ -158,10 +145,12 @@ class RegisterConsumerView(APIView):
 # Vista para obtener el perfil del usuario consumer
 class ConsumerProfileView(APIView):
     permission_classes = [IsAuthenticated]
+    query_budget = 3
     
     @swagger_auto_schema(
         operation_description="Obtiene el perfil completo del usuario consumer autenticado."
     )
+    @conditional_get(etag_func=profile_etag, last_modified_func=profile_last_modified)
     def get(self, request):
         try:
             # Verificar que el usuario sea consumer
@@ -255,8 +244,13 @@ class ChangePasswordView(APIView):
                 new_password = serializer.validated_data['new_password']
                 
                 # Cambiar la contraseña
-                user.set_password(new_password)
+                user.password = hash_password(new_password)
                 user.save()
+
+                # Los tokens emitidos con la contraseña anterior dejan de ser válidos
+                revoke_user_tokens(user.pk)
+                if request.auth is not None:
+                    revoke_token(request.auth)
                 
                 return Response(
                     {'message': 'Contraseña actualizada correctamente'},
@@ -265,6 +259,8 @@ class ChangePasswordView(APIView):
             else:
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
                 
+        except PasswordHashingUnavailable:
+            raise
         except Exception as e:
             return Response(
                 {'error': f'Error al cambiar la contraseña: {str(e)}'},